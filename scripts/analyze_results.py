@@ -10,28 +10,54 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
-from scipy.stats import mannwhitneyu, shapiro, levene
 import statsmodels.api as sm
 from statsmodels.formula.api import ols
 from statsmodels.stats.multicomp import pairwise_tukeyhsd
+import argparse
 import os
 from datetime import datetime
 import warnings
+from result_store import is_columnar, load_results, count_results
+from stats_engine import Partition, normality_table, levene_table, two_sample
+from bootstrap import bootstrap_cells, DEFAULT_RESAMPLES
+from hdr_histogram import LatencyHistograms, REPORT_PERCENTILES, summarize_ms
+from streaming import DEFAULT_CHUNKSIZE, DEFAULT_RESERVOIR_SIZE, StreamPartition, load_frame, stream_file
+from regression import (DEFAULT_ALPHA, DEFAULT_MIN_DELTA, DEFAULT_MIN_CHANGE, DEFAULT_MIN_TAIL_CHANGE,
+                        REGRESSION, IMPROVEMENT, MISSING, load_runs, rolling_window, compare_runs,
+                        build_report, save_report)
 warnings.filterwarnings('ignore')
 
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
 
+# Colunas lidas dos conjuntos Parquet/Arrow (projeção); as demais métricas não são usadas na análise
+ANALYSIS_COLUMNS = ['timestamp', 'api_type', 'query_type', 'query_name', 'response_time_ms',
+                    'response_size_bytes', 'success', 'run_id']
+
+METRICS = ['response_time_ms', 'response_size_bytes']
+
 
 class ExperimentAnalyzer:
     
-    def __init__(self, data_file: str, output_dir: str = "results"):
+    def __init__(self, data_file: str, output_dir: str = "results", conditions: dict = None,
+                 bootstrap_resamples: int = DEFAULT_RESAMPLES, bootstrap_workers: int = None,
+                 histogram_files: list = None, streaming: bool = False, chunksize: int = DEFAULT_CHUNKSIZE,
+                 reservoir_size: int = DEFAULT_RESERVOIR_SIZE):
         self.data_file = data_file
         self.output_dir = output_dir
+        self.conditions = conditions or {}
+        self.bootstrap_resamples = bootstrap_resamples
+        self.bootstrap_workers = bootstrap_workers
+        self.histogram_files = histogram_files or []
+        self.streaming = streaming
+        self.chunksize = chunksize
+        self.reservoir_size = reservoir_size
+        self.stream = None
         self.df = None
+        self.analyzed_count = 0
         self.results = {}
+        self._partitions = {}
         
         os.makedirs(output_dir, exist_ok=True)
         
@@ -42,31 +68,59 @@ class ExperimentAnalyzer:
         print("CARREGANDO DADOS DO EXPERIMENTO")
         print("=" * 70)
         
-        self.df = pd.read_csv(self.data_file)
-        
-        initial_count = len(self.df)
-        self.df = self.df[self.df['success'] == True].copy()
-        success_count = len(self.df)
+        if self.streaming:
+            self.stream = stream_file(self.data_file, ANALYSIS_COLUMNS, self.chunksize, self.conditions,
+                                      self.reservoir_size)
+            self.df = self.stream.sample_frame()
+            initial_count = self.stream.total_count
+            success_count = self.stream.success_count
+        elif is_columnar(self.data_file):
+            initial_count = count_results(self.data_file, self.conditions)
+            self.df = load_results(self.data_file, columns=ANALYSIS_COLUMNS,
+                                   conditions=dict(self.conditions, success=True))
+        else:
+            if self.data_file.endswith('.jsonl'):
+                self.df = load_frame(self.data_file, ANALYSIS_COLUMNS)
+            else:
+                self.df = pd.read_csv(self.data_file)
+            for column, value in self.conditions.items():
+                values = value if isinstance(value, list) else [value]
+                self.df = self.df[self.df[column].isin(values)]
+            
+            initial_count = len(self.df)
+            self.df = self.df[self.df['success'] == True].copy()
+        if not self.streaming:
+            success_count = len(self.df)
+        self.analyzed_count = success_count
         
         print(f"\n✓ Dados carregados: {self.data_file}")
         print(f"  - Total de medições: {initial_count}")
         print(f"  - Medições bem-sucedidas: {success_count}")
         print(f"  - Medições com erro: {initial_count - success_count}")
+        if self.streaming:
+            print(f"  - Modo em fluxo: blocos de {self.chunksize} linhas, amostra de até "
+                  f"{self.reservoir_size} medições por célula ({len(self.df)} no total)")
         
         print("\n" + "-" * 70)
         print("DISTRIBUIÇÃO DAS MEDIÇÕES")
         print("-" * 70)
-        print(self.df.groupby(['api_type', 'query_type']).size().unstack(fill_value=0))
+        if self.streaming:
+            print(self.stream.descriptive_table()[('response_time_ms', 'count')].unstack(fill_value=0))
+        else:
+            print(self.df.groupby(['api_type', 'query_type']).size().unstack(fill_value=0))
     
     def descriptive_statistics(self):
         print("\n" + "=" * 70)
         print("ESTATÍSTICAS DESCRITIVAS")
         print("=" * 70)
         
-        stats_df = self.df.groupby(['api_type', 'query_type']).agg({
-            'response_time_ms': ['count', 'mean', 'std', 'min', 'median', 'max'],
-            'response_size_bytes': ['mean', 'std', 'min', 'median', 'max']
-        }).round(2)
+        if self.streaming:
+            stats_df = self.stream.descriptive_table().round(2)
+        else:
+            stats_df = self.df.groupby(['api_type', 'query_type']).agg({
+                'response_time_ms': ['count', 'mean', 'std', 'min', 'median', 'max'],
+                'response_size_bytes': ['mean', 'std', 'min', 'median', 'max']
+            }).round(2)
         
         print("\n" + "-" * 70)
         print("TEMPO DE RESPOSTA (ms)")
@@ -83,6 +137,99 @@ class ExperimentAnalyzer:
         
         return stats_df
     
+    def _latency_histograms(self) -> LatencyHistograms:
+        """
+        Histogramas HDR do tempo de resposta por (api_type, query_type)
+        
+        Com `histogram_files`, soma os histogramas salvos pelas execuções (sem
+        reler as medições); senão, registra as medições carregadas.
+        """
+        if self.histogram_files:
+            return LatencyHistograms.load(self.histogram_files)
+        if self.streaming:
+            return self.stream.latency_histograms()
+        
+        histograms = LatencyHistograms()
+        cells = self._cells('api_type', 'query_type')
+        for api_type, query_type in cells.labels:
+            histograms.record_array(api_type, query_type, cells.get((api_type, query_type), 'response_time_ms'))
+        return histograms
+    
+    def percentile_statistics(self):
+        print("\n" + "=" * 70)
+        print("PERCENTIS DO TEMPO DE RESPOSTA (HDR, 3 dígitos significativos)")
+        print("=" * 70)
+        
+        histograms = self._latency_histograms()
+        if self.histogram_files:
+            print(f"\n✓ Histogramas combinados de {len(self.histogram_files)} arquivos")
+        
+        rows = []
+        for (api_type, query_type), histogram in sorted(histograms.histograms.items()):
+            rows.append({'api_type': api_type, 'query_type': query_type, 'count': histogram.total_count,
+                         **summarize_ms(histogram)})
+        percentile_df = pd.DataFrame(rows).set_index(['api_type', 'query_type']).round(2)
+        
+        print()
+        print(percentile_df.to_string())
+        
+        percentile_df.to_csv(os.path.join(self.output_dir, 'percentile_statistics.csv'))
+        print(f"\n✓ Percentis salvos em: {self.output_dir}/percentile_statistics.csv")
+        
+        viz_dir = os.path.join(self.output_dir, 'visualizations')
+        os.makedirs(viz_dir, exist_ok=True)
+        self._plot_percentiles(histograms, os.path.join(viz_dir, 'latency_percentiles.png'))
+        print(f"✓ Salvo: latency_percentiles.png")
+        
+        self.results['percentiles'] = percentile_df
+        return percentile_df
+    
+    @staticmethod
+    def _plot_percentiles(histograms: LatencyHistograms, path: str):
+        """Latência por percentil no estilo HDR: eixo x em 1/(1-p), que abre a cauda, marcado nos percentis da tabela"""
+        query_types = sorted({query_type for _, query_type in histograms.histograms})
+        fig, axes = plt.subplots(1, len(query_types), figsize=(5 * len(query_types), 5), squeeze=False)
+        
+        for ax, query_type in zip(axes[0], query_types):
+            for (api_type, cell_query_type), histogram in sorted(histograms.histograms.items()):
+                if cell_query_type != query_type or not histogram.total_count:
+                    continue
+                values, counts = zip(*histogram.recorded_values())
+                quantiles = np.cumsum(counts) / histogram.total_count
+                # O último ponto (100%) iria para o infinito; fica na metade da última amostra
+                quantiles = np.minimum(quantiles, 1 - 0.5 / histogram.total_count)
+                ax.plot(1 / (1 - quantiles), np.array(values) / 1000, drawstyle='steps-post', label=api_type)
+            
+            ax.set_xscale('log')
+            ax.set_xticks([1 / (1 - p / 100) for p in REPORT_PERCENTILES])
+            ax.set_xticklabels([f"{p:g}%" for p in REPORT_PERCENTILES])
+            ax.set_title(query_type.capitalize(), fontsize=12, fontweight='bold')
+            ax.set_xlabel('Percentil')
+            ax.set_ylabel('Tempo de Resposta (ms)')
+            ax.grid(alpha=0.3)
+            ax.legend(title='API')
+        
+        fig.suptitle('Distribuição de Latência por Percentil', fontsize=14, fontweight='bold')
+        plt.tight_layout()
+        plt.savefig(path, dpi=300, bbox_inches='tight')
+        plt.close()
+    
+    def _cells(self, *keys: str) -> Partition:
+        """Métricas do DataFrame particionadas pelas chaves (calculado uma vez por combinação)"""
+        if self.streaming:
+            return self.stream.partition(*keys)
+        if keys not in self._partitions:
+            self._partitions[keys] = Partition(self.df, list(keys), METRICS)
+        return self._partitions[keys]
+    
+    def _two_sample(self, cells, metric: str, graphql_label, rest_label) -> dict:
+        """`two_sample` de duas células; no modo em fluxo, com os momentos exatos das células"""
+        moments = {}
+        if isinstance(cells, StreamPartition):
+            moments = {'graphql_moments': cells.moments(graphql_label, metric),
+                       'rest_moments': cells.moments(rest_label, metric)}
+        return two_sample(cells.get(graphql_label, metric), cells.get(rest_label, metric), **moments)
+    
     def check_normality(self):
         print("\n" + "=" * 70)
         print("TESTE DE NORMALIDADE (Shapiro-Wilk)")
@@ -90,28 +237,8 @@ class ExperimentAnalyzer:
         print("H0: Os dados seguem distribuição normal")
         print("α = 0.05")
         
-        normality_results = []
-        
-        for api_type in ['REST', 'GraphQL']:
-            for query_type in self.df['query_type'].unique():
-                for metric in ['response_time_ms', 'response_size_bytes']:
-                    data = self.df[(self.df['api_type'] == api_type) & 
-                                   (self.df['query_type'] == query_type)][metric]
-                    
-                    if len(data) >= 3:
-                        stat, p_value = shapiro(data)
-                        is_normal = p_value > 0.05
-                        
-                        normality_results.append({
-                            'api_type': api_type,
-                            'query_type': query_type,
-                            'metric': metric,
-                            'statistic': stat,
-                            'p_value': p_value,
-                            'is_normal': is_normal
-                        })
-        
-        normality_df = pd.DataFrame(normality_results)
+        normality_df = normality_table(self._cells('api_type', 'query_type'), ['REST', 'GraphQL'],
+                                       list(self.df['query_type'].unique()), METRICS)
         
         print("\n" + "-" * 70)
         print("RESULTADOS DO TESTE DE NORMALIDADE")
@@ -138,28 +265,8 @@ class ExperimentAnalyzer:
         print("H0: As variâncias são homogêneas entre os grupos")
         print("α = 0.05")
         
-        levene_results = []
-        
-        for query_type in self.df['query_type'].unique():
-            for metric in ['response_time_ms', 'response_size_bytes']:
-                rest_data = self.df[(self.df['api_type'] == 'REST') & 
-                                    (self.df['query_type'] == query_type)][metric]
-                graphql_data = self.df[(self.df['api_type'] == 'GraphQL') & 
-                                       (self.df['query_type'] == query_type)][metric]
-                
-                if len(rest_data) > 0 and len(graphql_data) > 0:
-                    stat, p_value = levene(rest_data, graphql_data)
-                    is_homogeneous = p_value > 0.05
-                    
-                    levene_results.append({
-                        'query_type': query_type,
-                        'metric': metric,
-                        'statistic': stat,
-                        'p_value': p_value,
-                        'is_homogeneous': is_homogeneous
-                    })
-        
-        levene_df = pd.DataFrame(levene_results)
+        levene_df = levene_table(self._cells('api_type', 'query_type'), list(self.df['query_type'].unique()),
+                                 METRICS)
         
         print("\n" + "-" * 70)
         print("RESULTADOS DO TESTE DE LEVENE")
@@ -171,6 +278,32 @@ class ExperimentAnalyzer:
         self.results['levene'] = levene_df
         return levene_df
     
+    def _bootstrap(self, metric: str) -> dict:
+        """
+        Intervalos bootstrap (mediana, p90, p99 e razão GraphQL/REST) da análise
+        geral ('GERAL') e de cada tipo de consulta com as duas APIs
+        """
+        if not self.bootstrap_resamples:
+            return {}
+        
+        apis = self._cells('api_type')
+        cells = self._cells('api_type', 'query_type')
+        pairs = {'GERAL': (apis.get('GraphQL', metric), apis.get('REST', metric))}
+        for query_type in sorted(self.df['query_type'].unique()):
+            graphql, rest = cells.get(('GraphQL', query_type), metric), cells.get(('REST', query_type), metric)
+            if len(rest) > 0 and len(graphql) > 0:
+                pairs[query_type] = (graphql, rest)
+        
+        return bootstrap_cells(pairs, n_resamples=self.bootstrap_resamples, workers=self.bootstrap_workers)
+    
+    @staticmethod
+    def _print_ratios(intervals: dict, indent: str = ""):
+        if not intervals:
+            return
+        for name, label in [('median', 'mediana'), ('p99', 'p99')]:
+            print(f"{indent}Razão GraphQL/REST ({label}): {intervals[f'ratio_{name}']:.3f} "
+                  f"[IC 95%: {intervals[f'ratio_{name}_ci_low']:.3f} – {intervals[f'ratio_{name}_ci_high']:.3f}]")
+    
     def rq1_analysis(self):
         print("\n" + "=" * 70)
         print("RQ1: ANÁLISE DE TEMPO DE RESPOSTA")
@@ -180,50 +313,30 @@ class ExperimentAnalyzer:
         print("α = 0.05")
         
         rq1_results = []
+        apis = self._cells('api_type')
+        cells = self._cells('api_type', 'query_type')
+        intervals = self._bootstrap('response_time_ms')
         
         print("\n" + "-" * 70)
         print("ANÁLISE GERAL (Todos os tipos de consulta)")
         print("-" * 70)
         
-        rest_times = self.df[self.df['api_type'] == 'REST']['response_time_ms']
-        graphql_times = self.df[self.df['api_type'] == 'GraphQL']['response_time_ms']
-        
-        t_stat, t_pvalue = stats.ttest_ind(graphql_times, rest_times, alternative='less')
-        
-        u_stat, u_pvalue = mannwhitneyu(graphql_times, rest_times, alternative='less')
-        
-        cohens_d = (graphql_times.mean() - rest_times.mean()) / np.sqrt(
-            ((len(graphql_times) - 1) * graphql_times.std()**2 + 
-             (len(rest_times) - 1) * rest_times.std()**2) / 
-            (len(graphql_times) + len(rest_times) - 2)
-        )
+        result = self._two_sample(apis, 'response_time_ms', 'GraphQL', 'REST')
         
-        print(f"\nREST - Tempo médio: {rest_times.mean():.2f} ms (DP: {rest_times.std():.2f})")
-        print(f"GraphQL - Tempo médio: {graphql_times.mean():.2f} ms (DP: {graphql_times.std():.2f})")
-        print(f"Diferença: {rest_times.mean() - graphql_times.mean():.2f} ms")
-        print(f"\nTeste t: t = {t_stat:.4f}, p-value = {t_pvalue:.4f}")
-        print(f"Mann-Whitney U: U = {u_stat:.4f}, p-value = {u_pvalue:.4f}")
-        print(f"Cohen's d: {cohens_d:.4f}")
+        print(f"\nREST - Tempo médio: {result['rest_mean']:.2f} ms (DP: {result['rest_std']:.2f})")
+        print(f"GraphQL - Tempo médio: {result['graphql_mean']:.2f} ms (DP: {result['graphql_std']:.2f})")
+        print(f"Diferença: {result['difference']:.2f} ms")
+        print(f"\nTeste t: t = {result['t_statistic']:.4f}, p-value = {result['t_pvalue']:.4f}")
+        print(f"Mann-Whitney U: U = {result['u_statistic']:.4f}, p-value = {result['u_pvalue']:.4f}")
+        print(f"Cohen's d: {result['cohens_d']:.4f}")
+        self._print_ratios(intervals.get('GERAL'))
         
-        if u_pvalue < 0.05:
+        if result['significant']:
             print("\n✓ RESULTADO: GraphQL é significativamente mais rápido que REST (p < 0.05)")
         else:
             print("\n✗ RESULTADO: Não há diferença significativa (p >= 0.05)")
         
-        rq1_results.append({
-            'query_type': 'GERAL',
-            'rest_mean': rest_times.mean(),
-            'rest_std': rest_times.std(),
-            'graphql_mean': graphql_times.mean(),
-            'graphql_std': graphql_times.std(),
-            'difference': rest_times.mean() - graphql_times.mean(),
-            't_statistic': t_stat,
-            't_pvalue': t_pvalue,
-            'u_statistic': u_stat,
-            'u_pvalue': u_pvalue,
-            'cohens_d': cohens_d,
-            'significant': u_pvalue < 0.05
-        })
+        rq1_results.append({'query_type': 'GERAL', **result, **intervals.get('GERAL', {})})
         
         print("\n" + "-" * 70)
         print("ANÁLISE POR TIPO DE CONSULTA")
@@ -232,45 +345,24 @@ class ExperimentAnalyzer:
         for query_type in sorted(self.df['query_type'].unique()):
             print(f"\n{query_type.upper()}:")
             
-            rest_times = self.df[(self.df['api_type'] == 'REST') & 
-                                 (self.df['query_type'] == query_type)]['response_time_ms']
-            graphql_times = self.df[(self.df['api_type'] == 'GraphQL') & 
-                                    (self.df['query_type'] == query_type)]['response_time_ms']
+            rest_times = cells.get(('REST', query_type), 'response_time_ms')
+            graphql_times = cells.get(('GraphQL', query_type), 'response_time_ms')
             
             if len(rest_times) > 0 and len(graphql_times) > 0:
-                t_stat, t_pvalue = stats.ttest_ind(graphql_times, rest_times, alternative='less')
-                u_stat, u_pvalue = mannwhitneyu(graphql_times, rest_times, alternative='less')
+                result = self._two_sample(cells, 'response_time_ms', ('GraphQL', query_type), ('REST', query_type))
                 
-                cohens_d = (graphql_times.mean() - rest_times.mean()) / np.sqrt(
-                    ((len(graphql_times) - 1) * graphql_times.std()**2 + 
-                     (len(rest_times) - 1) * rest_times.std()**2) / 
-                    (len(graphql_times) + len(rest_times) - 2)
-                )
-                
-                print(f"  REST: {rest_times.mean():.2f} ms (DP: {rest_times.std():.2f})")
-                print(f"  GraphQL: {graphql_times.mean():.2f} ms (DP: {graphql_times.std():.2f})")
-                print(f"  Diferença: {rest_times.mean() - graphql_times.mean():.2f} ms")
-                print(f"  Mann-Whitney U: p-value = {u_pvalue:.4f}")
+                print(f"  REST: {result['rest_mean']:.2f} ms (DP: {result['rest_std']:.2f})")
+                print(f"  GraphQL: {result['graphql_mean']:.2f} ms (DP: {result['graphql_std']:.2f})")
+                print(f"  Diferença: {result['difference']:.2f} ms")
+                print(f"  Mann-Whitney U: p-value = {result['u_pvalue']:.4f}")
+                self._print_ratios(intervals.get(query_type), "  ")
                 
-                if u_pvalue < 0.05:
+                if result['significant']:
                     print(f"  ✓ GraphQL significativamente mais rápido")
                 else:
                     print(f"  ✗ Sem diferença significativa")
                 
-                rq1_results.append({
-                    'query_type': query_type,
-                    'rest_mean': rest_times.mean(),
-                    'rest_std': rest_times.std(),
-                    'graphql_mean': graphql_times.mean(),
-                    'graphql_std': graphql_times.std(),
-                    'difference': rest_times.mean() - graphql_times.mean(),
-                    't_statistic': t_stat,
-                    't_pvalue': t_pvalue,
-                    'u_statistic': u_stat,
-                    'u_pvalue': u_pvalue,
-                    'cohens_d': cohens_d,
-                    'significant': u_pvalue < 0.05
-                })
+                rq1_results.append({'query_type': query_type, **result, **intervals.get(query_type, {})})
         
         rq1_df = pd.DataFrame(rq1_results)
         rq1_df.to_csv(os.path.join(self.output_dir, 'rq1_analysis.csv'), index=False)
@@ -279,6 +371,17 @@ class ExperimentAnalyzer:
         self.results['rq1'] = rq1_df
         return rq1_df
     
+    @staticmethod
+    def _with_reduction(result: dict) -> dict:
+        """Insere a redução percentual do tamanho logo após a diferença, como na tabela da RQ2"""
+        reduction = result['difference'] / result['rest_mean'] * 100
+        row = {}
+        for key, value in result.items():
+            row[key] = value
+            if key == 'difference':
+                row['reduction_percent'] = reduction
+        return row
+    
     def rq2_analysis(self):
         print("\n" + "=" * 70)
         print("RQ2: ANÁLISE DE TAMANHO DA RESPOSTA")
@@ -288,51 +391,31 @@ class ExperimentAnalyzer:
         print("α = 0.05")
         
         rq2_results = []
+        apis = self._cells('api_type')
+        cells = self._cells('api_type', 'query_type')
+        intervals = self._bootstrap('response_size_bytes')
         
         print("\n" + "-" * 70)
         print("ANÁLISE GERAL (Todos os tipos de consulta)")
         print("-" * 70)
         
-        rest_sizes = self.df[self.df['api_type'] == 'REST']['response_size_bytes']
-        graphql_sizes = self.df[self.df['api_type'] == 'GraphQL']['response_size_bytes']
-        
-        t_stat, t_pvalue = stats.ttest_ind(graphql_sizes, rest_sizes, alternative='less')
-        u_stat, u_pvalue = mannwhitneyu(graphql_sizes, rest_sizes, alternative='less')
+        result = self._with_reduction(self._two_sample(apis, 'response_size_bytes', 'GraphQL', 'REST'))
         
-        cohens_d = (graphql_sizes.mean() - rest_sizes.mean()) / np.sqrt(
-            ((len(graphql_sizes) - 1) * graphql_sizes.std()**2 + 
-             (len(rest_sizes) - 1) * rest_sizes.std()**2) / 
-            (len(graphql_sizes) + len(rest_sizes) - 2)
-        )
+        print(f"\nREST - Tamanho médio: {result['rest_mean']:.2f} bytes (DP: {result['rest_std']:.2f})")
+        print(f"GraphQL - Tamanho médio: {result['graphql_mean']:.2f} bytes (DP: {result['graphql_std']:.2f})")
+        print(f"Diferença: {result['difference']:.2f} bytes")
+        print(f"Redução percentual: {result['reduction_percent']:.2f}%")
+        print(f"\nTeste t: t = {result['t_statistic']:.4f}, p-value = {result['t_pvalue']:.4f}")
+        print(f"Mann-Whitney U: U = {result['u_statistic']:.4f}, p-value = {result['u_pvalue']:.4f}")
+        print(f"Cohen's d: {result['cohens_d']:.4f}")
+        self._print_ratios(intervals.get('GERAL'))
         
-        print(f"\nREST - Tamanho médio: {rest_sizes.mean():.2f} bytes (DP: {rest_sizes.std():.2f})")
-        print(f"GraphQL - Tamanho médio: {graphql_sizes.mean():.2f} bytes (DP: {graphql_sizes.std():.2f})")
-        print(f"Diferença: {rest_sizes.mean() - graphql_sizes.mean():.2f} bytes")
-        print(f"Redução percentual: {((rest_sizes.mean() - graphql_sizes.mean()) / rest_sizes.mean() * 100):.2f}%")
-        print(f"\nTeste t: t = {t_stat:.4f}, p-value = {t_pvalue:.4f}")
-        print(f"Mann-Whitney U: U = {u_stat:.4f}, p-value = {u_pvalue:.4f}")
-        print(f"Cohen's d: {cohens_d:.4f}")
-        
-        if u_pvalue < 0.05:
+        if result['significant']:
             print("\n✓ RESULTADO: GraphQL tem respostas significativamente menores (p < 0.05)")
         else:
             print("\n✗ RESULTADO: Não há diferença significativa (p >= 0.05)")
         
-        rq2_results.append({
-            'query_type': 'GERAL',
-            'rest_mean': rest_sizes.mean(),
-            'rest_std': rest_sizes.std(),
-            'graphql_mean': graphql_sizes.mean(),
-            'graphql_std': graphql_sizes.std(),
-            'difference': rest_sizes.mean() - graphql_sizes.mean(),
-            'reduction_percent': (rest_sizes.mean() - graphql_sizes.mean()) / rest_sizes.mean() * 100,
-            't_statistic': t_stat,
-            't_pvalue': t_pvalue,
-            'u_statistic': u_stat,
-            'u_pvalue': u_pvalue,
-            'cohens_d': cohens_d,
-            'significant': u_pvalue < 0.05
-        })
+        rq2_results.append({'query_type': 'GERAL', **result, **intervals.get('GERAL', {})})
         
         print("\n" + "-" * 70)
         print("ANÁLISE POR TIPO DE CONSULTA")
@@ -341,49 +424,27 @@ class ExperimentAnalyzer:
         for query_type in sorted(self.df['query_type'].unique()):
             print(f"\n{query_type.upper()}:")
             
-            rest_sizes = self.df[(self.df['api_type'] == 'REST') & 
-                                 (self.df['query_type'] == query_type)]['response_size_bytes']
-            graphql_sizes = self.df[(self.df['api_type'] == 'GraphQL') & 
-                                    (self.df['query_type'] == query_type)]['response_size_bytes']
+            rest_sizes = cells.get(('REST', query_type), 'response_size_bytes')
+            graphql_sizes = cells.get(('GraphQL', query_type), 'response_size_bytes')
             
             if len(rest_sizes) > 0 and len(graphql_sizes) > 0:
-                t_stat, t_pvalue = stats.ttest_ind(graphql_sizes, rest_sizes, alternative='less')
-                u_stat, u_pvalue = mannwhitneyu(graphql_sizes, rest_sizes, alternative='less')
-                
-                cohens_d = (graphql_sizes.mean() - rest_sizes.mean()) / np.sqrt(
-                    ((len(graphql_sizes) - 1) * graphql_sizes.std()**2 + 
-                     (len(rest_sizes) - 1) * rest_sizes.std()**2) / 
-                    (len(graphql_sizes) + len(rest_sizes) - 2)
+                result = self._with_reduction(
+                    self._two_sample(cells, 'response_size_bytes', ('GraphQL', query_type), ('REST', query_type))
                 )
                 
-                reduction = (rest_sizes.mean() - graphql_sizes.mean()) / rest_sizes.mean() * 100
+                print(f"  REST: {result['rest_mean']:.2f} bytes (DP: {result['rest_std']:.2f})")
+                print(f"  GraphQL: {result['graphql_mean']:.2f} bytes (DP: {result['graphql_std']:.2f})")
+                print(f"  Diferença: {result['difference']:.2f} bytes")
+                print(f"  Redução: {result['reduction_percent']:.2f}%")
+                print(f"  Mann-Whitney U: p-value = {result['u_pvalue']:.4f}")
+                self._print_ratios(intervals.get(query_type), "  ")
                 
-                print(f"  REST: {rest_sizes.mean():.2f} bytes (DP: {rest_sizes.std():.2f})")
-                print(f"  GraphQL: {graphql_sizes.mean():.2f} bytes (DP: {graphql_sizes.std():.2f})")
-                print(f"  Diferença: {rest_sizes.mean() - graphql_sizes.mean():.2f} bytes")
-                print(f"  Redução: {reduction:.2f}%")
-                print(f"  Mann-Whitney U: p-value = {u_pvalue:.4f}")
-                
-                if u_pvalue < 0.05:
+                if result['significant']:
                     print(f"  ✓ GraphQL significativamente menor")
                 else:
                     print(f"  ✗ Sem diferença significativa")
                 
-                rq2_results.append({
-                    'query_type': query_type,
-                    'rest_mean': rest_sizes.mean(),
-                    'rest_std': rest_sizes.std(),
-                    'graphql_mean': graphql_sizes.mean(),
-                    'graphql_std': graphql_sizes.std(),
-                    'difference': rest_sizes.mean() - graphql_sizes.mean(),
-                    'reduction_percent': reduction,
-                    't_statistic': t_stat,
-                    't_pvalue': t_pvalue,
-                    'u_statistic': u_stat,
-                    'u_pvalue': u_pvalue,
-                    'cohens_d': cohens_d,
-                    'significant': u_pvalue < 0.05
-                })
+                rq2_results.append({'query_type': query_type, **result, **intervals.get(query_type, {})})
         
         rq2_df = pd.DataFrame(rq2_results)
         rq2_df.to_csv(os.path.join(self.output_dir, 'rq2_analysis.csv'), index=False)
@@ -397,6 +458,8 @@ class ExperimentAnalyzer:
         print("ANOVA BIDIRECIONAL")
         print("=" * 70)
         print("Análise de interação: Tipo de API × Tipo de Consulta")
+        if self.streaming:
+            print("(calculada sobre a amostra de reservatório de cada célula)")
         
         anova_results = {}
         
@@ -600,7 +663,7 @@ class ExperimentAnalyzer:
             f.write("=" * 70 + "\n\n")
             f.write(f"Data da Análise: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Arquivo de Dados: {self.data_file}\n")
-            f.write(f"Total de Medições Analisadas: {len(self.df)}\n\n")
+            f.write(f"Total de Medições Analisadas: {self.analyzed_count}\n\n")
             
             f.write("=" * 70 + "\n")
             f.write("RQ1: TEMPO DE RESPOSTA\n")
@@ -646,6 +709,7 @@ class ExperimentAnalyzer:
             f.write("\n" + "=" * 70 + "\n")
             f.write("Arquivos gerados:\n")
             f.write("  - descriptive_statistics.csv\n")
+            f.write("  - percentile_statistics.csv\n")
             f.write("  - normality_test.csv\n")
             f.write("  - levene_test.csv\n")
             f.write("  - rq1_analysis.csv\n")
@@ -665,6 +729,7 @@ class ExperimentAnalyzer:
         start_time = datetime.now()
         
         self.descriptive_statistics()
+        self.percentile_statistics()
         self.check_normality()
         self.check_variance_homogeneity()
         self.rq1_analysis()
@@ -684,11 +749,144 @@ class ExperimentAnalyzer:
         print("=" * 70)
 
 
+def parse_condition(text: str):
+    """Converte COLUNA=VALOR (ou COLUNA=V1,V2) num filtro de igualdade"""
+    column, _, value = text.partition('=')
+    if not column or not value:
+        raise argparse.ArgumentTypeError(f"filtro inválido (use COLUNA=VALOR): {text}")
+    
+    def convert(item: str):
+        return {'true': True, 'false': False}.get(item.lower(), item)
+    
+    values = [convert(item) for item in value.split(',')]
+    return column, values if len(values) > 1 else values[0]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Análise estatística do experimento GraphQL vs REST",
+                                     epilog="Para comparar execuções: analyze_results.py compare --help")
+    parser.add_argument("data_file", nargs="?", default=None,
+                        help="CSV de resultados, registro JSONL, arquivo Parquet/Arrow ou diretório do conjunto particionado "
+                             "(padrão: CSV mais recente em results/)")
+    parser.add_argument("--where", type=parse_condition, action="append", default=[], metavar="COLUNA=VALOR",
+                        help="Filtra as medições (ex.: --where api_type=GraphQL --where run_id=experiment_...); "
+                             "em Parquet/Arrow o filtro é aplicado na leitura")
+    parser.add_argument("--histograms", nargs="+", default=None, metavar="JSON",
+                        help="Calcula os percentis somando os histogramas salvos por várias execuções "
+                             "(experiment_*_histograms.json) em vez das medições carregadas")
+    parser.add_argument("--bootstrap-resamples", type=int, default=DEFAULT_RESAMPLES,
+                        help="Reamostragens dos intervalos de confiança da RQ1/RQ2 (0 desativa)")
+    parser.add_argument("--bootstrap-workers", type=int, default=None,
+                        help="Processos que dividem as células do bootstrap (padrão: processo atual)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Lê as medições em blocos com memória limitada: médias, desvios, testes t e "
+                             "percentis usam todas as medições; testes de posto, ANOVA e gráficos, uma amostra")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Linhas por bloco no modo --streaming")
+    parser.add_argument("--reservoir-size", type=int, default=DEFAULT_RESERVOIR_SIZE,
+                        help="Medições amostradas por célula no modo --streaming")
+    return parser.parse_args()
+
+
+def parse_compare_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="analyze_results.py compare",
+        description="Compara uma execução candidata com uma linha de base e sai com status 1 se houver regressão")
+    parser.add_argument("--baseline", nargs="+", default=None, metavar="ARQUIVO",
+                        help="Execução(ões) de referência (CSV, JSONL, Parquet/Arrow ou partição do conjunto); "
+                             "várias são somadas")
+    parser.add_argument("--candidate", nargs="+", default=None, metavar="ARQUIVO",
+                        help="Execução(ões) avaliada(s)")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Sem --baseline/--candidate: compara a execução mais recente de --runs-dir "
+                             "com as N anteriores")
+    parser.add_argument("--runs-dir", default="results",
+                        help="Diretório com experiment_*.csv ou do conjunto particionado (padrão: results)")
+    parser.add_argument("--where", type=parse_condition, action="append", default=[], metavar="COLUNA=VALOR",
+                        help="Filtra as medições dos dois lados")
+    parser.add_argument("--metric", choices=METRICS, action="append", default=None,
+                        help="Métrica comparada (padrão: todas)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help="Nível de significância, após a correção de Holm")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="|Delta de Cliff| mínimo para uma mudança de posição")
+    parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                        help="Variação relativa mínima da mediana (0.05 = 5%%)")
+    parser.add_argument("--min-tail-change", type=float, default=DEFAULT_MIN_TAIL_CHANGE,
+                        help="Variação relativa mínima do p99 para uma mudança na cauda")
+    parser.add_argument("--report", default=os.path.join("results", "regression_report.json"),
+                        help="Relatório JSON gerado (padrão: results/regression_report.json)")
+    args = parser.parse_args(argv)
+    
+    if bool(args.baseline) != bool(args.candidate):
+        parser.error("--baseline e --candidate devem ser usados juntos")
+    if not args.baseline and args.window is None:
+        parser.error("informe --baseline/--candidate ou --window")
+    if args.window is not None and args.window < 1:
+        parser.error("--window deve ser pelo menos 1")
+    if not args.baseline:
+        try:
+            runs = rolling_window(args.runs_dir, args.window)
+        except ValueError as e:
+            parser.error(str(e))
+        args.baseline, args.candidate = runs['baseline'], runs['candidate']
+    return args
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    """Executa o modo compare; retorna o status de saída (1 se houver regressão)"""
+    print("\n" + "=" * 70)
+    print("DETECÇÃO DE REGRESSÕES ENTRE EXECUÇÕES")
+    print("=" * 70)
+    
+    runs = {'baseline': args.baseline, 'candidate': args.candidate}
+    conditions = dict(args.where)
+    baseline = load_runs(runs['baseline'], conditions)
+    candidate = load_runs(runs['candidate'], conditions)
+    print(f"\n✓ Linha de base: {len(baseline)} medições de {len(runs['baseline'])} execução(ões)")
+    for path in runs['baseline']:
+        print(f"  - {path}")
+    print(f"✓ Candidata: {len(candidate)} medições de {len(runs['candidate'])} execução(ões)")
+    for path in runs['candidate']:
+        print(f"  - {path}")
+    
+    thresholds = {'alpha': args.alpha, 'min_delta': args.min_delta, 'min_change': args.min_change,
+                  'min_tail_change': args.min_tail_change}
+    rows = compare_runs(baseline, candidate, metrics=args.metric, **thresholds)
+    report = build_report(rows, runs['baseline'], runs['candidate'], thresholds)
+    
+    symbols = {REGRESSION: '✗', IMPROVEMENT: '✓', MISSING: '?'}
+    print("\n" + "-" * 70)
+    for row in rows:
+        label = f"{row['api_type']}/{row['query_type']} {row['metric']}"
+        if row['status'] == MISSING:
+            print(f"  ? {label}: ausente em um dos lados "
+                  f"(base: {row['baseline_count']}, candidata: {row['candidate_count']})")
+            continue
+        print(f"  {symbols.get(row['status'], ' ')} {label}: mediana {row['median_change']:+.1%}, "
+              f"p99 {row['p99_change']:+.1%}, delta de Cliff {row['cliffs_delta']:+.3f}, "
+              f"p(U) = {row['u_pvalue_adjusted']:.4f}, p(KS) = {row['ks_pvalue_adjusted']:.4f} "
+              f"[{row['status']}]")
+    
+    save_report(report, args.report)
+    print("\n" + "-" * 70)
+    print(f"Regressões: {report['regressions']} | Melhoras: {report['improvements']} | "
+          f"Ausentes: {report['missing']}")
+    print(f"✓ Relatório salvo em: {args.report}")
+    
+    return 1 if report['regressions'] else 0
+
+
 def main():
     import sys
     
-    if len(sys.argv) > 1:
-        data_file = sys.argv[1]
+    if sys.argv[1:2] == ['compare']:
+        sys.exit(run_compare(parse_compare_args(sys.argv[2:])))
+    
+    args = parse_args()
+    
+    if args.data_file:
+        data_file = args.data_file
     else:
         import glob
         csv_files = glob.glob('results/experiment_*.csv')
@@ -700,7 +898,11 @@ def main():
         data_file = max(csv_files, key=os.path.getmtime)
         print(f"\n✓ Usando arquivo de dados mais recente: {data_file}")
     
-    analyzer = ExperimentAnalyzer(data_file)
+    analyzer = ExperimentAnalyzer(data_file, conditions=dict(args.where),
+                                  bootstrap_resamples=args.bootstrap_resamples,
+                                  bootstrap_workers=args.bootstrap_workers,
+                                  histogram_files=args.histograms, streaming=args.streaming,
+                                  chunksize=args.chunksize, reservoir_size=args.reservoir_size)
     analyzer.run_full_analysis()
 
 
@@ -0,0 +1,121 @@
+"""
+Cliente GraphQL assíncrono para o experimento GraphQL vs REST
+Mesma interface do GraphQLClient, sobre httpx.AsyncClient
+"""
+
+import time
+from typing import Dict, Any, Tuple
+import httpx
+from json_codec import JSONCodec
+from transport import PhaseTracer, add_phases, response_sizes
+from graphql_client import (
+    GITHUB_API_URL,
+    USER_SIMPLE_QUERY,
+    REPOSITORY_SIMPLE_QUERY,
+    USER_WITH_REPOS_QUERY,
+    REPO_WITH_ISSUES_QUERY,
+    SEARCH_REPOSITORIES_QUERY,
+    SEARCH_USERS_QUERY,
+    USER_REPOS_PAGINATED_QUERY,
+    REPO_COMMITS_PAGINATED_QUERY,
+)
+
+
+class AsyncGraphQLClient:
+    """Cliente GraphQL assíncrono que pode compartilhar o pool de conexões com outros clientes"""
+
+    def __init__(self, token: str = None, http_client: httpx.AsyncClient = None, base_url: str = GITHUB_API_URL,
+                 codec: JSONCodec = None):
+        self.url = f"{base_url.rstrip('/')}/graphql"
+        self.headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "GraphQL-REST-Experiment"
+        }
+
+        if token:
+            self.headers["Authorization"] = f"bearer {token}"
+        elif base_url == GITHUB_API_URL:
+            raise ValueError("Token do GitHub é obrigatório para usar a API GraphQL")
+
+        self.codec = codec or JSONCodec()
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(timeout=30)
+
+    async def _execute_query(self, query: str, variables: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        start_time = time.perf_counter()
+
+        try:
+            tracer = PhaseTracer()
+            response = await self.http_client.post(
+                self.url, json=payload, headers=self.headers, timeout=30, extensions={"trace": tracer.atrace}
+            )
+            response.raise_for_status()
+
+            end_time = time.perf_counter()
+
+            response_time_ms = (end_time - start_time) * 1000
+            response_size_bytes = len(response.content)
+
+            decode_start = time.perf_counter()
+            data = self.codec.loads(response.content)
+            tracer.phases["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+            tracer.phases["json_backend"] = self.codec.backend
+            tracer.phases.update(response_sizes(response))
+            tracer.phases["http_version"] = response.http_version
+            add_phases(tracer.phases)
+
+            if "errors" in data:
+                print(f"Erros GraphQL: {data['errors']}")
+                raise Exception(f"GraphQL errors: {data['errors']}")
+
+            return data["data"], response_time_ms, response_size_bytes
+
+        except httpx.HTTPError as e:
+            print(f"Erro na requisição GraphQL: {e}")
+            raise
+
+    async def get_user_simple(self, username: str) -> Tuple[Dict, float, int]:
+        variables = {"login": username}
+        return await self._execute_query(USER_SIMPLE_QUERY, variables)
+
+    async def get_repository_simple(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
+        variables = {"owner": owner, "name": repo}
+        return await self._execute_query(REPOSITORY_SIMPLE_QUERY, variables)
+
+    async def get_user_with_repos(self, username: str) -> Tuple[Dict, float, int]:
+        variables = {"login": username}
+        return await self._execute_query(USER_WITH_REPOS_QUERY, variables)
+
+    async def get_repo_with_issues(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
+        variables = {"owner": owner, "name": repo}
+        return await self._execute_query(REPO_WITH_ISSUES_QUERY, variables)
+
+    async def search_repositories(self, query_string: str, first: int = 10) -> Tuple[Dict, float, int]:
+        variables = {"queryString": query_string, "first": first}
+        return await self._execute_query(SEARCH_REPOSITORIES_QUERY, variables)
+
+    async def search_users(self, query_string: str, first: int = 10) -> Tuple[Dict, float, int]:
+        variables = {"queryString": query_string, "first": first}
+        return await self._execute_query(SEARCH_USERS_QUERY, variables)
+
+    async def get_user_repos_paginated(self, username: str, first: int = 10, after: str = None) -> Tuple[Dict, float, int]:
+        variables = {"login": username, "first": first}
+        if after:
+            variables["after"] = after
+
+        return await self._execute_query(USER_REPOS_PAGINATED_QUERY, variables)
+
+    async def get_repo_commits_paginated(self, owner: str, repo: str, first: int = 10, after: str = None) -> Tuple[Dict, float, int]:
+        variables = {"owner": owner, "name": repo, "first": first}
+        if after:
+            variables["after"] = after
+
+        return await self._execute_query(REPO_COMMITS_PAGINATED_QUERY, variables)
+
+    async def close(self):
+        if self._owns_client:
+            await self.http_client.aclose()
@@ -0,0 +1,152 @@
+"""
+Cliente REST assíncrono para o experimento GraphQL vs REST
+Mesma interface do RESTClient, sobre httpx.AsyncClient
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Tuple
+import httpx
+from json_codec import JSONCodec
+from transport import PhaseTracer, add_phases, response_sizes
+from rest_client import GITHUB_API_URL
+
+
+class AsyncRESTClient:
+    """Cliente REST assíncrono que pode compartilhar o pool de conexões com outros clientes"""
+
+    def __init__(self, token: str = None, http_client: httpx.AsyncClient = None, base_url: str = GITHUB_API_URL,
+                 codec: JSONCodec = None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "GraphQL-REST-Experiment"
+        }
+
+        if token:
+            self.headers["Authorization"] = f"token {token}"
+
+        self.codec = codec or JSONCodec()
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(timeout=30)
+
+    async def _get(self, url: str, params: Dict = None) -> Tuple[httpx.Response, PhaseTracer]:
+        tracer = PhaseTracer()
+        response = await self.http_client.get(
+            url, params=params, headers=self.headers, timeout=30, extensions={"trace": tracer.atrace}
+        )
+        response.raise_for_status()
+        return response, tracer
+
+    def _decode(self, response: httpx.Response, tracer: PhaseTracer) -> Dict[Any, Any]:
+        """Decodifica fora do tempo medido, como os demais clientes"""
+        decode_start = time.perf_counter()
+        data = self.codec.loads(response.content)
+        tracer.phases["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+        tracer.phases["json_backend"] = self.codec.backend
+        tracer.phases.update(response_sizes(response))
+        tracer.phases["http_version"] = response.http_version
+        add_phases(tracer.phases)
+        return data
+
+    async def _make_request(self, url: str, params: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
+        start_time = time.perf_counter()
+
+        try:
+            response, tracer = await self._get(url, params)
+            response_time_ms = (time.perf_counter() - start_time) * 1000
+            return self._decode(response, tracer), response_time_ms, len(response.content)
+
+        except httpx.HTTPError as e:
+            print(f"Erro na requisição REST: {e}")
+            raise
+
+    async def _make_requests(self, *requests: Tuple[str, Dict]) -> Tuple[list, float, int]:
+        """
+        Busca sub-recursos independentes em paralelo; o tempo é o da requisição mais lenta
+
+        As respostas só são decodificadas depois que todas chegam, para que a
+        decodificação de uma não atrase (nem entre no tempo de) outra.
+        """
+        start_time = time.perf_counter()
+
+        responses = await asyncio.gather(*(self._get(url, params) for url, params in requests))
+
+        total_time_ms = (time.perf_counter() - start_time) * 1000
+        total_size = sum(len(response.content) for response, _ in responses)
+
+        return [self._decode(response, tracer) for response, tracer in responses], total_time_ms, total_size
+
+    async def get_user_simple(self, username: str) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/users/{username}"
+        return await self._make_request(url)
+
+    async def get_repository_simple(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/repos/{owner}/{repo}"
+        return await self._make_request(url)
+
+    async def get_user_with_repos(self, username: str) -> Tuple[Dict, float, int]:
+        (user_data, repos_data), total_time_ms, total_size = await self._make_requests(
+            (f"{self.base_url}/users/{username}", None),
+            (f"{self.base_url}/users/{username}/repos", {"per_page": 10})
+        )
+
+        combined_data = {
+            "user": user_data,
+            "repositories": repos_data
+        }
+
+        return combined_data, total_time_ms, total_size
+
+    async def get_repo_with_issues(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
+        (repo_data, issues_data), total_time_ms, total_size = await self._make_requests(
+            (f"{self.base_url}/repos/{owner}/{repo}", None),
+            (f"{self.base_url}/repos/{owner}/{repo}/issues", {"per_page": 10, "state": "all"})
+        )
+
+        combined_data = {
+            "repository": repo_data,
+            "issues": issues_data
+        }
+
+        return combined_data, total_time_ms, total_size
+
+    async def search_repositories(self, query: str, per_page: int = 10) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/search/repositories"
+        params = {
+            "q": query,
+            "per_page": per_page,
+            "sort": "stars",
+            "order": "desc"
+        }
+        return await self._make_request(url, params)
+
+    async def search_users(self, query: str, per_page: int = 10) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/search/users"
+        params = {
+            "q": query,
+            "per_page": per_page
+        }
+        return await self._make_request(url, params)
+
+    async def get_user_repos_paginated(self, username: str, per_page: int = 10, page: int = 1) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/users/{username}/repos"
+        params = {
+            "per_page": per_page,
+            "page": page,
+            "sort": "updated",
+            "direction": "desc"
+        }
+        return await self._make_request(url, params)
+
+    async def get_repo_commits_paginated(self, owner: str, repo: str, per_page: int = 10, page: int = 1) -> Tuple[Dict, float, int]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/commits"
+        params = {
+            "per_page": per_page,
+            "page": page
+        }
+        return await self._make_request(url, params)
+
+    async def close(self):
+        if self._owns_client:
+            await self.http_client.aclose()
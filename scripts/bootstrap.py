@@ -0,0 +1,110 @@
+"""
+Intervalos de confiança bootstrap para as diferenças entre GraphQL e REST
+Reamostra cada célula com uma matriz de índices do NumPy (sem laço Python
+por reamostragem) e calcula, de uma vez, a mediana, o p90 e o p99 de cada
+API e a razão GraphQL/REST; as células podem ser distribuídas entre
+processos
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+
+# Estatística -> percentil
+BOOTSTRAP_STATISTICS = {'median': 50, 'p90': 90, 'p99': 99}
+
+DEFAULT_RESAMPLES = 10000
+
+# Limite de elementos da matriz de reamostragem processada por vez (~160 MB em float64)
+MAX_RESAMPLE_ELEMENTS = 20_000_000
+
+
+def bootstrap_columns() -> List[str]:
+    """Colunas acrescentadas às tabelas da RQ1/RQ2, na ordem em que são gravadas"""
+    columns = []
+    for name in BOOTSTRAP_STATISTICS:
+        for label in ('rest', 'graphql', 'ratio'):
+            columns += [f'{label}_{name}', f'{label}_{name}_ci_low', f'{label}_{name}_ci_high']
+    return columns
+
+
+def _resample_percentiles(values: np.ndarray, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Percentis de BOOTSTRAP_STATISTICS em cada reamostragem: matriz (n_resamples, estatísticas)"""
+    percentiles = list(BOOTSTRAP_STATISTICS.values())
+    n = len(values)
+    if n == 0:
+        # Célula vazia (ex.: um filtro --where que exclui uma das APIs): tudo NaN
+        return np.full((n_resamples, len(percentiles)), np.nan)
+    batch = max(1, MAX_RESAMPLE_ELEMENTS // n)
+    result = np.empty((n_resamples, len(percentiles)))
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        indices = rng.integers(0, n, size=(size, n))
+        result[start:start + size] = np.percentile(values[indices], percentiles, axis=1).T
+    return result
+
+
+def _point_percentiles(values: np.ndarray) -> np.ndarray:
+    percentiles = list(BOOTSTRAP_STATISTICS.values())
+    return np.percentile(values, percentiles) if len(values) else np.full(len(percentiles), np.nan)
+
+
+def bootstrap_cell(graphql: np.ndarray, rest: np.ndarray, n_resamples: int = DEFAULT_RESAMPLES,
+                   confidence: float = 0.95, seed=None) -> Dict[str, float]:
+    """
+    Estimativas pontuais e intervalos percentis de uma célula
+
+    GraphQL e REST são reamostrados de forma independente; a razão é
+    calculada entre as reamostragens de mesma posição. Um lado vazio
+    resulta em NaN nas suas colunas e nas da razão.
+    """
+    graphql = np.asarray(graphql, dtype=float)
+    rest = np.asarray(rest, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    graphql_dist = _resample_percentiles(graphql, n_resamples, rng)
+    rest_dist = _resample_percentiles(rest, n_resamples, rng)
+    graphql_point = _point_percentiles(graphql)
+    rest_point = _point_percentiles(rest)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio_dist = graphql_dist / rest_dist
+        ratio_point = graphql_point / rest_point
+
+    alpha = (1 - confidence) / 2 * 100
+    bounds = [alpha, 100 - alpha]
+    row = {}
+    for j, name in enumerate(BOOTSTRAP_STATISTICS):
+        for label, point, dist in (('rest', rest_point, rest_dist), ('graphql', graphql_point, graphql_dist),
+                                   ('ratio', ratio_point, ratio_dist)):
+            finite = dist[:, j][np.isfinite(dist[:, j])]
+            low, high = np.percentile(finite, bounds) if len(finite) else (np.nan, np.nan)
+            row[f'{label}_{name}'] = point[j]
+            row[f'{label}_{name}_ci_low'] = low
+            row[f'{label}_{name}_ci_high'] = high
+    return row
+
+
+def _bootstrap_job(job: Tuple) -> Dict[str, float]:
+    return bootstrap_cell(*job)
+
+
+def bootstrap_cells(cells: Dict[Hashable, Tuple[np.ndarray, np.ndarray]], n_resamples: int = DEFAULT_RESAMPLES,
+                    confidence: float = 0.95, workers: int = None, seed: int = 0) -> Dict[Hashable, Dict[str, float]]:
+    """
+    Intervalos de várias células, cada uma com (valores GraphQL, valores REST)
+
+    Cada célula recebe uma semente derivada de `seed`, então o resultado é o
+    mesmo com ou sem processos (`workers` > 1).
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    jobs = [(graphql, rest, n_resamples, confidence, cell_seed)
+            for (graphql, rest), cell_seed in zip(cells.values(), seeds)]
+
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            rows = list(executor.map(_bootstrap_job, jobs))
+    else:
+        rows = [_bootstrap_job(job) for job in jobs]
+    return dict(zip(cells, rows))
@@ -3,27 +3,93 @@ Script principal para execução do experimento GraphQL vs REST
 Coordena a execução dos tratamentos e coleta de dados
 """
 
+import argparse
+import asyncio
 import time
 import random
 import csv
-import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Dict, Tuple
 import os
-from rest_client import RESTClient
+import httpx
+from rest_client import RESTClient, GITHUB_API_URL
 from graphql_client import GraphQLClient
+from async_rest_client import AsyncRESTClient
+from async_graphql_client import AsyncGraphQLClient
+from transport import capture_phases, PHASE_COLUMNS, SIZE_COLUMNS, TRANSPORTS
+from local_server import LocalServer, LocalGitHubAPI
+from http_cache import ResponseCache
+from graphql_batcher import BatchingGraphQLClient
+from rate_limiter import RateLimitScheduler
+from resilience import RetryPolicy, RESILIENCE_COLUMNS, resilience_metrics
+from timing import calibrate_timer, measure_cpu, CPU_COLUMNS
+from json_codec import JSONCodec, JSON_BACKENDS
+from treatments import TreatmentRegistry, Treatment, API_SIDES, DEFAULT_TREATMENTS_FILE
+from result_log import ResultLog, checkpoint_key
+from result_store import write_results, STORE_FORMATS
+from hdr_histogram import LatencyHistograms, REPORT_PERCENTILES
 from dotenv import load_dotenv
 
 load_dotenv()
 
+CACHED_REST_API = "REST-Cache"
+PERSISTED_GRAPHQL_API = "GraphQL-Persisted"
+BATCHED_GRAPHQL_API = "GraphQL-Batch"
+
+ACCEPT_ENCODINGS = ["identity", "gzip", "br"]
+CONNECTION_MODES = ["reuse", "fresh", "warmup"]
+OUTPUT_FORMATS = ["csv", "json"] + list(STORE_FORMATS)
+
 class ExperimentRunner:
 
     
-    def __init__(self, token: str, output_dir: str = "results"):
-        self.rest_client = RESTClient(token)
-        self.graphql_client = GraphQLClient(token)
+    def __init__(self, token: str, output_dir: str = "results", base_url: str = GITHUB_API_URL, delay: float = None,
+                 rest_cache: ResponseCache = None, persisted_queries: bool = False, batch_window_ms: float = None,
+                 transport: str = "http1", concurrent_requests: bool = False, connection_mode: str = "reuse",
+                 rate_limit_field: bool = False, max_throttle_retries: int = 5, collection_size: int = None,
+                 retry_policy: RetryPolicy = None, codec: JSONCodec = None,
+                 treatments_file: str = DEFAULT_TREATMENTS_FILE, result_log: ResultLog = None,
+                 output_formats: List[str] = None):
+        self.token = token
+        self.base_url = base_url
+        self.scheduler = RateLimitScheduler(min_interval=delay)
+        self.max_throttle_retries = max_throttle_retries
+        self.transport = transport
+        self.connection_mode = connection_mode
+        self.accept_encoding = None
+        self.collection_size = collection_size
+        self.codec = codec or JSONCodec()
+        self.registry = TreatmentRegistry(treatments_file)
+        self.resolvers = {"latest_repo": self._latest_repo}
+        self._resolved = {}
+        self.rest_client = RESTClient(token, base_url, transport=transport, concurrent_requests=concurrent_requests,
+                                      retry_policy=retry_policy, codec=self.codec)
+        self.graphql_client = GraphQLClient(token, base_url, transport=transport, rate_limit_field=rate_limit_field,
+                                            retry_policy=retry_policy, codec=self.codec)
+        self.cached_rest_client = (
+            RESTClient(token, base_url, cache=rest_cache, transport=transport, concurrent_requests=concurrent_requests,
+                       retry_policy=retry_policy, codec=self.codec)
+            if rest_cache is not None else None
+        )
+        self.persisted_graphql_client = (
+            GraphQLClient(token, base_url, persisted_queries=True, transport=transport, rate_limit_field=rate_limit_field,
+                          retry_policy=retry_policy, codec=self.codec)
+            if persisted_queries else None
+        )
+        self.batching_graphql_client = (
+            BatchingGraphQLClient(token, base_url, window_ms=batch_window_ms, transport=transport,
+                                  rate_limit_field=rate_limit_field, retry_policy=retry_policy, codec=self.codec,
+                                  scheduler=self.scheduler)
+            if batch_window_ms is not None else None
+        )
         self.output_dir = output_dir
+        self.output_formats = output_formats or ["csv", "json"]
         self.results = []
+        self.result_log = result_log
+        self.completed_repetitions = {}
+        self.timer_calibration = calibrate_timer()
         
         os.makedirs(output_dir, exist_ok=True)
     
@@ -35,7 +101,8 @@ class ExperimentRunner:
         response_time_ms: float, 
         response_size_bytes: int,
         success: bool = True,
-        error_msg: str = None
+        error_msg: str = None,
+        metrics: Dict = None
     ):
         """
         Registra uma medição do experimento
@@ -48,6 +115,7 @@ class ExperimentRunner:
             response_size_bytes: Tamanho da resposta em bytes
             success: Se a consulta foi bem-sucedida
             error_msg: Mensagem de erro (se houver)
+            metrics: Métricas adicionais do cliente (ex.: tempos por fase da requisição)
         """
         measurement = {
             "timestamp": datetime.now().isoformat(),
@@ -59,142 +127,188 @@ class ExperimentRunner:
             "success": success,
             "error_msg": error_msg
         }
+        measurement["accept_encoding"] = self.accept_encoding
+        measurement["http_version"] = None
+        measurement["connection_mode"] = self.connection_mode
+        measurement.update(dict.fromkeys(PHASE_COLUMNS))
+        measurement.update(dict.fromkeys(SIZE_COLUMNS))
+        measurement.update(dict.fromkeys(["connections_opened", "pool_connections"]))
+        measurement.update(dict.fromkeys(RESILIENCE_COLUMNS))
+        measurement.update(dict.fromkeys(CPU_COLUMNS))
+        measurement.update(self.timer_calibration)
+        if metrics:
+            measurement.update((k, v) for k, v in metrics.items() if k not in measurement or measurement[k] is None)
+        opened = measurement["connections_opened"]
+        measurement["connection_reused"] = None if opened is None else opened == 0
         self.results.append(measurement)
+        if self.result_log:
+            self.result_log.append(measurement)
     
-    def run_simple_queries(self, repetitions: int = 30):
-        print("\n" + "=" * 60)
-        print("EXECUTANDO TRATAMENTOS T1 e T2: Consultas Simples")
-        print("=" * 60)
+    def resume(self):
+        """Recarrega as medições do registro incremental e as repetições já concluídas de cada tratamento"""
+        measurements, completed = self.result_log.recover()
+        self.results.extend(measurements)
+        self.completed_repetitions.update(completed)
+        print(f"\n✓ Retomando {self.result_log.path}: {len(measurements)} medições de "
+              f"{sum(completed.values())} repetições concluídas")
+    
+    def _completed(self, treatment_name: str) -> int:
+        return self.completed_repetitions.get(checkpoint_key(self.accept_encoding, treatment_name), 0)
+    
+    def _checkpoint(self, treatment_name: str, repetition: int):
+        self.completed_repetitions[checkpoint_key(self.accept_encoding, treatment_name)] = repetition
+        if self.result_log:
+            self.result_log.checkpoint(self.accept_encoding, treatment_name, repetition)
+    
+    def _measure(self, api_type: str, client, query_type: str, query_name: str, method: str, *args, **kwargs):
+        """
+        Executa uma consulta do cliente no ritmo do agendador e registra a medição (ou o erro)
         
-        test_users = ["torvalds", "gvanrossum", "mojombo", "defunkt", "pjhyett"]
+        Respostas de limite de taxa excedido não viram medições com erro: a
+        consulta é repetida depois da espera indicada pela API.
+        """
+        if self.connection_mode == "fresh" and client is not self.batching_graphql_client:
+            client.transport.reset_connections()
         
-        for i in range(repetitions):
-            user = random.choice(test_users)
-            
-            try:
-                print(f"\n[{i+1}/{repetitions}] T1 - REST: Consultando usuário {user}")
-                _, time_ms, size_bytes = self.rest_client.get_user_simple(user)
-                self._record_measurement("REST", "simples", "get_user", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("REST", "simples", "get_user", 0, 0, False, str(e))
-            
-            time.sleep(1)
-            
+        resource = self._rate_limit_resource(client, method)
+        throttled = 0
+        
+        while True:
+            # O cliente agrupado dita o ritmo de cada lote (requisição HTTP), não de cada chamada
+            if client is not self.batching_graphql_client:
+                self.scheduler.acquire(resource)
             try:
-                print(f"[{i+1}/{repetitions}] T2 - GraphQL: Consultando usuário {user}")
-                _, time_ms, size_bytes = self.graphql_client.get_user_simple(user)
-                self._record_measurement("GraphQL", "simples", "get_user", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
+                with measure_cpu() as cpu:
+                    _, time_ms, size_bytes = getattr(client, method)(*args, **kwargs)
             except Exception as e:
+                wait = self.scheduler.throttle_delay(resource, e, client.last_metrics)
+                if wait is not None and throttled < self.max_throttle_retries:
+                    throttled += 1
+                    print(f"  ⏳ Limite de requisições atingido ({resource}); aguardando {wait:.1f} s")
+                    continue
                 print(f"  ✗ Erro: {e}")
-                self._record_measurement("GraphQL", "simples", "get_user", 0, 0, False, str(e))
-            
-            time.sleep(1)
+                self._record_measurement(api_type, query_type, query_name, 0, 0, False, str(e),
+                                         metrics=dict(resilience_metrics(e), throttled_retries=throttled))
+                return
+            break
+        
+        self.scheduler.observe(resource, client.last_metrics)
+        self._record_measurement(api_type, query_type, query_name, time_ms, size_bytes,
+                                 metrics=dict(client.last_metrics, throttled_retries=throttled, **cpu))
+        cache_status = client.last_metrics.get("cache_status")
+        suffix = f" | Cache: {cache_status}" if cache_status else ""
+        persisted = client.last_metrics.get("persisted_query")
+        suffix += f" | Consulta persistida: {persisted}" if persisted else ""
+        retries = client.last_metrics.get("retries")
+        suffix += f" | Novas tentativas: {retries}" if retries else ""
+        suffix += " | Duplicada venceu" if client.last_metrics.get("hedge_won") else ""
+        items_per_second = client.last_metrics.get("items_per_second")
+        if items_per_second:
+            suffix += f" | {client.last_metrics['request_count']} requisições, {items_per_second:.0f} itens/s"
+        client_cpu_ms = cpu['client_thread_cpu_ms'] + cpu['client_worker_cpu_ms']
+        print(f"  ✓ Tempo: {time_ms:.2f} ms | CPU: {client_cpu_ms:.2f} ms | "
+              f"Tamanho: {size_bytes} bytes{suffix}")
+    
+    @staticmethod
+    def _rate_limit_resource(client, method: str) -> str:
+        if isinstance(client, GraphQLClient):
+            return "graphql"
+        return "search" if method.startswith("search") else "core"
+    
+    def _settings(self) -> Dict:
+        """Configurações que os tratamentos do registro podem usar (`setting`/`requires`)"""
+        return {"collection_size": self.collection_size}
+    
+    def _resolve(self, name: str, args: List):
+        """Executa um resolvedor do registro uma única vez para cada combinação de argumentos"""
+        key = (name, tuple(args))
+        if key not in self._resolved:
+            self._resolved[key] = self.resolvers[name](*args)
+        return self._resolved[key]
     
-    def run_relationship_queries(self, repetitions: int = 30):
+    def _latest_repo(self, owner: str) -> str:
+        repos, _, _ = self.rest_client.get_user_repos_paginated(owner, per_page=1)
+        return repos[0]["name"]
+    
+    def _variants(self, side: str) -> List[Tuple[str, object, str]]:
+        """(api_type, cliente, sufixo do rótulo) de cada cliente habilitado de um lado do tratamento"""
+        if side == "rest":
+            variants = [("REST", self.rest_client, ""), (CACHED_REST_API, self.cached_rest_client, "c")]
+        else:
+            variants = [("GraphQL", self.graphql_client, ""),
+                        (PERSISTED_GRAPHQL_API, self.persisted_graphql_client, "p")]
+        return [variant for variant in variants if variant[1] is not None]
+    
+    def run_treatment(self, treatment: Treatment, repetitions: int = 30):
+        """
+        Executa um tratamento do registro: a cada repetição sorteia os parâmetros e
+        mede a chamada REST e a GraphQL em todos os clientes habilitados
+        """
+        repetitions = treatment.repetitions or repetitions
         print("\n" + "=" * 60)
-        print("EXECUTANDO TRATAMENTOS T3 e T4: Consultas com Relacionamentos")
+        print(f"EXECUTANDO TRATAMENTOS {treatment.title}")
         print("=" * 60)
         
-        test_users = ["torvalds", "gvanrossum", "mojombo", "defunkt", "pjhyett"]
+        done = self._completed(treatment.name)
+        if done >= repetitions:
+            print(f"\n✓ Todas as {repetitions} repetições já foram concluídas")
+        elif done:
+            print(f"\n✓ {done} repetições já concluídas; continuando da {done + 1}ª")
         
-        for i in range(repetitions):
-            user = random.choice(test_users)
-            
-            try:
-                print(f"\n[{i+1}/{repetitions}] T3 - REST: Consultando {user} + repositórios")
-                _, time_ms, size_bytes = self.rest_client.get_user_with_repos(user)
-                self._record_measurement("REST", "relacionamentos", "get_user_with_repos", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("REST", "relacionamentos", "get_user_with_repos", 0, 0, False, str(e))
+        for i in range(done, repetitions):
+            params = treatment.generate_params(self.registry.pools, self._settings(), self._resolve)
+            print()
             
-            time.sleep(1)
-            
-            try:
-                print(f"[{i+1}/{repetitions}] T4 - GraphQL: Consultando {user} + repositórios")
-                _, time_ms, size_bytes = self.graphql_client.get_user_with_repos(user)
-                self._record_measurement("GraphQL", "relacionamentos", "get_user_with_repos", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("GraphQL", "relacionamentos", "get_user_with_repos", 0, 0, False, str(e))
+            for side in API_SIDES:
+                call = treatment.calls[side]
+                args, kwargs, description = call.bind(params)
+                
+                for api_type, client, suffix in self._variants(side):
+                    label = f"[{i+1}/{repetitions}] {call.id}{suffix} - {api_type}"
+                    print(f"{label}: {description}" if not suffix else label)
+                    self._measure(api_type, client, treatment.query_type, treatment.query_name, call.method,
+                                  *args, **kwargs)
             
-            time.sleep(1)
+            self._checkpoint(treatment.name, i + 1)
     
-    def run_filter_queries(self, repetitions: int = 30):
+    def run_batched_queries(self, repetitions: int = 30):
+        """Dispara a consulta simples de todos os usuários de teste ao mesmo tempo, agrupadas numa só requisição"""
         print("\n" + "=" * 60)
-        print("EXECUTANDO TRATAMENTOS T5 e T6: Consultas com Filtros")
+        print("EXECUTANDO TRATAMENTO T2b: Consultas Simples Agrupadas")
         print("=" * 60)
         
-        search_queries = [
-            "language:python stars:>10000",
-            "language:javascript stars:>5000",
-            "language:java stars:>3000",
-            "language:go stars:>2000",
-            "topic:machine-learning stars:>1000"
-        ]
+        def measure(user: str):
+            self._measure(BATCHED_GRAPHQL_API, self.batching_graphql_client, "simples", "get_user",
+                          "get_user_simple", user)
         
-        for i in range(repetitions):
-            query = random.choice(search_queries)
-            
-            try:
-                print(f"\n[{i+1}/{repetitions}] T5 - REST: Buscando '{query}'")
-                _, time_ms, size_bytes = self.rest_client.search_repositories(query)
-                self._record_measurement("REST", "filtros", "search_repositories", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("REST", "filtros", "search_repositories", 0, 0, False, str(e))
-            
-            time.sleep(1)
-            
-            try:
-                print(f"[{i+1}/{repetitions}] T6 - GraphQL: Buscando '{query}'")
-                _, time_ms, size_bytes = self.graphql_client.search_repositories(query)
-                self._record_measurement("GraphQL", "filtros", "search_repositories", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("GraphQL", "filtros", "search_repositories", 0, 0, False, str(e))
-            
-            time.sleep(1)
-    
-    def run_pagination_queries(self, repetitions: int = 30):
-        print("\n" + "=" * 60)
-        print("EXECUTANDO TRATAMENTOS T7 e T8: Consultas com Paginação")
-        print("=" * 60)
+        users = self.registry.pools.get("users", [])
+        if not users:
+            print(f"\n✗ O registro {self.registry.path} não define o conjunto 'users'; tratamento ignorado")
+            return
         
-        test_users = ["torvalds", "gvanrossum", "mojombo", "defunkt", "pjhyett"]
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            for i in range(self._completed("agrupadas"), repetitions):
+                print(f"\n[{i+1}/{repetitions}] T2b - GraphQL agrupado: Consultando {len(users)} usuários")
+                if self.connection_mode == "fresh":
+                    self.batching_graphql_client.transport.reset_connections()
+                list(executor.map(measure, users))
+                self._checkpoint("agrupadas", i + 1)
+    
+    def warm_up(self, requests_per_client: int = 3):
+        """
+        Abre e aquece as conexões de todos os clientes com requisições que não são medidas
         
-        for i in range(repetitions):
-            user = random.choice(test_users)
-            page = random.randint(1, 3)
-            
-            try:
-                print(f"\n[{i+1}/{repetitions}] T7 - REST: Repos de {user} (página {page})")
-                _, time_ms, size_bytes = self.rest_client.get_user_repos_paginated(user, per_page=10, page=page)
-                self._record_measurement("REST", "paginacao", "get_repos_paginated", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("REST", "paginacao", "get_repos_paginated", 0, 0, False, str(e))
-            
-            time.sleep(1)
-            
-            try:
-                print(f"[{i+1}/{repetitions}] T8 - GraphQL: Repos de {user} (primeiros 10)")
-                _, time_ms, size_bytes = self.graphql_client.get_user_repos_paginated(user, first=10)
-                self._record_measurement("GraphQL", "paginacao", "get_repos_paginated", time_ms, size_bytes)
-                print(f"  ✓ Tempo: {time_ms:.2f} ms | Tamanho: {size_bytes} bytes")
-            except Exception as e:
-                print(f"  ✗ Erro: {e}")
-                self._record_measurement("GraphQL", "paginacao", "get_repos_paginated", 0, 0, False, str(e))
-            
-            time.sleep(1)
+        Usa GET /rate_limit, que no GitHub não consome a cota e não passa pelo
+        cache condicional dos clientes.
+        """
+        print("\n✓ Aquecendo conexões...")
+        for client in self._clients():
+            for _ in range(requests_per_client):
+                try:
+                    client.transport.request("GET", f"{self.base_url.rstrip('/')}/rate_limit")
+                except Exception as e:
+                    print(f"  ✗ Erro no aquecimento: {e}")
+                    break
     
     def run_full_experiment(self, repetitions: int = 30, randomize: bool = True):
         print("\n" + "=" * 70)
@@ -202,22 +316,32 @@ class ExperimentRunner:
         print("=" * 70)
         print(f"Configuração:")
         print(f"  - Repetições por tratamento: {repetitions}")
-        print(f"  - Total de medições esperadas: {8 * repetitions}")
+        registered = self.registry.enabled(self._settings())
+        apis_per_treatment = len(self._variants("rest")) + len(self._variants("graphql"))
+        expected = sum((t.repetitions or repetitions) * apis_per_treatment for t in registered)
+        if self.batching_graphql_client:
+            expected += len(self.registry.pools.get("users", [])) * repetitions
+        print(f"  - Tratamentos: {', '.join(t.name for t in registered)} ({self.registry.path})")
+        print(f"  - Total de medições esperadas: {expected}")
         print(f"  - Ordem randomizada: {randomize}")
+        print(f"  - Conexões: {self.connection_mode}")
+        print(f"  - Decodificação JSON: {self.codec.name}")
+        print(f"  - Relógio: resolução {self.timer_calibration['timer_resolution_ns']} ns, "
+              f"leitura {self.timer_calibration['timer_overhead_ns']:.0f} ns")
         print(f"  - Data/Hora de início: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
         
-        treatments = [
-            ("simples", self.run_simple_queries),
-            ("relacionamentos", self.run_relationship_queries),
-            ("filtros", self.run_filter_queries),
-            ("paginacao", self.run_pagination_queries)
-        ]
+        treatments = [(t.name, partial(self.run_treatment, t)) for t in registered]
+        if self.batching_graphql_client:
+            treatments.append(("agrupadas", self.run_batched_queries))
         
         if randomize:
             random.shuffle(treatments)
             print("\n✓ Ordem de execução dos tratamentos foi randomizada")
         
+        if self.connection_mode == "warmup":
+            self.warm_up()
+        
         start_time = time.time()
         
         for treatment_name, treatment_func in treatments:
@@ -240,28 +364,122 @@ class ExperimentRunner:
         print(f"  - Medições com erro: {sum(1 for r in self.results if not r['success'])}")
         print("=" * 70)
     
+    def _build_async_jobs(self, rest: AsyncRESTClient, graphql: AsyncGraphQLClient, repetitions: int) -> List[Tuple]:
+        """Jobs dos tratamentos do registro cujos métodos existem nos clientes assíncronos"""
+        clients = {"rest": ("REST", rest), "graphql": ("GraphQL", graphql)}
+        jobs = []
+        
+        for treatment in self.registry.enabled(self._settings()):
+            if not all(hasattr(clients[side][1], call.method) for side, call in treatment.calls.items()):
+                print(f"  - Tratamento '{treatment.name}' não disponível no modo assíncrono")
+                continue
+            
+            for _ in range(treatment.repetitions or repetitions):
+                params = treatment.generate_params(self.registry.pools, self._settings(), self._resolve)
+                for side in API_SIDES:
+                    api_type, client = clients[side]
+                    args, kwargs, _ = treatment.calls[side].bind(params)
+                    method = getattr(client, treatment.calls[side].method)
+                    jobs.append((api_type, treatment.query_type, treatment.query_name, partial(method, *args, **kwargs)))
+        
+        return jobs
+    
+    async def _measure_async(self, semaphore: asyncio.Semaphore, api_type: str, query_type: str,
+                             query_name: str, call):
+        async with semaphore:
+            try:
+                with capture_phases() as phases:
+                    _, time_ms, size_bytes = await call()
+                self._record_measurement(api_type, query_type, query_name, time_ms, size_bytes, metrics=phases)
+            except Exception as e:
+                print(f"  ✗ Erro ({api_type}/{query_type}): {e}")
+                self._record_measurement(api_type, query_type, query_name, 0, 0, False, str(e))
+    
+    async def run_full_experiment_async(self, repetitions: int = 30, randomize: bool = True, concurrency: int = 10):
+        """
+        Executa todos os tratamentos de forma concorrente num único event loop
+        
+        Os clientes REST e GraphQL compartilham o mesmo pool de conexões, e até
+        `concurrency` medições ficam em andamento ao mesmo tempo.
+        """
+        print("\n" + "=" * 70)
+        print("INICIANDO EXPERIMENTO ASSÍNCRONO: GraphQL vs REST")
+        print("=" * 70)
+        print(f"  - Repetições por tratamento: {repetitions}")
+        print(f"  - Medições simultâneas: {concurrency}")
+        if self.connection_mode == "fresh":
+            print("  - Aviso: o modo 'fresh' não se aplica ao pool compartilhado; conexões serão reutilizadas")
+        print("=" * 70)
+        
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        headers = {"Accept-Encoding": self.accept_encoding} if self.accept_encoding else None
+        http2 = self.transport == "http2"
+        http1 = not (http2 and self.base_url.startswith("http://"))
+        start_time = time.time()
+        
+        async with httpx.AsyncClient(limits=limits, timeout=30, headers=headers, http1=http1, http2=http2) as http_client:
+            rest = AsyncRESTClient(self.token, http_client, self.base_url, codec=self.codec)
+            graphql = AsyncGraphQLClient(self.token, http_client, self.base_url, codec=self.codec)
+            
+            jobs = self._build_async_jobs(rest, graphql, repetitions)
+            if randomize:
+                random.shuffle(jobs)
+            
+            if self.connection_mode == "warmup":
+                await asyncio.gather(
+                    *(http_client.get(f"{self.base_url.rstrip('/')}/rate_limit") for _ in range(concurrency)),
+                    return_exceptions=True
+                )
+            
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(self._measure_async(semaphore, *job) for job in jobs))
+        
+        duration_minutes = (time.time() - start_time) / 60
+        
+        print("\n" + "=" * 70)
+        print("EXPERIMENTO ASSÍNCRONO CONCLUÍDO")
+        print("=" * 70)
+        print(f"  - Duração total: {duration_minutes:.2f} minutos")
+        print(f"  - Total de medições coletadas: {len(self.results)}")
+        print(f"  - Medições com erro: {sum(1 for r in self.results if not r['success'])}")
+        print("=" * 70)
+    
     def save_results(self, filename_prefix: str = "experiment"):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        print()
         
-        csv_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}.csv")
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            if self.results:
-                fieldnames = self.results[0].keys()
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(self.results)
+        if "csv" in self.output_formats:
+            csv_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}.csv")
+            with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                if self.results:
+                    fieldnames = list(dict.fromkeys(key for r in self.results for key in r))
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(self.results)
+            
+            print(f"✓ Resultados salvos em CSV: {csv_filename}")
         
-        print(f"\n✓ Resultados salvos em CSV: {csv_filename}")
+        if "json" in self.output_formats:
+            json_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}.json")
+            with open(json_filename, 'wb') as jsonfile:
+                jsonfile.write(self.codec.dumps(self.results, indent=True))
+            
+            print(f"✓ Resultados salvos em JSON: {json_filename}")
         
-        json_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}.json")
-        with open(json_filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(self.results, jsonfile, indent=2, ensure_ascii=False)
+        for fmt in STORE_FORMATS:
+            if fmt in self.output_formats and self.results:
+                path = write_results(self.results, run_id=f"{filename_prefix}_{timestamp}",
+                                     root=os.path.join(self.output_dir, "dataset"), fmt=fmt)
+                print(f"✓ Resultados salvos em {fmt.capitalize()}: {path}")
         
-        print(f"✓ Resultados salvos em JSON: {json_filename}")
+        histograms = LatencyHistograms.from_measurements(self.results)
+        histograms_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}_histograms.json")
+        histograms.save(histograms_filename)
+        print(f"✓ Histogramas de latência salvos em: {histograms_filename}")
         
-        self._save_summary(filename_prefix, timestamp)
+        self._save_summary(filename_prefix, timestamp, histograms)
     
-    def _save_summary(self, filename_prefix: str, timestamp: str):
+    def _save_summary(self, filename_prefix: str, timestamp: str, histograms: LatencyHistograms):
         summary_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}_summary.txt")
         
         with open(summary_filename, 'w', encoding='utf-8') as f:
@@ -271,11 +489,11 @@ class ExperimentRunner:
             f.write(f"Data/Hora: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Total de medições: {len(self.results)}\n\n")
             
-            for api_type in ["REST", "GraphQL"]:
+            for api_type in dict.fromkeys(r['api_type'] for r in self.results):
                 f.write(f"\n{api_type}:\n")
                 f.write("-" * 70 + "\n")
                 
-                for query_type in ["simples", "relacionamentos", "filtros", "paginacao"]:
+                for query_type in self.registry.query_types():
                     measurements = [
                         r for r in self.results 
                         if r['api_type'] == api_type and r['query_type'] == query_type and r['success']
@@ -289,14 +507,129 @@ class ExperimentRunner:
                         f.write(f"    Medições: {len(measurements)}\n")
                         f.write(f"    Tempo médio: {sum(times)/len(times):.2f} ms\n")
                         f.write(f"    Tempo min/max: {min(times):.2f} / {max(times):.2f} ms\n")
+                        percentiles = histograms.histograms[(api_type, query_type)].percentiles()
+                        labels = "/".join(f"p{p:g}" for p in REPORT_PERCENTILES)
+                        values = " / ".join(f"{percentiles[p] / 1000:.2f}" for p in REPORT_PERCENTILES)
+                        f.write(f"    Tempo {labels}: {values} ms\n")
                         f.write(f"    Tamanho médio: {sum(sizes)/len(sizes):.2f} bytes\n")
                         f.write(f"    Tamanho min/max: {min(sizes)} / {max(sizes)} bytes\n")
+                        
+                        uploads = [m['request_size_bytes'] for m in measurements if m.get('request_size_bytes') is not None]
+                        if uploads:
+                            f.write(f"    Tamanho médio da requisição: {sum(uploads)/len(uploads):.2f} bytes\n")
+                        
+                        # Thread da chamada mais as auxiliares do cliente; client_cpu_ms inclui o servidor local
+                        cpu_times = [m['client_thread_cpu_ms'] + (m.get('client_worker_cpu_ms') or 0)
+                                     for m in measurements if m.get('client_thread_cpu_ms') is not None]
+                        if cpu_times:
+                            f.write(f"    CPU médio do cliente (chamada + threads auxiliares): "
+                                    f"{sum(cpu_times)/len(cpu_times):.2f} ms\n")
+                        decode_times = [m['decode_ms'] for m in measurements if m.get('decode_ms') is not None]
+                        if decode_times:
+                            f.write(f"    Decodificação média do JSON: {sum(decode_times)/len(decode_times):.2f} ms\n")
+                        
+                        throughputs = [m['items_per_second'] for m in measurements if m.get('items_per_second')]
+                        if throughputs:
+                            requests = [m['request_count'] for m in measurements]
+                            f.write(f"    Requisições por medição: {sum(requests)/len(requests):.1f}\n")
+                            f.write(f"    Vazão média: {sum(throughputs)/len(throughputs):.1f} itens/s\n")
         
         print(f"✓ Sumário salvo em: {summary_filename}")
     
+    def _clients(self) -> List:
+        clients = [
+            self.rest_client,
+            self.graphql_client,
+            self.cached_rest_client,
+            self.persisted_graphql_client,
+            self.batching_graphql_client,
+        ]
+        return [client for client in clients if client is not None]
+    
+    def set_accept_encoding(self, encoding: str):
+        """Define o Accept-Encoding de todos os clientes; o valor é registrado em cada medição"""
+        self.accept_encoding = encoding
+        for client in self._clients():
+            client.session.headers["Accept-Encoding"] = encoding
+    
     def close(self):
-        self.rest_client.close()
-        self.graphql_client.close()
+        for client in self._clients():
+            client.close()
+        if self.result_log:
+            self.result_log.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Experimento controlado: GraphQL vs REST")
+    parser.add_argument("--repetitions", type=int, default=30, help="Repetições por tratamento")
+    parser.add_argument("--no-randomize", dest="randomize", action="store_false",
+                        help="Executa os tratamentos na ordem fixa")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Executa as medições de forma concorrente num único event loop")
+    parser.add_argument("--concurrency", type=int, default=10, help="Medições simultâneas no modo --async")
+    parser.add_argument("--base-url", default=GITHUB_API_URL,
+                        help="URL base da API (ex.: um servidor local iniciado com local_server.py)")
+    parser.add_argument("--local", action="store_true",
+                        help="Inicia o servidor local com dados sintéticos e executa o experimento contra ele")
+    parser.add_argument("--delay", type=float, default=None,
+                        help="Intervalo mínimo entre requisições em segundos (padrão: ritmo adaptativo pelos "
+                             "limites de taxa da API, ou 0 com --local)")
+    parser.add_argument("--rest-cache", action="store_true",
+                        help="Adiciona o tratamento REST com cache condicional (ETag/If-None-Match)")
+    parser.add_argument("--cache-max-bytes", type=int, default=16 * 1024 * 1024,
+                        help="Limite em bytes da LRU em memória do cache REST")
+    parser.add_argument("--cache-dir", default=None, help="Diretório do nível em disco do cache REST")
+    parser.add_argument("--persisted-queries", action="store_true",
+                        help="Adiciona o tratamento GraphQL com consultas persistidas (hash SHA-256)")
+    parser.add_argument("--batch-window-ms", type=float, default=None,
+                        help="Adiciona o tratamento GraphQL com consultas agrupadas nessa janela (ms)")
+    parser.add_argument("--accept-encoding", nargs="+", choices=ACCEPT_ENCODINGS, default=None,
+                        help="Codificações negociadas; com várias, o experimento é repetido para cada uma")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="http1",
+                        help="Protocolo dos clientes: http1 (requests) ou http2 (httpx, conexão multiplexada)")
+    parser.add_argument("--concurrent-requests", action="store_true",
+                        help="Nas consultas REST com vários recursos, faz as requisições ao mesmo tempo")
+    parser.add_argument("--connections", dest="connection_mode", choices=CONNECTION_MODES, default="reuse",
+                        help="reuse: pool com keep-alive; fresh: conexão nova a cada medição; "
+                             "warmup: pool aquecido antes das medições")
+    parser.add_argument("--graphql-rate-limit-field", action="store_true",
+                        help="Inclui rateLimit { cost remaining resetAt } nas consultas GraphQL "
+                             "(altera o tamanho das respostas medidas)")
+    parser.add_argument("--collection-size", type=int, default=None,
+                        help="Adiciona o tratamento que busca coleções completas com esse número de itens "
+                             "(ex.: 1000 repositórios e 1000 commits)")
+    parser.add_argument("--treatments", default=DEFAULT_TREATMENTS_FILE,
+                        help="Arquivo YAML com o registro de tratamentos")
+    parser.add_argument("--max-attempts", type=int, default=1,
+                        help="Tentativas por requisição idempotente com falha de rede ou 5xx (1 desativa)")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Envia uma requisição duplicada quando a original passa do p95 observado")
+    parser.add_argument("--hedge-delay-ms", type=float, default=None,
+                        help="Espera fixa antes da requisição duplicada (em vez do p95)")
+    parser.add_argument("--json-backend", choices=JSON_BACKENDS, default=None,
+                        help="Biblioteca de (de)codificação JSON (padrão: orjson quando instalado)")
+    parser.add_argument("--lazy-json", action="store_true",
+                        help="Adia a decodificação das respostas REST até o acesso aos dados "
+                             "(o experimento só usa tempos e tamanhos)")
+    parser.add_argument("--fault-rate", type=float, default=0.0,
+                        help="Com --local, fração das requisições respondidas com 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="Com --local, fração das requisições atrasadas em --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="Com --local, atraso das requisições lentas (ms)")
+    parser.add_argument("--resume", metavar="JSONL", default=None,
+                        help="Retoma um experimento interrompido a partir do seu registro incremental")
+    parser.add_argument("--fsync-interval", type=float, default=1.0,
+                        help="Intervalo mínimo em segundos entre fsyncs do registro incremental")
+    parser.add_argument("--output-format", dest="output_formats", nargs="+", choices=OUTPUT_FORMATS,
+                        default=["csv", "json"],
+                        help="Formatos dos resultados; parquet/arrow gravam em results/dataset/, particionado "
+                             "por data e execução")
+    args = parser.parse_args()
+    if args.resume and args.use_async:
+        parser.error("--resume não é suportado com --async")
+    if args.resume and not os.path.exists(args.resume):
+        parser.error(f"registro não encontrado: {args.resume}")
+    return args
 
 
 def main():
@@ -305,15 +638,62 @@ def main():
     print("Laboratório de Experimentação de Software")
     print("=" * 70)
     
+    args = parse_args()
     token = os.getenv("GITHUB_TOKEN")
     
-    REPETITIONS = 30
-    RANDOMIZE = True
+    local_server = None
+    base_url = args.base_url
+    delay = args.delay
     
-    experiment = ExperimentRunner(token)
+    if args.local:
+        local_server = LocalServer(api=LocalGitHubAPI(error_rate=args.fault_rate, slow_rate=args.slow_rate,
+                                                      slow_ms=args.slow_ms))
+        base_url = local_server.start()
+        delay = 0.0 if delay is None else delay
+        print(f"\n✓ Servidor local iniciado em: {base_url}")
+    
+    retry_policy = None
+    if args.max_attempts > 1 or args.hedge:
+        retry_policy = RetryPolicy(max_attempts=args.max_attempts, hedge=args.hedge,
+                                   hedge_delay_ms=args.hedge_delay_ms)
+    
+    rest_cache = None
+    if args.rest_cache:
+        rest_cache = ResponseCache(max_bytes=args.cache_max_bytes, disk_dir=args.cache_dir)
+    
+    codec = JSONCodec(args.json_backend, lazy=args.lazy_json)
+    log_path = args.resume or os.path.join("results", f"experiment_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    result_log = ResultLog(log_path, codec, fsync_interval=args.fsync_interval)
+    
+    experiment = ExperimentRunner(token, base_url=base_url, delay=delay,
+                                  rest_cache=rest_cache, persisted_queries=args.persisted_queries,
+                                  batch_window_ms=args.batch_window_ms, transport=args.transport,
+                                  concurrent_requests=args.concurrent_requests,
+                                  connection_mode=args.connection_mode,
+                                  rate_limit_field=args.graphql_rate_limit_field,
+                                  collection_size=args.collection_size,
+                                  retry_policy=retry_policy,
+                                  codec=codec,
+                                  treatments_file=args.treatments,
+                                  result_log=result_log,
+                                  output_formats=args.output_formats)
+    
+    if args.resume:
+        experiment.resume()
+    print(f"\n✓ Medições registradas incrementalmente em: {log_path}")
     
     try:
-        experiment.run_full_experiment(repetitions=REPETITIONS, randomize=RANDOMIZE)
+        for encoding in args.accept_encoding or [None]:
+            if encoding:
+                experiment.set_accept_encoding(encoding)
+                print(f"\n✓ Accept-Encoding: {encoding}")
+            
+            if args.use_async:
+                asyncio.run(experiment.run_full_experiment_async(
+                    repetitions=args.repetitions, randomize=args.randomize, concurrency=args.concurrency
+                ))
+            else:
+                experiment.run_full_experiment(repetitions=args.repetitions, randomize=args.randomize)
         
         experiment.save_results()
         
@@ -329,14 +709,18 @@ def main():
         print("\n\n✗ Experimento interrompido pelo usuário")
         print("Salvando resultados parciais...")
         experiment.save_results(filename_prefix="experiment_partial")
+        print(f"Para continuar: python experiment.py --resume {log_path}")
     
     except Exception as e:
         print(f"\n✗ Erro durante execução do experimento: {e}")
         print("Salvando resultados parciais...")
         experiment.save_results(filename_prefix="experiment_error")
+        print(f"Para continuar: python experiment.py --resume {log_path}")
     
     finally:
         experiment.close()
+        if local_server:
+            local_server.stop()
         print("\n✓ Conexões fechadas. Encerrando...")
 
 
@@ -0,0 +1,264 @@
+"""
+Agrupamento automático de consultas GraphQL (no estilo DataLoader)
+Chamadas feitas dentro de uma janela de tempo são combinadas numa única
+consulta com aliases, enviadas numa só requisição e o resultado é
+separado de volta para cada chamador
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
+from graphql_client import GraphQLClient, GITHUB_API_URL, tokenize_query, join_query_tokens, pop_rate_limit
+from resilience import RetryPolicy
+from rate_limiter import RateLimitScheduler
+from json_codec import JSONCodec
+from timing import worker_task
+
+
+ALIAS_PREFIX = "q"
+
+
+def _alias(index: int, name: str) -> str:
+    return f"{ALIAS_PREFIX}{index}_{name}"
+
+
+def _split_operation(query: str) -> Tuple[List[str], List[str]]:
+    """Separa uma operação nos tokens das definições de variáveis e nos da seleção raiz"""
+    tokens = tokenize_query(query)
+    pos = 0
+    if tokens and tokens[0] in ("query", "mutation"):
+        pos = 1
+        if tokens[pos] not in ("(", "{"):
+            pos += 1
+
+    definitions = []
+    if tokens[pos] == "(":
+        end = tokens.index(")", pos)
+        definitions = tokens[pos + 1:end]
+        pos = end + 1
+
+    if tokens[pos] != "{" or tokens[-1] != "}":
+        raise ValueError("Consulta GraphQL sem seleção raiz")
+    return definitions, tokens[pos + 1:-1]
+
+
+def _prefix_operation(index: int, query: str) -> Tuple[List[str], List[str]]:
+    """Renomeia as variáveis e dá um alias único a cada campo raiz da operação"""
+    definitions, selections = _split_operation(query)
+
+    def rename_variables(tokens: List[str]) -> List[str]:
+        renamed = []
+        for position, token in enumerate(tokens):
+            if position > 0 and tokens[position - 1] == "$":
+                token = _alias(index, token)
+            renamed.append(token)
+        return renamed
+
+    definitions = rename_variables(definitions)
+    selections = rename_variables(selections)
+
+    prefixed = []
+    braces = parens = 0
+    for position, token in enumerate(selections):
+        is_name = token[0].isalpha() or token[0] == "_"
+        if braces == 0 and parens == 0 and is_name:
+            following = selections[position + 1] if position + 1 < len(selections) else None
+            preceding = selections[position - 1] if position > 0 else None
+            if following == ":":
+                token = _alias(index, token)
+            elif preceding != ":":
+                prefixed.extend([_alias(index, token), ":"])
+
+        braces += {"{": 1, "}": -1}.get(token, 0)
+        parens += {"(": 1, ")": -1}.get(token, 0)
+        prefixed.append(token)
+
+    return definitions, prefixed
+
+
+def merge_operations(operations: List[Tuple[str, Dict]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Combina várias operações numa única consulta com aliases
+
+    Os campos raiz e as variáveis da operação `i` recebem o prefixo `q{i}_`,
+    por exemplo `q0_user:user(login:$q0_login) q1_user:user(login:$q1_login)`.
+    """
+    definitions = []
+    selections = []
+    variables = {}
+
+    for index, (query, operation_variables) in enumerate(operations):
+        operation_definitions, operation_selections = _prefix_operation(index, query)
+        definitions.extend(operation_definitions)
+        selections.extend(operation_selections)
+        for name, value in (operation_variables or {}).items():
+            variables[_alias(index, name)] = value
+
+    header = ["query", "("] + definitions + [")"] if definitions else ["query"]
+    return join_query_tokens(header + ["{"] + selections + ["}"]), variables
+
+
+def split_result(index: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    prefix = _alias(index, "")
+    return {key[len(prefix):]: value for key, value in (data or {}).items() if key.startswith(prefix)}
+
+
+def _split_errors(index: int, errors: List[Dict]) -> List[Dict]:
+    """Erros com `path` pertencem só à operação do alias; os demais atingem todo o lote"""
+    prefix = _alias(index, "")
+    own = []
+    for error in errors:
+        path = error.get("path")
+        if not path:
+            own.append(error)
+        elif str(path[0]).startswith(prefix):
+            own.append(dict(error, path=[path[0][len(prefix):]] + path[1:]))
+    return own
+
+
+class _PendingCall:
+    __slots__ = ("query", "variables", "future", "submitted_at")
+
+    def __init__(self, query: str, variables: Dict):
+        self.query = query
+        self.variables = variables
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class BatchingGraphQLClient(GraphQLClient):
+    """
+    GraphQLClient que agrupa as chamadas feitas por várias threads dentro de uma janela
+
+    Cada método continua retornando (dados, tempo_ms, tamanho_bytes) para o
+    chamador: o tempo vai da chamada até a chegada da resposta do lote (inclui
+    a espera na janela, mas não a decodificação nem a espera do agendador,
+    como nos demais tratamentos) e o tamanho é o da sua parte da resposta. As métricas do lote
+    ficam nas colunas `batch_*` de `last_metrics`, que é mantido por thread.
+
+    Args:
+        window_ms: Tempo que o primeiro chamador de um lote espera por outras chamadas
+        max_batch_size: Despacha o lote antes do fim da janela ao atingir esse tamanho
+        scheduler: Agendador que dita o ritmo de cada lote despachado (uma
+            requisição HTTP), e não de cada chamada; a espera não entra no tempo
+    """
+
+    def __init__(self, token: str = None, base_url: str = GITHUB_API_URL, window_ms: float = 5.0,
+                 max_batch_size: int = 50, transport: str = "http1", rate_limit_field: bool = False,
+                 retry_policy: RetryPolicy = None, codec: JSONCodec = None,
+                 scheduler: RateLimitScheduler = None):
+        self._local = threading.local()
+        super().__init__(token, base_url, transport=transport, rate_limit_field=rate_limit_field,
+                         retry_policy=retry_policy, codec=codec)
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.scheduler = scheduler
+        self._queue: "queue.Queue[_PendingCall]" = queue.Queue()
+        self._dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+
+    @property
+    def last_metrics(self) -> Dict[str, Any]:
+        return getattr(self._local, "last_metrics", {})
+
+    @last_metrics.setter
+    def last_metrics(self, metrics: Dict[str, Any]):
+        self._local.last_metrics = metrics
+
+    def _execute_query(self, query: str, variables: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
+        self.last_metrics = {}
+        call = _PendingCall(self._prepare_query(query), variables)
+        self._ensure_dispatcher()
+        self._queue.put(call)
+
+        data, metrics = call.future.result()
+        pop_rate_limit(data.get("data"), metrics)
+        self.last_metrics = metrics
+
+        if "errors" in data:
+            print(f"Erros GraphQL: {data['errors']}")
+            raise Exception(f"GraphQL errors: {data['errors']}")
+
+        return data["data"], metrics["response_time_ms"], metrics["response_size_bytes"]
+
+    def _ensure_dispatcher(self):
+        with self._dispatcher_lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="graphql-batcher", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            call = self._queue.get()
+            if call is None:
+                return
+
+            batch = [call]
+            deadline = call.submitted_at + self.window_ms / 1000
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    call = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if call is None:
+                    stop = True
+                    break
+                batch.append(call)
+
+            worker_task(self._dispatch)(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_PendingCall]):
+        formed_at = time.perf_counter()
+        scheduler_wait_ms = self.scheduler.acquire("graphql") * 1000 if self.scheduler is not None else 0.0
+        dispatched_at = time.perf_counter()
+        try:
+            query, variables = merge_operations([(call.query, call.variables) for call in batch])
+            payload = {"query": query}
+            if variables:
+                payload["variables"] = variables
+            data, batch_metrics = self._post(payload)
+        except Exception as e:
+            for call in batch:
+                call.future.set_exception(e)
+            return
+
+        received_at = time.perf_counter()
+        batch_time_ms = (received_at - dispatched_at) * 1000 - batch_metrics["decode_ms"]
+
+        for index, call in enumerate(batch):
+            result = {"data": split_result(index, data.get("data"))}
+            errors = _split_errors(index, data.get("errors") or [])
+            if errors:
+                result["errors"] = errors
+
+            metrics = dict(batch_metrics)
+            metrics.update({
+                "response_time_ms": ((received_at - call.submitted_at) * 1000
+                                     - scheduler_wait_ms - batch_metrics["decode_ms"]),
+                "response_size_bytes": len(json.dumps(result["data"], separators=(",", ":")).encode()),
+                "request_size_bytes": batch_metrics["request_size_bytes"] / len(batch),
+                "batch_size": len(batch),
+                "batch_wait_ms": (formed_at - call.submitted_at) * 1000,
+                "scheduler_wait_ms": scheduler_wait_ms,
+                "batch_response_time_ms": batch_time_ms,
+                "batch_response_size_bytes": batch_metrics["response_size_bytes"],
+                "batch_request_size_bytes": batch_metrics["request_size_bytes"],
+            })
+            call.future.set_result((result, metrics))
+
+    def close(self):
+        with self._dispatcher_lock:
+            if self._dispatcher is not None:
+                self._queue.put(None)
+                self._dispatcher.join()
+                self._dispatcher = None
+        super().close()
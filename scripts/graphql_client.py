@@ -3,310 +3,576 @@ Cliente GraphQL para o experimento GraphQL vs REST
 Implementa consultas GraphQL para a API do GitHub
 """
 
-import requests
+import hashlib
+import re
 import time
-from typing import Dict, Any, Tuple
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 import os
 from dotenv import load_dotenv
+from transport import create_transport, TRANSPORT_ERRORS, PHASE_COLUMNS, SIZE_COLUMNS
+from rate_limiter import rate_limit_from_headers, rate_limit_from_graphql
+from pagination import PageIterator
+from resilience import ResilientTransport, RetryPolicy, RESILIENCE_COLUMNS, merge_resilience, attach_resilience
+from json_codec import JSONCodec
 
 load_dotenv()
 
+GITHUB_API_URL = "https://api.github.com"
 
-class GraphQLClient:
-    """Cliente para realizar consultas GraphQL na API do GitHub"""
-    
-    def __init__(self, token: str = None):
-        self.url = "https://api.github.com/graphql"
-        self.headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "GraphQL-REST-Experiment"
-        }
-        
-        if token:
-            self.headers["Authorization"] = f"bearer {token}"
+# Colunas somadas ao combinar várias requisições (páginas, registro da consulta persistida) numa medição
+SUMMED_COLUMNS = set(PHASE_COLUMNS + SIZE_COLUMNS + [
+    "request_size_bytes", "response_size_bytes", "connections_opened", "request_count", "decode_ms",
+    "server_parse_ms", "rate_limit_cost",
+])
+
+
+def combine_metrics(total: Dict[str, Any], metrics: Dict[str, Any]):
+    """
+    Acumula em `total` as métricas de mais uma requisição da mesma medição
+
+    Só as quantidades de SUMMED_COLUMNS são somadas; as demais (cota de
+    requisições, versão HTTP, conexões no pool) ficam com o último valor.
+    """
+    merge_resilience(total, metrics)
+    for name, value in metrics.items():
+        if name in RESILIENCE_COLUMNS:
+            continue
+        if name not in SUMMED_COLUMNS or name not in total:
+            total[name] = value
+        elif total[name] is None or value is None:
+            total[name] = None
         else:
-            raise ValueError("Token do GitHub é obrigatório para usar a API GraphQL")
-        
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-    
-    def _execute_query(self, query: str, variables: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
-        payload = {"query": query}
-        if variables:
-            payload["variables"] = variables
-        
-        start_time = time.perf_counter()
-        
-        try:
-            response = self.session.post(self.url, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            end_time = time.perf_counter()
-            
-            response_time_ms = (end_time - start_time) * 1000
-            response_size_bytes = len(response.content)
-            
-            data = response.json()
-            
-            if "errors" in data:
-                print(f"Erros GraphQL: {data['errors']}")
-                raise Exception(f"GraphQL errors: {data['errors']}")
-            
-            return data["data"], response_time_ms, response_size_bytes
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição GraphQL: {e}")
-            raise
-    
-    def get_user_simple(self, username: str) -> Tuple[Dict, float, int]:
-        query = """
-        query($login: String!) {
-            user(login: $login) {
-                login
+            total[name] += value
+
+
+USER_SIMPLE_QUERY = """
+query($login: String!) {
+    user(login: $login) {
+        login
+        name
+        bio
+        company
+        location
+        websiteUrl
+        avatarUrl
+        createdAt
+        updatedAt
+        followers {
+            totalCount
+        }
+        following {
+            totalCount
+        }
+        repositories {
+            totalCount
+        }
+    }
+}
+"""
+
+REPOSITORY_SIMPLE_QUERY = """
+query($owner: String!, $name: String!) {
+    repository(owner: $owner, name: $name) {
+        name
+        description
+        url
+        createdAt
+        updatedAt
+        stargazerCount
+        forkCount
+        watchers {
+            totalCount
+        }
+        primaryLanguage {
+            name
+        }
+        isPrivate
+        isFork
+        licenseInfo {
+            name
+        }
+    }
+}
+"""
+
+USER_WITH_REPOS_QUERY = """
+query($login: String!) {
+    user(login: $login) {
+        login
+        name
+        bio
+        company
+        location
+        followers {
+            totalCount
+        }
+        following {
+            totalCount
+        }
+        repositories(first: 10, orderBy: {field: UPDATED_AT, direction: DESC}) {
+            totalCount
+            nodes {
                 name
-                bio
-                company
-                location
-                websiteUrl
-                avatarUrl
+                description
+                url
+                stargazerCount
+                forkCount
+                primaryLanguage {
+                    name
+                }
                 createdAt
                 updatedAt
-                followers {
-                    totalCount
-                }
-                following {
-                    totalCount
+            }
+        }
+    }
+}
+"""
+
+REPO_WITH_ISSUES_QUERY = """
+query($owner: String!, $name: String!) {
+    repository(owner: $owner, name: $name) {
+        name
+        description
+        url
+        stargazerCount
+        forkCount
+        createdAt
+        updatedAt
+        issues(first: 10, states: [OPEN, CLOSED], orderBy: {field: CREATED_AT, direction: DESC}) {
+            totalCount
+            nodes {
+                title
+                state
+                number
+                createdAt
+                updatedAt
+                author {
+                    login
                 }
-                repositories {
+                comments {
                     totalCount
                 }
             }
         }
-        """
-        variables = {"login": username}
-        return self._execute_query(query, variables)
-    
-    def get_repository_simple(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
-        query = """
-        query($owner: String!, $name: String!) {
-            repository(owner: $owner, name: $name) {
+    }
+}
+"""
+
+SEARCH_REPOSITORIES_QUERY = """
+query($queryString: String!, $first: Int!) {
+    search(query: $queryString, type: REPOSITORY, first: $first) {
+        repositoryCount
+        nodes {
+            ... on Repository {
                 name
                 description
                 url
-                createdAt
-                updatedAt
                 stargazerCount
                 forkCount
-                watchers {
-                    totalCount
-                }
                 primaryLanguage {
                     name
                 }
-                isPrivate
-                isFork
-                licenseInfo {
-                    name
+                owner {
+                    login
                 }
+                createdAt
+                updatedAt
             }
         }
-        """
-        variables = {"owner": owner, "name": repo}
-        return self._execute_query(query, variables)
-    
-    def get_user_with_repos(self, username: str) -> Tuple[Dict, float, int]:
-        query = """
-        query($login: String!) {
-            user(login: $login) {
+    }
+}
+"""
+
+SEARCH_USERS_QUERY = """
+query($queryString: String!, $first: Int!) {
+    search(query: $queryString, type: USER, first: $first) {
+        userCount
+        nodes {
+            ... on User {
                 login
                 name
                 bio
-                company
                 location
+                company
+                avatarUrl
                 followers {
                     totalCount
                 }
-                following {
-                    totalCount
-                }
-                repositories(first: 10, orderBy: {field: UPDATED_AT, direction: DESC}) {
+                repositories {
                     totalCount
-                    nodes {
-                        name
-                        description
-                        url
-                        stargazerCount
-                        forkCount
-                        primaryLanguage {
-                            name
-                        }
-                        createdAt
-                        updatedAt
-                    }
                 }
             }
         }
-        """
-        variables = {"login": username}
-        return self._execute_query(query, variables)
-    
-    def get_repo_with_issues(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
-        query = """
-        query($owner: String!, $name: String!) {
-            repository(owner: $owner, name: $name) {
+    }
+}
+"""
+
+USER_REPOS_PAGINATED_QUERY = """
+query($login: String!, $first: Int!, $after: String) {
+    user(login: $login) {
+        repositories(first: $first, after: $after, orderBy: {field: UPDATED_AT, direction: DESC}) {
+            totalCount
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            nodes {
                 name
                 description
                 url
                 stargazerCount
                 forkCount
+                primaryLanguage {
+                    name
+                }
                 createdAt
                 updatedAt
-                issues(first: 10, states: [OPEN, CLOSED], orderBy: {field: CREATED_AT, direction: DESC}) {
-                    totalCount
-                    nodes {
-                        title
-                        state
-                        number
-                        createdAt
-                        updatedAt
-                        author {
-                            login
+            }
+        }
+    }
+}
+"""
+
+REPO_COMMITS_PAGINATED_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+    repository(owner: $owner, name: $name) {
+        defaultBranchRef {
+            target {
+                ... on Commit {
+                    history(first: $first, after: $after) {
+                        totalCount
+                        pageInfo {
+                            hasNextPage
+                            endCursor
                         }
-                        comments {
-                            totalCount
+                        nodes {
+                            message
+                            committedDate
+                            author {
+                                name
+                            }
+                            additions
+                            deletions
                         }
                     }
                 }
             }
         }
-        """
+    }
+}
+"""
+
+RATE_LIMIT_SELECTION = "rateLimit { cost limit remaining used resetAt }"
+
+PERSISTED_HIT = "hash"
+PERSISTED_REGISTERED = "registered"
+PERSISTED_UNSUPPORTED = "unsupported"
+
+_QUERY_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\.\.\.|[_0-9A-Za-z]+|[^\s,]')
+_SERVER_TIMING_RE = re.compile(r"(?:^|,)\s*([\w-]+)[^,]*?;\s*dur=([\d.]+)")
+
+
+def tokenize_query(query: str) -> List[str]:
+    return _QUERY_TOKEN_RE.findall(query)
+
+
+def join_query_tokens(tokens: List[str]) -> str:
+    parts = []
+    previous = ""
+    for token in tokens:
+        if previous and (previous[-1].isalnum() or previous[-1] == "_") and (token[0].isalnum() or token[0] == "_"):
+            parts.append(" ")
+        parts.append(token)
+        previous = token
+    return "".join(parts)
+
+
+def minify_query(query: str) -> str:
+    """Remove espaços, quebras de linha e vírgulas insignificantes do documento GraphQL"""
+    return join_query_tokens(tokenize_query(query))
+
+
+@lru_cache(maxsize=None)
+def persist_query(query: str) -> Tuple[str, str]:
+    """Retorna o documento minificado e seu hash SHA-256, no formato de Automatic Persisted Queries"""
+    minified = minify_query(query)
+    return minified, hashlib.sha256(minified.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def with_rate_limit_field(query: str) -> str:
+    """Acrescenta `rateLimit { cost remaining resetAt }` à seleção raiz da operação"""
+    tokens = tokenize_query(query)
+    return join_query_tokens(tokens[:-1] + tokenize_query(RATE_LIMIT_SELECTION) + tokens[-1:])
+
+
+def pop_rate_limit(data: Dict[str, Any], metrics: Dict[str, Any]):
+    """Remove o campo rateLimit dos dados retornados e registra seus valores nas métricas"""
+    if isinstance(data, dict) and isinstance(data.get("rateLimit"), dict):
+        metrics.update(rate_limit_from_graphql(data.pop("rateLimit")))
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    return {name: float(duration) for name, duration in _SERVER_TIMING_RE.findall(header or "")}
+
+
+def _persisted_query_error(data: Dict) -> str:
+    for error in data.get("errors") or []:
+        if error.get("message") in ("PersistedQueryNotFound", "PersistedQueryNotSupported"):
+            return error["message"]
+    return None
+
+
+class GraphQLClient:
+    """
+    Cliente para realizar consultas GraphQL na API do GitHub
+    
+    Com `persisted_queries=True`, cada requisição envia apenas o hash SHA-256 do
+    documento minificado e as variáveis; se o servidor não conhecer o hash, o
+    texto minificado é reenviado junto com o hash para registrá-lo.
+    """
+    
+    _PERSISTED_QUERIES = {
+        query: persist_query(query)
+        for query in (
+            USER_SIMPLE_QUERY,
+            REPOSITORY_SIMPLE_QUERY,
+            USER_WITH_REPOS_QUERY,
+            REPO_WITH_ISSUES_QUERY,
+            SEARCH_REPOSITORIES_QUERY,
+            SEARCH_USERS_QUERY,
+            USER_REPOS_PAGINATED_QUERY,
+            REPO_COMMITS_PAGINATED_QUERY,
+        )
+    }
+    
+    # Nome da operação de cada consulta: as latências das duplicadas são separadas por ele
+    _OPERATION_NAMES = {
+        USER_SIMPLE_QUERY: "UserSimple",
+        REPOSITORY_SIMPLE_QUERY: "RepositorySimple",
+        USER_WITH_REPOS_QUERY: "UserWithRepos",
+        REPO_WITH_ISSUES_QUERY: "RepoWithIssues",
+        SEARCH_REPOSITORIES_QUERY: "SearchRepositories",
+        SEARCH_USERS_QUERY: "SearchUsers",
+        USER_REPOS_PAGINATED_QUERY: "UserReposPaginated",
+        REPO_COMMITS_PAGINATED_QUERY: "RepoCommitsPaginated",
+    }
+    
+    def __init__(self, token: str = None, base_url: str = GITHUB_API_URL, persisted_queries: bool = False,
+                 transport: str = "http1", rate_limit_field: bool = False, retry_policy: RetryPolicy = None,
+                 codec: JSONCodec = None):
+        self.url = f"{base_url.rstrip('/')}/graphql"
+        self.headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "GraphQL-REST-Experiment"
+        }
+        
+        if token:
+            self.headers["Authorization"] = f"bearer {token}"
+        elif base_url == GITHUB_API_URL:
+            raise ValueError("Token do GitHub é obrigatório para usar a API GraphQL")
+        
+        self.persisted_queries = persisted_queries
+        self.rate_limit_field = rate_limit_field
+        self.codec = codec or JSONCodec()
+        self.transport = create_transport(transport, self.headers, base_url)
+        if retry_policy is not None:
+            # Todas as operações enviadas por este cliente são consultas, seguras para repetir
+            self.transport = ResilientTransport(self.transport, retry_policy, idempotent_post=True)
+        self.last_metrics: Dict[str, Any] = {}
+    
+    @property
+    def session(self):
+        """Sessão HTTP do transporte atual (pode ser recriada ao forçar conexões novas)"""
+        return self.transport.session
+    
+    def _post(self, payload: Dict, route: str = None) -> Tuple[Dict[Any, Any], Dict[str, Any]]:
+        body = self.codec.dumps(payload)
+        response, metrics = self.transport.request("POST", self.url, data=body, route=route)
+        try:
+            response.raise_for_status()
+        except TRANSPORT_ERRORS as e:
+            attach_resilience(e, metrics)
+            raise
+        
+        metrics["request_size_bytes"] = len(body)
+        metrics["request_count"] = 1
+        metrics["response_size_bytes"] = len(response.content)
+        metrics["server_parse_ms"] = parse_server_timing(response.headers.get("Server-Timing")).get("parse")
+        metrics.update(rate_limit_from_headers(response.headers))
+        
+        # Sempre decodifica na hora: a resposta precisa ser inspecionada em busca de erros
+        decode_start = time.perf_counter()
+        data = self.codec.loads(response.content)
+        metrics["decode_ms"] = (time.perf_counter() - decode_start) * 1000
+        metrics["json_backend"] = self.codec.backend
+        
+        return data, metrics
+    
+    def _prepare_query(self, query: str) -> str:
+        return with_rate_limit_field(query) if self.rate_limit_field else query
+    
+    def _execute_query(self, query: str, variables: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
+        route = self._OPERATION_NAMES.get(query)
+        query = self._prepare_query(query)
+        payload = {}
+        if self.persisted_queries:
+            minified, sha256_hash = self._PERSISTED_QUERIES.get(query) or persist_query(query)
+            payload["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash}}
+        else:
+            payload["query"] = query
+        if variables:
+            payload["variables"] = variables
+        
+        self.last_metrics = {}
+        start_time = time.perf_counter()
+        
+        try:
+            data, metrics = self._post(payload, route)
+            
+            if self.persisted_queries:
+                metrics["persisted_query"] = PERSISTED_HIT
+                error = _persisted_query_error(data)
+                if error:
+                    # O servidor não conhece o hash: reenvia o texto para registrá-lo (ou usa só o texto)
+                    if error == "PersistedQueryNotSupported":
+                        del payload["extensions"]
+                    payload["query"] = minified
+                    data, retry_metrics = self._post(payload, route)
+                    combine_metrics(metrics, retry_metrics)
+                    metrics["persisted_query"] = (
+                        PERSISTED_UNSUPPORTED if error == "PersistedQueryNotSupported" else PERSISTED_REGISTERED
+                    )
+            
+            end_time = time.perf_counter()
+            
+            response_time_ms = (end_time - start_time) * 1000 - metrics["decode_ms"]
+            response_size_bytes = metrics["response_size_bytes"]
+            
+            metrics["response_time_ms"] = response_time_ms
+            pop_rate_limit(data.get("data"), metrics)
+            self.last_metrics = metrics
+            
+            if "errors" in data:
+                print(f"Erros GraphQL: {data['errors']}")
+                raise Exception(f"GraphQL errors: {data['errors']}")
+            
+            return data["data"], response_time_ms, response_size_bytes
+            
+        except TRANSPORT_ERRORS as e:
+            print(f"Erro na requisição GraphQL: {e}")
+            raise
+    
+    def get_user_simple(self, username: str) -> Tuple[Dict, float, int]:
+        variables = {"login": username}
+        return self._execute_query(USER_SIMPLE_QUERY, variables)
+    
+    def get_repository_simple(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
+        variables = {"owner": owner, "name": repo}
+        return self._execute_query(REPOSITORY_SIMPLE_QUERY, variables)
+    
+    def get_user_with_repos(self, username: str) -> Tuple[Dict, float, int]:
+        variables = {"login": username}
+        return self._execute_query(USER_WITH_REPOS_QUERY, variables)
+    
+    def get_repo_with_issues(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
         variables = {"owner": owner, "name": repo}
-        return self._execute_query(query, variables)
+        return self._execute_query(REPO_WITH_ISSUES_QUERY, variables)
     
     def search_repositories(self, query_string: str, first: int = 10) -> Tuple[Dict, float, int]:
-        query = """
-        query($queryString: String!, $first: Int!) {
-            search(query: $queryString, type: REPOSITORY, first: $first) {
-                repositoryCount
-                nodes {
-                    ... on Repository {
-                        name
-                        description
-                        url
-                        stargazerCount
-                        forkCount
-                        primaryLanguage {
-                            name
-                        }
-                        owner {
-                            login
-                        }
-                        createdAt
-                        updatedAt
-                    }
-                }
-            }
-        }
-        """
         variables = {"queryString": query_string, "first": first}
-        return self._execute_query(query, variables)
+        return self._execute_query(SEARCH_REPOSITORIES_QUERY, variables)
     
     def search_users(self, query_string: str, first: int = 10) -> Tuple[Dict, float, int]:
-        query = """
-        query($queryString: String!, $first: Int!) {
-            search(query: $queryString, type: USER, first: $first) {
-                userCount
-                nodes {
-                    ... on User {
-                        login
-                        name
-                        bio
-                        location
-                        company
-                        avatarUrl
-                        followers {
-                            totalCount
-                        }
-                        repositories {
-                            totalCount
-                        }
-                    }
-                }
-            }
-        }
-        """
         variables = {"queryString": query_string, "first": first}
-        return self._execute_query(query, variables)
+        return self._execute_query(SEARCH_USERS_QUERY, variables)
     
     def get_user_repos_paginated(self, username: str, first: int = 10, after: str = None) -> Tuple[Dict, float, int]:
-        query = """
-        query($login: String!, $first: Int!, $after: String) {
-            user(login: $login) {
-                repositories(first: $first, after: $after, orderBy: {field: UPDATED_AT, direction: DESC}) {
-                    totalCount
-                    pageInfo {
-                        hasNextPage
-                        endCursor
-                    }
-                    nodes {
-                        name
-                        description
-                        url
-                        stargazerCount
-                        forkCount
-                        primaryLanguage {
-                            name
-                        }
-                        createdAt
-                        updatedAt
-                    }
-                }
-            }
-        }
-        """
         variables = {"login": username, "first": first}
         if after:
             variables["after"] = after
         
-        return self._execute_query(query, variables)
+        return self._execute_query(USER_REPOS_PAGINATED_QUERY, variables)
     
     def get_repo_commits_paginated(self, owner: str, repo: str, first: int = 10, after: str = None) -> Tuple[Dict, float, int]:
-        query = """
-        query($owner: String!, $name: String!, $first: Int!, $after: String) {
-            repository(owner: $owner, name: $name) {
-                defaultBranchRef {
-                    target {
-                        ... on Commit {
-                            history(first: $first, after: $after) {
-                                totalCount
-                                pageInfo {
-                                    hasNextPage
-                                    endCursor
-                                }
-                                nodes {
-                                    message
-                                    committedDate
-                                    author {
-                                        name
-                                    }
-                                    additions
-                                    deletions
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        """
         variables = {"owner": owner, "name": repo, "first": first}
         if after:
             variables["after"] = after
         
-        return self._execute_query(query, variables)
+        return self._execute_query(REPO_COMMITS_PAGINATED_QUERY, variables)
+    
+    def _iterate(self, query: str, variables: Dict, path: Tuple[str, ...], prefetch: bool,
+                 max_pages: int = None) -> PageIterator:
+        """Itera por todas as páginas da conexão em `path`, seguindo o `endCursor` enquanto houver `hasNextPage`"""
+        def fetch_page(cursor: str) -> Tuple[List, str, Dict[str, Any]]:
+            page_variables = dict(variables, after=cursor) if cursor else variables
+            data, _, _ = self._execute_query(query, page_variables)
+            metrics = dict(self.last_metrics)
+            
+            connection = data
+            for key in path:
+                connection = (connection or {}).get(key)
+            if connection is None:
+                return [], None, metrics
+            
+            page_info = connection["pageInfo"]
+            next_cursor = page_info["endCursor"] if page_info["hasNextPage"] else None
+            return connection["nodes"], next_cursor, metrics
+        
+        return PageIterator(fetch_page, None, prefetch=prefetch, max_pages=max_pages)
+    
+    def iter_user_repos(self, username: str, first: int = 100, prefetch: bool = False,
+                        max_pages: int = None) -> PageIterator:
+        variables = {"login": username, "first": first}
+        return self._iterate(USER_REPOS_PAGINATED_QUERY, variables, ("user", "repositories"), prefetch, max_pages)
+    
+    def iter_repo_commits(self, owner: str, repo: str, first: int = 100, prefetch: bool = False,
+                          max_pages: int = None) -> PageIterator:
+        variables = {"owner": owner, "name": repo, "first": first}
+        path = ("repository", "defaultBranchRef", "target", "history")
+        return self._iterate(REPO_COMMITS_PAGINATED_QUERY, variables, path, prefetch, max_pages)
+    
+    def _fetch_collection(self, query: str, variables: Dict, path: Tuple[str, ...],
+                          limit: int) -> Tuple[List, float, int]:
+        """
+        Busca os primeiros `limit` itens de uma conexão seguindo os cursores
+        
+        Cada página depende do `endCursor` da anterior, então as requisições
+        são necessariamente sequenciais.
+        """
+        first = min(variables["first"], limit)
+        pages = self._iterate(query, dict(variables, first=first), path, prefetch=False,
+                              max_pages=-(-limit // first))
+        
+        combined = {}
+        items = []
+        start_time = time.perf_counter()
+        
+        for page in pages.pages():
+            items.extend(page.items)
+            combine_metrics(combined, page.metrics)
+        
+        total_time_ms = (time.perf_counter() - start_time) * 1000
+        items = items[:limit]
+        
+        combined["response_time_ms"] = total_time_ms
+        combined["items_count"] = len(items)
+        combined["items_per_second"] = len(items) / (total_time_ms / 1000) if total_time_ms else None
+        self.last_metrics = combined
+        return items, total_time_ms, combined.get("response_size_bytes", 0)
+    
+    def fetch_user_repos(self, username: str, limit: int, first: int = 100) -> Tuple[List, float, int]:
+        variables = {"login": username, "first": first}
+        return self._fetch_collection(USER_REPOS_PAGINATED_QUERY, variables, ("user", "repositories"), limit)
+    
+    def fetch_repo_commits(self, owner: str, repo: str, limit: int, first: int = 100) -> Tuple[List, float, int]:
+        variables = {"owner": owner, "name": repo, "first": first}
+        path = ("repository", "defaultBranchRef", "target", "history")
+        return self._fetch_collection(REPO_COMMITS_PAGINATED_QUERY, variables, path, limit)
     
     def close(self):
-        self.session.close()
+        self.transport.close()
 
 
 def get_github_token() -> str:
@@ -0,0 +1,320 @@
+"""
+Histogramas HDR (High Dynamic Range) de latência
+Registram valores inteiros (microssegundos) em baldes logarítmicos com
+precisão relativa fixa, ocupando memória constante independentemente do
+número de amostras; podem ser somados entre execuções e salvos em JSON
+"""
+
+import json
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+
+# Latências são registradas em microssegundos; 1 hora cobre qualquer timeout do experimento
+DEFAULT_HIGHEST_VALUE = 3_600_000_000
+
+DEFAULT_SIGNIFICANT_FIGURES = 3
+
+REPORT_PERCENTILES = [50, 90, 99, 99.9]
+
+
+def percentile_label(p: float) -> str:
+    """Nome da coluna de um percentil (p50_ms, p99_9_ms, ...)"""
+    return f"p{p:g}".replace(".", "_") + "_ms"
+
+
+class HdrHistogram:
+    """
+    Histograma com precisão de `significant_figures` dígitos entre
+    `lowest_value` e `highest_value`
+
+    Segue o layout do HdrHistogram original: cada balde cobre uma potência
+    de dois e é dividido em sub-baldes lineares, de modo que o erro de
+    qualquer valor registrado fica abaixo de 10^-significant_figures.
+    Valores acima de `highest_value` são saturados no maior balde.
+    """
+
+    def __init__(self, lowest_value: int = 1, highest_value: int = DEFAULT_HIGHEST_VALUE,
+                 significant_figures: int = DEFAULT_SIGNIFICANT_FIGURES):
+        if lowest_value < 1:
+            raise ValueError("lowest_value deve ser >= 1")
+        if highest_value < 2 * lowest_value:
+            raise ValueError("highest_value deve ser >= 2 * lowest_value")
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures deve estar entre 1 e 5")
+
+        self.lowest_value = lowest_value
+        self.highest_value = highest_value
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._sub_bucket_half_count_magnitude = max(math.ceil(math.log2(largest_single_unit)) - 1, 0)
+        self._unit_magnitude = int(math.floor(math.log2(lowest_value)))
+        self._sub_bucket_count = 2 ** (self._sub_bucket_half_count_magnitude + 1)
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest_value:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._bucket_count = bucket_count
+
+        self.counts: List[int] = [0] * ((bucket_count + 1) * self._sub_bucket_half_count)
+        self.total_count = 0
+        self.min_value = None
+        self.max_value = None
+        self._sum = 0
+
+    # Índices
+
+    def _bucket_index(self, value: int) -> int:
+        return (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude \
+            - (self._sub_bucket_half_count_magnitude + 1)
+
+    def _counts_index(self, value: int) -> int:
+        bucket = self._bucket_index(value)
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._sub_bucket_half_count_magnitude) + (sub_bucket - self._sub_bucket_half_count)
+
+    def _value_from_index(self, index: int) -> int:
+        bucket = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return sub_bucket << (bucket + self._unit_magnitude)
+
+    def _equivalent_range(self, value: int) -> int:
+        bucket = self._bucket_index(value)
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        if sub_bucket >= self._sub_bucket_count:
+            bucket += 1
+        return 1 << (self._unit_magnitude + bucket)
+
+    def lowest_equivalent_value(self, value: int) -> int:
+        bucket = self._bucket_index(value)
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return sub_bucket << (bucket + self._unit_magnitude)
+
+    def highest_equivalent_value(self, value: int) -> int:
+        return self.lowest_equivalent_value(value) + self._equivalent_range(value) - 1
+
+    # Registro
+
+    def record(self, value: float, count: int = 1):
+        """Registra `value` (arredondado para inteiro) `count` vezes"""
+        value = min(max(int(round(value)), 0), self.highest_value)
+        self.counts[self._counts_index(value)] += count
+        self.total_count += count
+        self._sum += value * count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def record_array(self, values: Iterable[float]):
+        """Registra muitos valores de uma vez, com o cálculo dos índices vetorizado no NumPy"""
+        values = np.clip(np.rint(np.asarray(values, dtype=float)), 0, self.highest_value).astype(np.int64)
+        if not len(values):
+            return
+        # frexp devolve o expoente e tal que v = m * 2^e com 0.5 <= m < 1, ou seja, o bit_length de v
+        buckets = np.frexp((values | self._sub_bucket_mask).astype(float))[1] - self._unit_magnitude \
+            - (self._sub_bucket_half_count_magnitude + 1)
+        sub_buckets = values >> (buckets + self._unit_magnitude)
+        indices = ((buckets + 1) << self._sub_bucket_half_count_magnitude) + (sub_buckets - self._sub_bucket_half_count)
+        counts = np.bincount(indices, minlength=len(self.counts))
+        for index in np.flatnonzero(counts):
+            self.counts[index] += int(counts[index])
+
+        self.total_count += len(values)
+        self._sum += int(values.sum())
+        low, high = int(values.min()), int(values.max())
+        self.min_value = low if self.min_value is None else min(self.min_value, low)
+        self.max_value = high if self.max_value is None else max(self.max_value, high)
+
+    def add(self, other: "HdrHistogram"):
+        """Soma as contagens de outro histograma com a mesma configuração"""
+        if self.config != other.config:
+            raise ValueError(f"Histogramas incompatíveis: {self.config} != {other.config}")
+        for index, count in other._nonzero():
+            self.counts[index] += count
+        self.total_count += other.total_count
+        self._sum += other._sum
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+
+    # Consultas
+
+    @property
+    def config(self) -> Tuple[int, int, int]:
+        return self.lowest_value, self.highest_value, self.significant_figures
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count if self.total_count else None
+
+    def value_at_percentile(self, p: float) -> int:
+        """Maior valor equivalente ao balde que contém o percentil `p` (0-100)"""
+        if not self.total_count:
+            return None
+        target = max(1, math.ceil(min(max(p, 0.0), 100.0) / 100 * self.total_count))
+        running = 0
+        for index, count in self._nonzero():
+            running += count
+            if running >= target:
+                return min(self.highest_equivalent_value(self._value_from_index(index)), self.max_value)
+        return self.max_value
+
+    def percentiles(self, ps: List[float] = None) -> Dict[float, int]:
+        """Vários percentis numa única passada pelas contagens"""
+        ps = sorted(REPORT_PERCENTILES if ps is None else ps)
+        result = {p: None for p in ps}
+        if not self.total_count:
+            return result
+        targets = [(p, max(1, math.ceil(min(max(p, 0.0), 100.0) / 100 * self.total_count))) for p in ps]
+        running = 0
+        position = 0
+        for index, count in self._nonzero():
+            running += count
+            while position < len(targets) and running >= targets[position][1]:
+                value = self.highest_equivalent_value(self._value_from_index(index))
+                result[targets[position][0]] = min(value, self.max_value)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def recorded_values(self) -> Iterator[Tuple[int, int]]:
+        """Pares (valor representativo, contagem) dos sub-baldes não vazios, em ordem crescente"""
+        for index, count in self._nonzero():
+            yield self.highest_equivalent_value(self._value_from_index(index)), count
+
+    def _nonzero(self) -> Iterator[Tuple[int, int]]:
+        for index, count in enumerate(self.counts):
+            if count:
+                yield index, count
+
+    # Serialização
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável em JSON; só os sub-baldes não vazios são guardados"""
+        return {
+            "lowest_value": self.lowest_value,
+            "highest_value": self.highest_value,
+            "significant_figures": self.significant_figures,
+            "total_count": self.total_count,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "sum": self._sum,
+            "counts": [[index, count] for index, count in self._nonzero()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HdrHistogram":
+        histogram = cls(data["lowest_value"], data["highest_value"], data["significant_figures"])
+        for index, count in data["counts"]:
+            histogram.counts[index] = count
+        histogram.total_count = data["total_count"]
+        histogram.min_value = data["min_value"]
+        histogram.max_value = data["max_value"]
+        histogram._sum = data["sum"]
+        return histogram
+
+
+class LatencyHistograms:
+    """
+    Histogramas de latência indexados por (api_type, query_type)
+
+    Recebe latências em milissegundos e registra em microssegundos. É
+    seguro para uso concorrente quando cada thread registra no seu próprio
+    conjunto e os conjuntos são somados com `merge` no final.
+    """
+
+    def __init__(self, significant_figures: int = DEFAULT_SIGNIFICANT_FIGURES):
+        self.significant_figures = significant_figures
+        self.histograms: Dict[Tuple[str, str], HdrHistogram] = {}
+
+    def _get(self, key: Tuple[str, str]) -> HdrHistogram:
+        if key not in self.histograms:
+            self.histograms[key] = HdrHistogram(significant_figures=self.significant_figures)
+        return self.histograms[key]
+
+    def record(self, api_type: str, query_type: str, latency_ms: float):
+        self._get((api_type, query_type)).record(latency_ms * 1000)
+
+    def record_array(self, api_type: str, query_type: str, latencies_ms: Iterable[float]):
+        self._get((api_type, query_type)).record_array(np.asarray(latencies_ms, dtype=float) * 1000)
+
+    @classmethod
+    def from_measurements(cls, measurements: List[Dict[str, Any]]) -> "LatencyHistograms":
+        """Histogramas de `response_time_ms` das medições bem-sucedidas"""
+        cells: Dict[Tuple[str, str], List[float]] = {}
+        for m in measurements:
+            if m["success"]:
+                cells.setdefault((m["api_type"], m["query_type"]), []).append(m["response_time_ms"])
+        histograms = cls()
+        for (api_type, query_type), latencies in cells.items():
+            histograms.record_array(api_type, query_type, latencies)
+        return histograms
+
+    def merge(self, other: "LatencyHistograms"):
+        for key, histogram in other.histograms.items():
+            self._get(key).add(histogram)
+
+    def combined(self, api_type: str = None) -> HdrHistogram:
+        """Soma dos histogramas de uma API (ou de todas)"""
+        total = HdrHistogram(significant_figures=self.significant_figures)
+        for (api, _), histogram in self.histograms.items():
+            if api_type is None or api == api_type:
+                total.add(histogram)
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": "us",
+            "significant_figures": self.significant_figures,
+            "histograms": [
+                {"api_type": api_type, "query_type": query_type, **histogram.to_dict()}
+                for (api_type, query_type), histogram in self.histograms.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistograms":
+        histograms = cls(data.get("significant_figures", DEFAULT_SIGNIFICANT_FIGURES))
+        for entry in data["histograms"]:
+            key = (entry["api_type"], entry["query_type"])
+            histograms.histograms[key] = HdrHistogram.from_dict(entry)
+        return histograms
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, paths: List[str]) -> "LatencyHistograms":
+        """Soma os histogramas salvos em vários arquivos (ex.: várias execuções do experimento)"""
+        merged = cls()
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                merged.merge(cls.from_dict(json.load(f)))
+        return merged
+
+
+def summarize_ms(histogram: HdrHistogram, ps: List[float] = None) -> Dict[str, float]:
+    """Média, mínimo, máximo e percentis de um histograma em microssegundos, convertidos para ms"""
+    ps = REPORT_PERCENTILES if ps is None else ps
+    to_ms = lambda value: value / 1000 if value is not None else None
+    summary = {
+        "mean_ms": to_ms(histogram.mean),
+        "min_ms": to_ms(histogram.min_value),
+        "max_ms": to_ms(histogram.max_value),
+    }
+    for p, value in histogram.percentiles(ps).items():
+        summary[percentile_label(p)] = to_ms(value)
+    return summary
@@ -0,0 +1,223 @@
+"""
+Cache HTTP com requisições condicionais para o cliente REST
+Guarda corpo e validadores (ETag / Last-Modified) numa LRU limitada por bytes,
+em memória e, opcionalmente, num diretório em disco
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+
+CACHE_HIT = "hit"
+CACHE_REVALIDATED = "revalidated"
+CACHE_MISS = "miss"
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_key(url: str, params: Dict = None) -> str:
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class CacheEntry:
+
+    def __init__(self, body: bytes, etag: str = None, last_modified: str = None,
+                 max_age: int = None, stored_at: float = None, link: str = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+        self.stored_at = stored_at or time.time()
+        self.link = link
+
+    @classmethod
+    def from_response(cls, body: bytes, headers) -> Optional["CacheEntry"]:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+
+        match = _MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+        return cls(body, etag, last_modified, int(match.group(1)) if match else None, link=headers.get("Link"))
+
+    def is_fresh(self) -> bool:
+        return self.max_age is not None and time.time() - self.stored_at < self.max_age
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, headers) -> "CacheEntry":
+        """Nova entrada com o mesmo corpo e validadores/idade atualizados por uma resposta 304"""
+        match = _MAX_AGE_RE.search(headers.get("Cache-Control", ""))
+        return CacheEntry(
+            self.body,
+            headers.get("ETag") or self.etag,
+            headers.get("Last-Modified") or self.last_modified,
+            int(match.group(1)) if match else self.max_age,
+            link=headers.get("Link") or self.link,
+        )
+
+    def to_bytes(self) -> bytes:
+        meta = {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "max_age": self.max_age,
+            "stored_at": self.stored_at,
+            "link": self.link,
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CacheEntry":
+        meta, _, body = raw.partition(b"\n")
+        return cls(body, **json.loads(meta))
+
+
+class ResponseCache:
+    """
+    LRU de respostas limitada pelo total de bytes dos corpos armazenados
+
+    Com `disk_dir`, toda entrada também é gravada em disco; uma ausência em
+    memória é então buscada no disco e promovida de volta para a LRU, o que
+    permite reaproveitar o cache entre execuções do experimento.
+
+    Args:
+        max_bytes: Limite de bytes em memória
+        disk_dir: Diretório do nível em disco (None desativa)
+        disk_max_bytes: Limite de bytes em disco
+        respect_max_age: Se True, respostas ainda dentro do max-age são servidas
+            sem nenhuma requisição; caso contrário toda reutilização é revalidada
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, disk_dir: str = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024, respect_max_age: bool = False):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.respect_max_age = respect_max_age
+        self.current_bytes = 0
+        self._disk_bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._store_memory(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        self._store_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.respect_max_age and entry.is_fresh()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _store_memory(self, key: str, entry: CacheEntry):
+        if len(entry.body) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous.body)
+
+            self._entries[key] = entry
+            self.current_bytes += len(entry.body)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted.body)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + ".cache")
+
+    def _read_disk(self, key: str) -> Optional[CacheEntry]:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = CacheEntry.from_bytes(f.read())
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, entry: CacheEntry):
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        data = entry.to_bytes()
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes += len(data) - previous_size
+            over_limit = self._disk_bytes > self.disk_max_bytes
+
+        if over_limit:
+            self._trim_disk()
+
+    def _disk_files(self):
+        files = []
+        with os.scandir(self.disk_dir) as it:
+            for item in it:
+                if item.name.endswith(".cache"):
+                    stat = item.stat()
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+        return files
+
+    def _trim_disk(self):
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+
+        for _, size, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        with self._lock:
+            self._disk_bytes = total
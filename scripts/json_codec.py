@@ -0,0 +1,116 @@
+"""
+Codificação e decodificação de JSON com backend intercambiável
+Usa o orjson quando está instalado (ou o json da biblioteca padrão) e pode
+adiar a decodificação das respostas até o primeiro acesso aos dados
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_BACKENDS = ["json", "orjson"]
+
+DEFAULT_BACKEND = "orjson" if orjson is not None else "json"
+
+
+class LazyJSON:
+    """
+    Documento JSON decodificado só no primeiro acesso
+
+    Se comporta como o dict/list decodificado para leitura (índice, `get`,
+    iteração, `len`, `in`); `value` força a decodificação.
+    """
+
+    __slots__ = ("_raw", "_codec", "_value", "_decoded")
+
+    def __init__(self, raw: bytes, codec: "JSONCodec"):
+        self._raw = raw
+        self._codec = codec
+        self._value = None
+        self._decoded = False
+
+    @property
+    def decoded(self) -> bool:
+        return self._decoded
+
+    @property
+    def value(self) -> Any:
+        if not self._decoded:
+            self._value = self._codec.loads(self._raw)
+            self._decoded = True
+            self._raw = None
+        return self._value
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __contains__(self, item) -> bool:
+        return item in self.value
+
+    def __eq__(self, other) -> bool:
+        return self.value == (other.value if isinstance(other, LazyJSON) else other)
+
+    def __repr__(self) -> str:
+        return repr(self.value) if self._decoded else f"LazyJSON({len(self._raw)} bytes)"
+
+    def get(self, key, default=None):
+        return self.value.get(key, default)
+
+    def keys(self):
+        return self.value.keys()
+
+    def values(self):
+        return self.value.values()
+
+    def items(self):
+        return self.value.items()
+
+
+class JSONCodec:
+    """
+    Args:
+        backend: "json" ou "orjson" (None escolhe o orjson quando disponível)
+        lazy: `decode` devolve um LazyJSON em vez de decodificar na hora
+    """
+
+    def __init__(self, backend: str = None, lazy: bool = False):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Backend JSON desconhecido: {backend}")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("O backend orjson requer o pacote orjson instalado")
+        self.backend = backend
+        self.lazy = lazy
+
+    @property
+    def name(self) -> str:
+        """Valor registrado na coluna `json_backend` das medições"""
+        return f"{self.backend}-lazy" if self.lazy else self.backend
+
+    def loads(self, raw: bytes) -> Any:
+        if self.backend == "orjson":
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    def decode(self, raw: bytes) -> Any:
+        """Decodifica uma resposta (ou adia a decodificação, com `lazy`)"""
+        return LazyJSON(raw, self) if self.lazy else self.loads(raw)
+
+    def dumps(self, value: Any, indent: bool = False) -> bytes:
+        """Codifica em UTF-8 sem espaços entre os separadores (ou indentado com 2 espaços)"""
+        if self.backend == "orjson":
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+        if indent:
+            return json.dumps(value, indent=2, ensure_ascii=False).encode()
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
@@ -0,0 +1,526 @@
+"""
+Geração de carga para o experimento GraphQL vs REST
+Em malha fechada, N usuários virtuais por API, cada um com sua própria
+sessão, executam a mistura de tratamentos do registro durante um tempo
+fixo. Em malha aberta, as requisições chegam numa taxa alvo (constante ou
+Poisson) independente do tempo de resposta, e a latência é medida a partir
+do instante em que cada requisição deveria ter sido enviada. Cada nível
+reporta vazão, percentis de latência e taxa de erro
+"""
+
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+from rest_client import RESTClient, GITHUB_API_URL
+from graphql_client import GraphQLClient
+from local_server import LocalServer
+from transport import TRANSPORTS
+from treatments import TreatmentRegistry, Treatment, DEFAULT_TREATMENTS_FILE
+from hdr_histogram import LatencyHistograms, REPORT_PERCENTILES, percentile_label, summarize_ms
+
+load_dotenv()
+
+LOAD_APIS = {"REST": "rest", "GraphQL": "graphql"}
+
+PERCENTILES = [50, 90, 95, 99]
+
+SUMMARY_COLUMNS = [
+    "api_type", "concurrency", "duration_s", "requests", "errors", "error_rate", "throughput_rps",
+    "mean_ms", "min_ms", "max_ms",
+] + [f"p{p}_ms" for p in PERCENTILES]
+
+LOAD_MODES = ["closed", "open"]
+
+ARRIVALS = ["constant", "poisson"]
+
+# max_lag_ms: maior atraso do agendador em relação ao instante planejado de envio
+OPEN_SUMMARY_COLUMNS = [
+    "api_type", "target_rps", "arrival", "workers", "duration_s", "scheduled", "completed", "errors",
+    "error_rate", "throughput_rps", "max_lag_ms", "mean_ms", "min_ms", "max_ms",
+] + [percentile_label(p) for p in REPORT_PERCENTILES]
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Percentil pelo método do posto mais próximo sobre valores já ordenados"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-p * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def arrival_offsets(rate: float, duration_s: float, arrival: str = "constant",
+                    rng: random.Random = random) -> Iterator[float]:
+    """
+    Instantes planejados de envio (segundos desde o início) para `rate` req/s
+
+    "constant" espaça as chegadas igualmente; "poisson" sorteia intervalos
+    exponenciais com a mesma média.
+    """
+    if rate <= 0:
+        raise ValueError("A taxa alvo deve ser positiva")
+    if arrival not in ARRIVALS:
+        raise ValueError(f"Processo de chegada desconhecido: {arrival}")
+    index = 0
+    offset = 0.0
+    while True:
+        if arrival == "constant":
+            offset = index / rate
+            index += 1
+        else:
+            offset += rng.expovariate(rate)
+        if offset >= duration_s:
+            return
+        yield offset
+
+
+def _raise_start_error(threads: List[threading.Thread]):
+    """Espera as threads liberadas pela barreira abortada e relança a falha na criação do cliente"""
+    for thread in threads:
+        thread.join()
+    raise next(thread.error for thread in threads if thread.error is not None)
+
+
+class _VirtualUser(threading.Thread):
+    """Executa tratamentos sorteados em sequência (malha fechada) até o fim do teste"""
+
+    def __init__(self, runner: "LoadTestRunner", api_type: str, concurrency: int, start: threading.Barrier,
+                 seed: int):
+        super().__init__(name=f"vu-{api_type}-{seed}", daemon=True)
+        self.runner = runner
+        self.api_type = api_type
+        self.side = LOAD_APIS[api_type]
+        self.concurrency = concurrency
+        self.start_barrier = start
+        self.rng = random.Random(seed)
+        self.samples: List[Dict[str, Any]] = []
+        self.deadline = None
+        self.error = None
+
+    def run(self):
+        try:
+            client = self.runner.create_client(self.api_type)
+        except Exception as e:
+            # Libera quem espera na barreira; o executor relança o erro
+            self.error = e
+            self.start_barrier.abort()
+            return
+        try:
+            try:
+                self.start_barrier.wait()
+            except threading.BrokenBarrierError:
+                return
+            self.deadline = self.runner.deadline
+            while time.perf_counter() < self.deadline:
+                self._request(client, self.rng.choice(self.runner.treatments))
+        finally:
+            client.close()
+
+    def _request(self, client, treatment: Treatment):
+        params = treatment.generate_params(self.runner.registry.pools, self.runner.settings,
+                                           self.runner.resolve, self.rng)
+        call = treatment.calls[self.side]
+        args, kwargs, _ = call.bind(params)
+
+        error = None
+        start = time.perf_counter()
+        try:
+            getattr(client, call.method)(*args, **kwargs)
+        except Exception as e:
+            error = str(e)
+        end = time.perf_counter()
+
+        self.samples.append({
+            "api_type": self.api_type,
+            "concurrency": self.concurrency,
+            "query_type": treatment.query_type,
+            "query_name": treatment.query_name,
+            "started_at": start - self.runner.started_at,
+            "latency_ms": (end - start) * 1000,
+            "success": error is None,
+            "error_msg": error,
+        })
+
+
+class _OpenLoopWorker(threading.Thread):
+    """Executa as requisições agendadas na fila, medindo a latência desde o envio planejado"""
+
+    def __init__(self, runner: "LoadTestRunner", api_type: str, jobs: queue.Queue, start: threading.Barrier,
+                 seed: int):
+        super().__init__(name=f"open-{api_type}-{seed}", daemon=True)
+        self.runner = runner
+        self.api_type = api_type
+        self.side = LOAD_APIS[api_type]
+        self.jobs = jobs
+        self.start_barrier = start
+        self.rng = random.Random(seed)
+        self.histograms = LatencyHistograms()
+        self.completed = 0
+        self.errors = 0
+        self.error = None
+
+    def run(self):
+        try:
+            client = self.runner.create_client(self.api_type)
+        except Exception as e:
+            # Libera quem espera na barreira; o executor relança o erro
+            self.error = e
+            self.start_barrier.abort()
+            return
+        try:
+            try:
+                self.start_barrier.wait()
+            except threading.BrokenBarrierError:
+                return
+            while True:
+                intended = self.jobs.get()
+                if intended is None:
+                    break
+                self._request(client, self.rng.choice(self.runner.treatments), intended)
+        finally:
+            client.close()
+
+    def _request(self, client, treatment: Treatment, intended: float):
+        params = treatment.generate_params(self.runner.registry.pools, self.runner.settings,
+                                           self.runner.resolve, self.rng)
+        call = treatment.calls[self.side]
+        args, kwargs, _ = call.bind(params)
+
+        try:
+            getattr(client, call.method)(*args, **kwargs)
+        except Exception:
+            self.errors += 1
+            return
+        finally:
+            self.completed += 1
+        # Inclui o tempo na fila quando todos os workers estavam ocupados (sem omissão coordenada)
+        self.histograms.record(self.api_type, treatment.query_type, (time.perf_counter() - intended) * 1000)
+
+
+class LoadTestRunner:
+    """
+    Executa os níveis de concorrência em sequência para cada API
+
+    Args:
+        treatments: Nomes dos tratamentos da mistura (None usa todos os habilitados)
+        collection_size: Habilita os tratamentos que exigem `collection_size`
+    """
+
+    def __init__(self, token: str, base_url: str = GITHUB_API_URL, transport: str = "http1",
+                 treatments_file: str = DEFAULT_TREATMENTS_FILE, treatments: List[str] = None,
+                 collection_size: int = None, output_dir: str = "results"):
+        self.token = token
+        self.base_url = base_url
+        self.transport = transport
+        self.output_dir = output_dir
+        self.registry = TreatmentRegistry(treatments_file)
+        self.settings = {"collection_size": collection_size}
+        self.treatments = [
+            t for t in self.registry.enabled(self.settings) if treatments is None or t.name in treatments
+        ]
+        if not self.treatments:
+            raise ValueError("Nenhum tratamento selecionado para a mistura de carga")
+
+        self.samples: List[Dict[str, Any]] = []
+        self.summary: List[Dict[str, Any]] = []
+        self.open_summary: List[Dict[str, Any]] = []
+        self.histograms: List[Dict[str, Any]] = []
+        self._resolved = {}
+        self._resolve_lock = threading.Lock()
+        self.started_at = None
+        self.deadline = None
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def create_client(self, api_type: str):
+        if api_type == "REST":
+            return RESTClient(self.token, self.base_url, transport=self.transport)
+        return GraphQLClient(self.token, self.base_url, transport=self.transport)
+
+    def resolve(self, name: str, args: List):
+        """Resolvedores do registro, calculados uma vez e compartilhados entre os usuários virtuais"""
+        key = (name, tuple(args))
+        with self._resolve_lock:
+            if key not in self._resolved:
+                if name != "latest_repo":
+                    raise ValueError(f"Resolvedor desconhecido: {name}")
+                client = self.create_client("REST")
+                try:
+                    repos, _, _ = client.get_user_repos_paginated(*args, per_page=1)
+                finally:
+                    client.close()
+                self._resolved[key] = repos[0]["name"]
+            return self._resolved[key]
+
+    def run_level(self, api_type: str, concurrency: int, duration_s: float) -> Dict[str, Any]:
+        """Mantém `concurrency` usuários virtuais da API ocupados durante `duration_s` segundos"""
+        def start_window():
+            # Executada quando todos chegam à barreira: a criação dos clientes fica fora da janela medida
+            self.started_at = time.perf_counter()
+            self.deadline = self.started_at + duration_s
+
+        barrier = threading.Barrier(concurrency + 1, action=start_window)
+        users = [_VirtualUser(self, api_type, concurrency, barrier, seed) for seed in range(concurrency)]
+        for user in users:
+            user.start()
+
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            _raise_start_error(users)
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - self.started_at
+
+        samples = [sample for user in users for sample in user.samples]
+        self.samples.extend(samples)
+        level = self._summarize(api_type, concurrency, elapsed, samples)
+        self.summary.append(level)
+
+        histograms = LatencyHistograms()
+        for sample in samples:
+            if sample["success"]:
+                histograms.record(api_type, sample["query_type"], sample["latency_ms"])
+        self.histograms.append({"mode": "closed", "api_type": api_type, "concurrency": concurrency,
+                                **histograms.to_dict()})
+        return level
+
+    def run_open_level(self, api_type: str, rate: float, duration_s: float, arrival: str = "constant",
+                       workers: int = 64, seed: int = 0) -> Dict[str, Any]:
+        """
+        Envia requisições da API a `rate` req/s durante `duration_s` segundos
+
+        O agendador não espera as respostas: cada chegada entra na fila no
+        instante planejado e é atendida pelo primeiro dos `workers` livres.
+        """
+        jobs = queue.Queue()
+        barrier = threading.Barrier(workers + 1)
+        pool = [_OpenLoopWorker(self, api_type, jobs, barrier, seed * 1000 + i) for i in range(workers)]
+        for worker in pool:
+            worker.start()
+
+        rng = random.Random(seed)
+        scheduled = 0
+        max_lag = 0.0
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            _raise_start_error(pool)
+        started_at = time.perf_counter()
+        try:
+            for offset in arrival_offsets(rate, duration_s, arrival, rng):
+                intended = started_at + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                max_lag = max(max_lag, time.perf_counter() - intended)
+                jobs.put(intended)
+                scheduled += 1
+        finally:
+            for _ in pool:
+                jobs.put(None)
+            for worker in pool:
+                worker.join()
+        elapsed = time.perf_counter() - started_at
+
+        histograms = LatencyHistograms()
+        for worker in pool:
+            histograms.merge(worker.histograms)
+        completed = sum(worker.completed for worker in pool)
+        errors = sum(worker.errors for worker in pool)
+        level = {
+            "api_type": api_type,
+            "target_rps": rate,
+            "arrival": arrival,
+            "workers": workers,
+            "duration_s": elapsed,
+            "scheduled": scheduled,
+            "completed": completed,
+            "errors": errors,
+            "error_rate": errors / completed if completed else None,
+            "throughput_rps": (completed - errors) / elapsed if elapsed else None,
+            "max_lag_ms": max_lag * 1000,
+            **summarize_ms(histograms.combined(api_type)),
+        }
+        self.open_summary.append(level)
+        self.histograms.append({"mode": "open", "api_type": api_type, "target_rps": rate, "arrival": arrival,
+                                **histograms.to_dict()})
+        return level
+
+    @staticmethod
+    def _summarize(api_type: str, concurrency: int, elapsed: float, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latencies = sorted(s["latency_ms"] for s in samples if s["success"])
+        errors = sum(1 for s in samples if not s["success"])
+        level = {
+            "api_type": api_type,
+            "concurrency": concurrency,
+            "duration_s": elapsed,
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": errors / len(samples) if samples else None,
+            "throughput_rps": len(latencies) / elapsed if elapsed else None,
+            "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+            "min_ms": latencies[0] if latencies else None,
+            "max_ms": latencies[-1] if latencies else None,
+        }
+        for p in PERCENTILES:
+            level[f"p{p}_ms"] = percentile(latencies, p)
+        return level
+
+    def run_open(self, rates: List[float], duration_s: float, api_types: List[str], arrival: str = "constant",
+                 workers: int = 64):
+        print("\n" + "=" * 70)
+        print("TESTE DE CARGA EM MALHA ABERTA: GraphQL vs REST")
+        print("=" * 70)
+        print(f"  - Taxas alvo: {rates} req/s ({arrival})")
+        print(f"  - Duração por nível: {duration_s:.0f} s")
+        print(f"  - Workers por API: {workers}")
+        print(f"  - Mistura: {', '.join(t.name for t in self.treatments)}")
+        print("=" * 70)
+
+        for seed, rate in enumerate(rates):
+            for api_type in api_types:
+                print(f"\n▶ {api_type} a {rate:g} req/s...")
+                level = self.run_open_level(api_type, rate, duration_s, arrival, workers, seed)
+                self._print_open_level(level)
+
+    def run(self, concurrency_levels: List[int], duration_s: float, api_types: List[str]):
+        print("\n" + "=" * 70)
+        print("TESTE DE CARGA EM MALHA FECHADA: GraphQL vs REST")
+        print("=" * 70)
+        print(f"  - Níveis de concorrência: {concurrency_levels}")
+        print(f"  - Duração por nível: {duration_s:.0f} s")
+        print(f"  - Mistura: {', '.join(t.name for t in self.treatments)}")
+        print("=" * 70)
+
+        for concurrency in concurrency_levels:
+            for api_type in api_types:
+                print(f"\n▶ {api_type} com {concurrency} usuários virtuais...")
+                level = self.run_level(api_type, concurrency, duration_s)
+                self._print_level(level)
+
+    @staticmethod
+    def _print_level(level: Dict[str, Any]):
+        if not level["requests"]:
+            print("  ✗ Nenhuma requisição concluída")
+            return
+        percentiles = " | ".join(
+            f"p{p}: {level[f'p{p}_ms']:.1f} ms" for p in PERCENTILES if level[f"p{p}_ms"] is not None
+        )
+        print(f"  ✓ {level['requests']} requisições | {level['throughput_rps']:.1f} req/s | "
+              f"erros: {level['error_rate']:.1%}")
+        if percentiles:
+            print(f"    {percentiles}")
+
+    @staticmethod
+    def _print_open_level(level: Dict[str, Any]):
+        if not level["completed"]:
+            print("  ✗ Nenhuma requisição concluída")
+            return
+        percentiles = " | ".join(
+            f"p{p:g}: {level[percentile_label(p)]:.1f} ms" for p in REPORT_PERCENTILES
+            if level[percentile_label(p)] is not None
+        )
+        print(f"  ✓ {level['completed']}/{level['scheduled']} requisições | {level['throughput_rps']:.1f} req/s | "
+              f"erros: {level['error_rate']:.1%} | atraso máx. do agendador: {level['max_lag_ms']:.1f} ms")
+        if percentiles:
+            print(f"    {percentiles}")
+
+    def save_results(self, filename_prefix: str = "load_test"):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if self.summary:
+            samples_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}.csv")
+            with open(samples_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                if self.samples:
+                    writer = csv.DictWriter(csvfile, fieldnames=list(self.samples[0]))
+                    writer.writeheader()
+                    writer.writerows(self.samples)
+            print(f"\n✓ Amostras salvas em: {samples_filename}")
+
+            summary_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}_summary.csv")
+            with open(summary_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=SUMMARY_COLUMNS)
+                writer.writeheader()
+                writer.writerows(self.summary)
+            print(f"✓ Resumo por nível salvo em: {summary_filename}")
+
+        if self.open_summary:
+            open_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}_open_summary.csv")
+            with open(open_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=OPEN_SUMMARY_COLUMNS)
+                writer.writeheader()
+                writer.writerows(self.open_summary)
+            print(f"\n✓ Resumo da malha aberta salvo em: {open_filename}")
+
+        if self.histograms:
+            histograms_filename = os.path.join(self.output_dir, f"{filename_prefix}_{timestamp}_histograms.json")
+            with open(histograms_filename, 'w', encoding='utf-8') as f:
+                json.dump({"levels": self.histograms}, f)
+            print(f"✓ Histogramas HDR salvos em: {histograms_filename}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga em malha fechada ou aberta: GraphQL vs REST")
+    parser.add_argument("--mode", choices=LOAD_MODES, default="closed",
+                        help="closed: N usuários virtuais; open: chegadas numa taxa alvo")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50],
+                        help="Níveis de concorrência (usuários virtuais por API, malha fechada)")
+    parser.add_argument("--rps", type=float, nargs="+", default=[10, 50, 100],
+                        help="Taxas alvo em requisições por segundo (malha aberta)")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="constant",
+                        help="Processo de chegada da malha aberta")
+    parser.add_argument("--workers", type=int, default=64,
+                        help="Threads que atendem as chegadas da malha aberta, por API")
+    parser.add_argument("--duration", type=float, default=30, help="Duração de cada nível em segundos")
+    parser.add_argument("--apis", nargs="+", choices=list(LOAD_APIS), default=list(LOAD_APIS))
+    parser.add_argument("--treatments", default=DEFAULT_TREATMENTS_FILE,
+                        help="Arquivo YAML com o registro de tratamentos")
+    parser.add_argument("--mix", nargs="+", default=None,
+                        help="Nomes dos tratamentos da mistura (padrão: todos os habilitados)")
+    parser.add_argument("--collection-size", type=int, default=None,
+                        help="Inclui os tratamentos de coleções completas com esse número de itens")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="http1")
+    parser.add_argument("--base-url", default=GITHUB_API_URL)
+    parser.add_argument("--local", action="store_true",
+                        help="Inicia o servidor local com dados sintéticos e gera a carga contra ele")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    token = os.getenv("GITHUB_TOKEN")
+
+    local_server = None
+    base_url = args.base_url
+    if args.local:
+        local_server = LocalServer()
+        base_url = local_server.start()
+        print(f"\n✓ Servidor local iniciado em: {base_url}")
+    elif base_url == GITHUB_API_URL:
+        print("\n⚠ Gerando carga contra a API pública do GitHub: os limites de taxa serão atingidos rapidamente")
+
+    runner = LoadTestRunner(token, base_url, transport=args.transport, treatments_file=args.treatments,
+                            treatments=args.mix, collection_size=args.collection_size)
+    try:
+        if args.mode == "open":
+            runner.run_open(args.rps, args.duration, args.apis, args.arrival, args.workers)
+        else:
+            runner.run(args.concurrency, args.duration, args.apis)
+    except KeyboardInterrupt:
+        print("\n\n✗ Teste interrompido pelo usuário")
+    finally:
+        runner.save_results()
+        if local_server:
+            local_server.stop()
+
+
+if __name__ == "__main__":
+    main()
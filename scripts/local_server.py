@@ -0,0 +1,1337 @@
+"""
+Servidor local que substitui a API do GitHub no experimento GraphQL vs REST
+Implementa as rotas REST e as operações GraphQL usadas pelos clientes sobre
+um conjunto de dados sintético e determinístico, permitindo executar o
+experimento sem token, sem rede e sem limite de requisições
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DEFAULT_LOGINS = ["torvalds", "gvanrossum", "mojombo", "defunkt", "pjhyett"]
+
+LARGE_COLLECTION_USER = "torvalds"
+LARGE_COLLECTION_SIZE = 1500
+LARGE_HISTORY_SIZE = 5000
+
+LANGUAGES = ["Python", "JavaScript", "Java", "Go", "C", "Ruby", "TypeScript", "Rust", "C++", "Shell"]
+TOPICS = ["machine-learning", "web", "cli", "database", "compiler", "devops", "security", "graphics"]
+WORDS = [
+    "atlas", "beacon", "cobalt", "delta", "ember", "falcon", "granite", "harbor", "iris", "juniper",
+    "kernel", "lumen", "meridian", "nimbus", "orbit", "prism", "quartz", "relay", "summit", "tundra",
+]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Felipe", "Gabriela", "Hugo", "Isabel", "João"]
+LAST_NAMES = ["Silva", "Souza", "Costa", "Pereira", "Almeida", "Ribeiro", "Lima", "Gomes", "Martins", "Rocha"]
+CITIES = ["Belo Horizonte", "São Paulo", "Portland", "Helsinki", "Amsterdam", "San Francisco", None]
+
+EPOCH = datetime(2008, 1, 1)
+SNAPSHOT = datetime(2025, 11, 30)
+
+MAX_PER_PAGE = 100
+
+# Cotas (requisições, janela em segundos) por recurso; o padrão local não limita na prática
+GITHUB_RATE_LIMITS = {"core": (5000, 3600), "search": (30, 60), "graphql": (5000, 3600)}
+LOCAL_RATE_LIMITS = {"core": (1_000_000, 3600), "search": (1_000_000, 3600), "graphql": (1_000_000, 3600)}
+
+# Como a API do GitHub, respostas muito pequenas não são comprimidas
+MIN_COMPRESS_BYTES = 1024
+COMPRESSORS = {"gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)}
+if brotli is not None:
+    COMPRESSORS = {"br": lambda body: brotli.compress(body, quality=4), **COMPRESSORS}
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _encode_cursor(index: int) -> str:
+    return base64.b64encode(f"cursor:{index}".encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(base64.b64decode(cursor).decode().split(":", 1)[1]) + 1
+    except (ValueError, IndexError):
+        raise GraphQLError(f"`{cursor}` does not appear to be a valid cursor.")
+
+
+class SyntheticDataset:
+    """
+    Conjunto de dados sintético e determinístico com usuários, repositórios, issues e commits
+
+    Cada entidade é gerada sob demanda a partir de um gerador aleatório semeado
+    pela sua identidade, então coleções grandes não ficam em memória e duas
+    instâncias com a mesma semente produzem exatamente os mesmos dados.
+    """
+
+    def __init__(self, seed: int = 42, extra_users: int = 45):
+        self.seed = seed
+        self.logins = DEFAULT_LOGINS + [f"dev{i:03d}" for i in range(extra_users)]
+        self._users = {login: self._make_user(index, login) for index, login in enumerate(self.logins)}
+        self._search_index = None
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(":".join(str(k) for k in (self.seed,) + key))
+
+    def _make_user(self, index: int, login: str) -> Dict[str, Any]:
+        rng = self._rng("user", login)
+        created_at = EPOCH + timedelta(days=rng.randint(0, 2500))
+
+        if login == LARGE_COLLECTION_USER:
+            repo_count = LARGE_COLLECTION_SIZE
+        else:
+            repo_count = rng.randint(10, 160)
+
+        return {
+            "id": 1000 + index,
+            "login": login,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "company": rng.choice([None, "@github", "@python", "Acme Corp", "PUC Minas"]),
+            "blog": rng.choice(["", f"https://{login}.dev"]),
+            "location": rng.choice(CITIES),
+            "email": None,
+            "bio": rng.choice([None, "Open source enthusiast.", "Building tools for developers."]),
+            "twitter_username": rng.choice([None, login]),
+            "public_repos": repo_count,
+            "public_gists": rng.randint(0, 80),
+            "followers": int(rng.lognormvariate(7, 2)),
+            "following": rng.randint(0, 300),
+            "created_at": created_at,
+            "updated_at": SNAPSHOT - timedelta(days=rng.randint(0, 60)),
+        }
+
+    def user(self, login: str) -> Optional[Dict[str, Any]]:
+        return self._users.get(login)
+
+    def repo_count(self, login: str) -> int:
+        user = self.user(login)
+        return user["public_repos"] if user else 0
+
+    @lru_cache(maxsize=8192)
+    def _make_repo(self, owner: str, index: int) -> Dict[str, Any]:
+        rng = self._rng("repo", owner, index)
+        user = self._users[owner]
+        created_at = user["created_at"] + timedelta(days=rng.randint(0, 1500))
+        commit_count = LARGE_HISTORY_SIZE if index == 0 else rng.randint(30, 3000)
+
+        return {
+            "id": user["id"] * 100000 + index,
+            "owner": owner,
+            "index": index,
+            "name": f"{rng.choice(WORDS)}-{index}",
+            "description": rng.choice([None, f"{rng.choice(WORDS).capitalize()} toolkit", "Experimental project"]),
+            "language": rng.choice(LANGUAGES),
+            "topics": rng.sample(TOPICS, rng.randint(0, 3)),
+            "stargazers_count": int(rng.lognormvariate(6, 2.2)),
+            "forks_count": int(rng.lognormvariate(4, 2)),
+            "watchers_count": int(rng.lognormvariate(3, 1.5)),
+            "open_issues_count": rng.randint(0, 40),
+            "issue_count": rng.randint(0, 120),
+            "commit_count": commit_count,
+            "fork": rng.random() < 0.15,
+            "license": rng.choice([None, "MIT License", "Apache License 2.0", "GNU General Public License v2.0"]),
+            "created_at": created_at,
+            # A ordem dos índices coincide com a ordem por data de atualização decrescente
+            "updated_at": SNAPSHOT - timedelta(hours=index * 7 + rng.randint(0, 6)),
+        }
+
+    def repos(self, owner: str, start: int, stop: int) -> List[Dict[str, Any]]:
+        stop = min(stop, self.repo_count(owner))
+        return [self._make_repo(owner, i) for i in range(start, stop)]
+
+    def repo(self, owner: str, name: str) -> Optional[Dict[str, Any]]:
+        if owner not in self._users:
+            return None
+        _, _, suffix = name.rpartition("-")
+        if not suffix.isdigit() or int(suffix) >= self.repo_count(owner):
+            return None
+        repo = self._make_repo(owner, int(suffix))
+        return repo if repo["name"] == name else None
+
+    def issue(self, repo: Dict[str, Any], index: int) -> Dict[str, Any]:
+        rng = self._rng("issue", repo["owner"], repo["name"], index)
+        created_at = repo["created_at"] + timedelta(days=rng.randint(0, 900))
+        return {
+            "id": repo["id"] * 1000 + index,
+            "number": repo["issue_count"] - index,
+            "title": f"{rng.choice(['Fix', 'Add', 'Improve', 'Remove'])} {rng.choice(WORDS)} handling",
+            "body": "Steps to reproduce are described below." * rng.randint(1, 4),
+            "state": "open" if rng.random() < 0.3 else "closed",
+            "author": rng.choice(self.logins),
+            "comments": rng.randint(0, 25),
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(days=rng.randint(0, 30)),
+        }
+
+    def issues(self, repo: Dict[str, Any], start: int, stop: int) -> List[Dict[str, Any]]:
+        stop = min(stop, repo["issue_count"])
+        return [self.issue(repo, i) for i in range(start, stop)]
+
+    def commit(self, repo: Dict[str, Any], index: int) -> Dict[str, Any]:
+        key = f"{self.seed}:commit:{repo['owner']}/{repo['name']}:{index}"
+        rng = random.Random(key)
+        author = rng.choice(self.logins)
+        return {
+            "sha": hashlib.sha1(key.encode()).hexdigest(),
+            "message": f"{rng.choice(['Refactor', 'Fix', 'Update', 'Document'])} {rng.choice(WORDS)} module",
+            "author": author,
+            "author_name": self._users[author]["name"],
+            "date": repo["updated_at"] - timedelta(minutes=index * 37),
+            "additions": rng.randint(0, 400),
+            "deletions": rng.randint(0, 200),
+        }
+
+    def commits(self, repo: Dict[str, Any], start: int, stop: int) -> List[Dict[str, Any]]:
+        stop = min(stop, repo["commit_count"])
+        return [self.commit(repo, i) for i in range(start, stop)]
+
+    def search_repos(self, query: str) -> List[Dict[str, Any]]:
+        if self._search_index is None:
+            self._search_index = [
+                self._make_repo(login, i)
+                for login in self.logins
+                for i in range(min(self.repo_count(login), 200))
+            ]
+
+        terms = query.split()
+        results = [repo for repo in self._search_index if all(_match_repo(repo, term) for term in terms)]
+        results.sort(key=lambda repo: (-repo["stargazers_count"], repo["id"]))
+        return results
+
+    def search_users(self, query: str) -> List[Dict[str, Any]]:
+        terms = query.lower().split()
+        results = [
+            user for user in self._users.values()
+            if all(term in user["login"].lower() or term in user["name"].lower() for term in terms)
+        ]
+        results.sort(key=lambda user: -user["followers"])
+        return results
+
+
+def _match_repo(repo: Dict[str, Any], term: str) -> bool:
+    qualifier, _, value = term.partition(":")
+    if not value:
+        text = f"{repo['name']} {repo['description'] or ''}".lower()
+        return term.lower() in text
+    if qualifier == "language":
+        return repo["language"].lower() == value.lower()
+    if qualifier == "topic":
+        return value.lower() in repo["topics"]
+    if qualifier == "user":
+        return repo["owner"] == value
+    if qualifier == "stars":
+        match = re.fullmatch(r"(>=|<=|>|<)?(\d+)", value)
+        if not match:
+            return True
+        op, number = match.group(1) or "=", int(match.group(2))
+        stars = repo["stargazers_count"]
+        return {
+            ">": stars > number, ">=": stars >= number,
+            "<": stars < number, "<=": stars <= number, "=": stars == number,
+        }[op]
+    return True
+
+
+# ---------------------------------------------------------------------------
+# GraphQL: analisador e executor mínimos para as operações do GraphQLClient
+# ---------------------------------------------------------------------------
+
+class GraphQLError(Exception):
+    pass
+
+
+_TOKEN_RE = re.compile(
+    r'(?P<spread>\.\.\.)|(?P<name>[_A-Za-z][_0-9A-Za-z]*)|(?P<number>-?\d+(?:\.\d+)?)'
+    r'|(?P<string>"(?:[^"\\]|\\.)*")|(?P<punct>[{}()\[\]:!$=@])'
+)
+_IGNORED_RE = re.compile(r'(?:[\s,]+|#[^\n]*)+')
+
+
+class _Field:
+    __slots__ = ("alias", "name", "args", "selections")
+
+    def __init__(self, alias, name, args, selections):
+        self.alias = alias
+        self.name = name
+        self.args = args
+        self.selections = selections
+
+
+class _InlineFragment:
+    __slots__ = ("type_condition", "selections")
+
+    def __init__(self, type_condition, selections):
+        self.type_condition = type_condition
+        self.selections = selections
+
+
+class _Variable:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _Parser:
+
+    def __init__(self, source: str):
+        self.tokens = self._tokenize(source)
+        self.pos = 0
+
+    @staticmethod
+    def _tokenize(source: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        while pos < len(source):
+            ignored = _IGNORED_RE.match(source, pos)
+            if ignored:
+                pos = ignored.end()
+                continue
+            match = _TOKEN_RE.match(source, pos)
+            if not match:
+                raise GraphQLError(f"Parse error on \"{source[pos]}\" at position {pos}")
+            tokens.append((match.lastgroup, match.group()))
+            pos = match.end()
+        return tokens
+
+    def _peek(self, value: str = None) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        return value is None or self.tokens[self.pos][1] == value
+
+    def _next(self, expected: str = None) -> str:
+        if self.pos >= len(self.tokens):
+            raise GraphQLError("Parse error: unexpected end of document")
+        kind, value = self.tokens[self.pos]
+        if expected is not None and value != expected:
+            raise GraphQLError(f"Parse error: expected \"{expected}\", found \"{value}\"")
+        self.pos += 1
+        return value
+
+    def parse(self) -> Tuple[List[str], List]:
+        """Retorna (nomes das variáveis declaradas, seleções da operação)"""
+        variables = []
+        if self._peek("query"):
+            self._next()
+            if self._peek() and self.tokens[self.pos][0] == "name":
+                self._next()
+            if self._peek("("):
+                self._next()
+                while not self._peek(")"):
+                    self._next("$")
+                    variables.append(self._next())
+                    self._next(":")
+                    self._parse_type()
+                    if self._peek("="):
+                        self._next()
+                        self._parse_value()
+                self._next(")")
+        selections = self._parse_selection_set()
+        if self.pos != len(self.tokens):
+            raise GraphQLError("Parse error: only one operation per document is supported")
+        return variables, selections
+
+    def _parse_type(self):
+        if self._peek("["):
+            self._next()
+            self._parse_type()
+            self._next("]")
+        else:
+            self._next()
+        if self._peek("!"):
+            self._next()
+
+    def _parse_selection_set(self) -> List:
+        self._next("{")
+        selections = []
+        while not self._peek("}"):
+            if self._peek("..."):
+                self._next()
+                self._next("on")
+                type_condition = self._next()
+                selections.append(_InlineFragment(type_condition, self._parse_selection_set()))
+                continue
+
+            alias, name = None, self._next()
+            if self._peek(":"):
+                self._next()
+                alias, name = name, self._next()
+
+            args = {}
+            if self._peek("("):
+                self._next()
+                while not self._peek(")"):
+                    arg_name = self._next()
+                    self._next(":")
+                    args[arg_name] = self._parse_value()
+                self._next(")")
+
+            children = self._parse_selection_set() if self._peek("{") else None
+            selections.append(_Field(alias, name, args, children))
+        self._next("}")
+        return selections
+
+    def _parse_value(self):
+        kind, value = self.tokens[self.pos]
+        if value == "$":
+            self._next()
+            return _Variable(self._next())
+        if value == "[":
+            self._next()
+            items = []
+            while not self._peek("]"):
+                items.append(self._parse_value())
+            self._next("]")
+            return items
+        if value == "{":
+            self._next()
+            fields = {}
+            while not self._peek("}"):
+                key = self._next()
+                self._next(":")
+                fields[key] = self._parse_value()
+            self._next("}")
+            return fields
+        self._next()
+        if kind == "string":
+            return json.loads(value)
+        if kind == "number":
+            return float(value) if "." in value else int(value)
+        return {"true": True, "false": False, "null": None}.get(value, value)
+
+
+def _resolve_value(value, variables: Dict[str, Any]):
+    if isinstance(value, _Variable):
+        return variables.get(value.name)
+    if isinstance(value, list):
+        return [_resolve_value(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: _resolve_value(v, variables) for k, v in value.items()}
+    return value
+
+
+def execute_selections(selections: List, obj: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa um conjunto de seleções sobre um objeto cujos campos são valores ou funções resolvedoras"""
+    result = {}
+    for selection in selections:
+        if isinstance(selection, _InlineFragment):
+            if selection.type_condition == obj.get("__typename"):
+                result.update(execute_selections(selection.selections, obj, variables))
+            continue
+
+        if selection.name not in obj:
+            raise GraphQLError(
+                f"Field '{selection.name}' doesn't exist on type '{obj.get('__typename', 'Query')}'"
+            )
+
+        value = obj[selection.name]
+        if callable(value):
+            args = {k: _resolve_value(v, variables) for k, v in selection.args.items()}
+            value = value(**args)
+
+        result[selection.alias or selection.name] = _complete(value, selection.selections, variables)
+    return result
+
+
+def _complete(value, selections, variables):
+    if value is None or selections is None:
+        return value
+    if isinstance(value, list):
+        return [_complete(item, selections, variables) for item in value]
+    return execute_selections(selections, value, variables)
+
+
+class GraphQLSchema:
+    """Resolvedores que expõem o SyntheticDataset com os tipos e campos do schema do GitHub"""
+
+    def __init__(self, dataset: SyntheticDataset, rate_limit: Callable[[], Dict[str, Any]] = None):
+        self.dataset = dataset
+        self.rate_limit = rate_limit
+
+    def root(self) -> Dict[str, Any]:
+        return {
+            "__typename": "Query",
+            "user": self._resolve_user,
+            "repository": self._resolve_repository,
+            "search": self._resolve_search,
+            "rateLimit": self._resolve_rate_limit,
+        }
+
+    def _resolve_rate_limit(self, **_):
+        status = self.rate_limit() if self.rate_limit else {"limit": 5000, "used": 1, "remaining": 4999,
+                                                            "reset": int(time.time()) + 3600}
+        return {
+            "__typename": "RateLimit",
+            "cost": 1,
+            "limit": status["limit"],
+            "used": status["used"],
+            "remaining": status["remaining"],
+            "nodeCount": 0,
+            "resetAt": datetime.fromtimestamp(status["reset"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+
+    @staticmethod
+    def parse(query: str) -> List:
+        _, selections = _Parser(query).parse()
+        return selections
+
+    def execute_document(self, selections: List, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Executa cada campo raiz separadamente: um erro anula só o seu campo, com `path` apontando o alias"""
+        root = self.root()
+        data, errors = {}, []
+        for selection in selections:
+            try:
+                data.update(execute_selections([selection], root, variables or {}))
+            except GraphQLError as e:
+                key = getattr(selection, "alias", None) or getattr(selection, "name", None)
+                data[key] = None
+                errors.append({"type": "NOT_FOUND", "path": [key], "message": str(e)})
+
+        result = {"data": data}
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def execute(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        try:
+            selections = self.parse(query)
+        except GraphQLError as e:
+            return {"data": None, "errors": [{"message": str(e)}]}
+        return self.execute_document(selections, variables)
+
+    @staticmethod
+    def _connection(total: int, fetch: Callable[[int, int], List], first: int = None, after: str = None):
+        start = _decode_cursor(after)
+
+        def nodes():
+            if first is None:
+                raise GraphQLError("You must provide a `first` or `last` value to properly paginate.")
+            return fetch(start, start + min(first, MAX_PER_PAGE))
+
+        def page_info():
+            stop = min(start + min(first or 0, MAX_PER_PAGE), total)
+            return {
+                "hasNextPage": stop < total,
+                "hasPreviousPage": start > 0,
+                "startCursor": _encode_cursor(start) if stop > start else None,
+                "endCursor": _encode_cursor(stop - 1) if stop > start else None,
+            }
+
+        return {"totalCount": total, "nodes": nodes, "pageInfo": page_info}
+
+    def _resolve_user(self, login: str = None, **_):
+        user = self.dataset.user(login)
+        if user is None:
+            raise GraphQLError(f"Could not resolve to a User with the login of '{login}'.")
+        return self._user(user)
+
+    def _resolve_repository(self, owner: str = None, name: str = None, **_):
+        repo = self.dataset.repo(owner, name)
+        if repo is None:
+            raise GraphQLError(f"Could not resolve to a Repository with the name '{owner}/{name}'.")
+        return self._repository(repo)
+
+    def _resolve_search(self, query: str = "", type: str = "REPOSITORY", first: int = None, after: str = None, **_):
+        if type == "USER":
+            users = self.dataset.search_users(query)
+            connection = self._connection(len(users), lambda s, e: [self._user(u) for u in users[s:e]], first, after)
+        else:
+            repos = self.dataset.search_repos(query)
+            connection = self._connection(len(repos), lambda s, e: [self._repository(r) for r in repos[s:e]], first, after)
+        connection["repositoryCount"] = connection["totalCount"] if type == "REPOSITORY" else 0
+        connection["userCount"] = connection["totalCount"] if type == "USER" else 0
+        return connection
+
+    def _user(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        login = user["login"]
+        return {
+            "__typename": "User",
+            "login": login,
+            "name": user["name"],
+            "bio": user["bio"],
+            "company": user["company"],
+            "location": user["location"],
+            "websiteUrl": user["blog"] or None,
+            "avatarUrl": f"https://avatars.githubusercontent.com/u/{user['id']}?v=4",
+            "createdAt": _iso(user["created_at"]),
+            "updatedAt": _iso(user["updated_at"]),
+            "followers": {"totalCount": user["followers"]},
+            "following": {"totalCount": user["following"]},
+            "repositories": lambda first=None, after=None, orderBy=None, **_: self._connection(
+                self.dataset.repo_count(login),
+                lambda s, e: [self._repository(r) for r in self.dataset.repos(login, s, e)],
+                first, after,
+            ),
+        }
+
+    def _repository(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        owner = self.dataset.user(repo["owner"])
+        return {
+            "__typename": "Repository",
+            "name": repo["name"],
+            "description": repo["description"],
+            "url": f"https://github.com/{repo['owner']}/{repo['name']}",
+            "createdAt": _iso(repo["created_at"]),
+            "updatedAt": _iso(repo["updated_at"]),
+            "stargazerCount": repo["stargazers_count"],
+            "forkCount": repo["forks_count"],
+            "watchers": {"totalCount": repo["watchers_count"]},
+            "primaryLanguage": {"name": repo["language"]},
+            "isPrivate": False,
+            "isFork": repo["fork"],
+            "licenseInfo": {"name": repo["license"]} if repo["license"] else None,
+            "owner": lambda: self._user(owner),
+            "issues": lambda first=None, after=None, states=None, orderBy=None, **_: self._connection(
+                repo["issue_count"],
+                lambda s, e: [self._issue(i) for i in self.dataset.issues(repo, s, e)],
+                first, after,
+            ),
+            "defaultBranchRef": lambda: {
+                "__typename": "Ref",
+                "name": "main",
+                "target": self._commit_target(repo),
+            },
+        }
+
+    def _issue(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "__typename": "Issue",
+            "title": issue["title"],
+            "state": issue["state"].upper(),
+            "number": issue["number"],
+            "createdAt": _iso(issue["created_at"]),
+            "updatedAt": _iso(issue["updated_at"]),
+            "author": {"__typename": "User", "login": issue["author"]},
+            "comments": {"totalCount": issue["comments"]},
+        }
+
+    def _commit_target(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "__typename": "Commit",
+            "history": lambda first=None, after=None, **_: self._connection(
+                repo["commit_count"],
+                lambda s, e: [self._commit(c) for c in self.dataset.commits(repo, s, e)],
+                first, after,
+            ),
+        }
+
+    @staticmethod
+    def _commit(commit: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "__typename": "Commit",
+            "oid": commit["sha"],
+            "message": commit["message"],
+            "committedDate": _iso(commit["date"]),
+            "author": {"name": commit["author_name"]},
+            "additions": commit["additions"],
+            "deletions": commit["deletions"],
+        }
+
+
+# ---------------------------------------------------------------------------
+# REST: representações no formato da API v3 do GitHub
+# ---------------------------------------------------------------------------
+
+API_ROOT = "https://api.github.com"
+
+
+def _rest_user_summary(user: Dict[str, Any]) -> Dict[str, Any]:
+    login = user["login"]
+    url = f"{API_ROOT}/users/{login}"
+    return {
+        "login": login,
+        "id": user["id"],
+        "node_id": base64.b64encode(f"04:User{user['id']}".encode()).decode(),
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{user['id']}?v=4",
+        "gravatar_id": "",
+        "url": url,
+        "html_url": f"https://github.com/{login}",
+        "followers_url": f"{url}/followers",
+        "following_url": f"{url}/following{{/other_user}}",
+        "gists_url": f"{url}/gists{{/gist_id}}",
+        "starred_url": f"{url}/starred{{/owner}}{{/repo}}",
+        "subscriptions_url": f"{url}/subscriptions",
+        "organizations_url": f"{url}/orgs",
+        "repos_url": f"{url}/repos",
+        "events_url": f"{url}/events{{/privacy}}",
+        "received_events_url": f"{url}/received_events",
+        "type": "User",
+        "user_view_type": "public",
+        "site_admin": False,
+    }
+
+
+def _rest_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    data = _rest_user_summary(user)
+    data.update({
+        "name": user["name"],
+        "company": user["company"],
+        "blog": user["blog"],
+        "location": user["location"],
+        "email": user["email"],
+        "hireable": None,
+        "bio": user["bio"],
+        "twitter_username": user["twitter_username"],
+        "public_repos": user["public_repos"],
+        "public_gists": user["public_gists"],
+        "followers": user["followers"],
+        "following": user["following"],
+        "created_at": _iso(user["created_at"]),
+        "updated_at": _iso(user["updated_at"]),
+    })
+    return data
+
+
+def _rest_repo(repo: Dict[str, Any], owner: Dict[str, Any]) -> Dict[str, Any]:
+    full_name = f"{repo['owner']}/{repo['name']}"
+    url = f"{API_ROOT}/repos/{full_name}"
+    data = {
+        "id": repo["id"],
+        "node_id": base64.b64encode(f"010:Repository{repo['id']}".encode()).decode(),
+        "name": repo["name"],
+        "full_name": full_name,
+        "private": False,
+        "owner": _rest_user_summary(owner),
+        "html_url": f"https://github.com/{full_name}",
+        "description": repo["description"],
+        "fork": repo["fork"],
+        "url": url,
+    }
+    for resource in ["forks", "keys", "collaborators", "teams", "hooks", "issue_events", "events",
+                     "assignees", "branches", "tags", "blobs", "git_tags", "git_refs", "trees",
+                     "statuses", "languages", "stargazers", "contributors", "subscribers",
+                     "subscription", "commits", "git_commits", "comments", "issue_comment",
+                     "contents", "compare", "merges", "archive", "downloads", "issues", "pulls",
+                     "milestones", "notifications", "labels", "releases", "deployments"]:
+        data[f"{resource}_url"] = f"{url}/{resource.replace('_', '/')}"
+    data.update({
+        "created_at": _iso(repo["created_at"]),
+        "updated_at": _iso(repo["updated_at"]),
+        "pushed_at": _iso(repo["updated_at"]),
+        "git_url": f"git://github.com/{full_name}.git",
+        "ssh_url": f"git@github.com:{full_name}.git",
+        "clone_url": f"https://github.com/{full_name}.git",
+        "svn_url": f"https://github.com/{full_name}",
+        "homepage": None,
+        "size": repo["commit_count"] * 12,
+        "stargazers_count": repo["stargazers_count"],
+        "watchers_count": repo["stargazers_count"],
+        "language": repo["language"],
+        "has_issues": True,
+        "has_projects": True,
+        "has_downloads": True,
+        "has_wiki": True,
+        "has_pages": False,
+        "has_discussions": False,
+        "forks_count": repo["forks_count"],
+        "mirror_url": None,
+        "archived": False,
+        "disabled": False,
+        "open_issues_count": repo["open_issues_count"],
+        "license": {"name": repo["license"]} if repo["license"] else None,
+        "allow_forking": True,
+        "is_template": False,
+        "web_commit_signoff_required": False,
+        "topics": repo["topics"],
+        "visibility": "public",
+        "forks": repo["forks_count"],
+        "open_issues": repo["open_issues_count"],
+        "watchers": repo["stargazers_count"],
+        "default_branch": "main",
+    })
+    return data
+
+
+def _rest_issue(issue: Dict[str, Any], repo: Dict[str, Any], author: Dict[str, Any]) -> Dict[str, Any]:
+    url = f"{API_ROOT}/repos/{repo['owner']}/{repo['name']}/issues/{issue['number']}"
+    return {
+        "url": url,
+        "repository_url": f"{API_ROOT}/repos/{repo['owner']}/{repo['name']}",
+        "labels_url": f"{url}/labels{{/name}}",
+        "comments_url": f"{url}/comments",
+        "events_url": f"{url}/events",
+        "html_url": f"https://github.com/{repo['owner']}/{repo['name']}/issues/{issue['number']}",
+        "id": issue["id"],
+        "number": issue["number"],
+        "title": issue["title"],
+        "user": _rest_user_summary(author),
+        "labels": [],
+        "state": issue["state"],
+        "locked": False,
+        "assignee": None,
+        "assignees": [],
+        "milestone": None,
+        "comments": issue["comments"],
+        "created_at": _iso(issue["created_at"]),
+        "updated_at": _iso(issue["updated_at"]),
+        "closed_at": _iso(issue["updated_at"]) if issue["state"] == "closed" else None,
+        "author_association": "CONTRIBUTOR",
+        "body": issue["body"],
+    }
+
+
+def _rest_commit(commit: Dict[str, Any], repo: Dict[str, Any], author: Dict[str, Any]) -> Dict[str, Any]:
+    url = f"{API_ROOT}/repos/{repo['owner']}/{repo['name']}"
+    signature = {"name": commit["author_name"], "email": f"{commit['author']}@users.noreply.github.com",
+                 "date": _iso(commit["date"])}
+    return {
+        "sha": commit["sha"],
+        "node_id": base64.b64encode(f"C_{commit['sha'][:20]}".encode()).decode(),
+        "commit": {
+            "author": signature,
+            "committer": signature,
+            "message": commit["message"],
+            "tree": {"sha": commit["sha"][::-1], "url": f"{url}/git/trees/{commit['sha'][::-1]}"},
+            "url": f"{url}/git/commits/{commit['sha']}",
+            "comment_count": 0,
+        },
+        "url": f"{url}/commits/{commit['sha']}",
+        "html_url": f"https://github.com/{repo['owner']}/{repo['name']}/commit/{commit['sha']}",
+        "comments_url": f"{url}/commits/{commit['sha']}/comments",
+        "author": _rest_user_summary(author),
+        "committer": _rest_user_summary(author),
+        "parents": [],
+    }
+
+
+class RateLimits:
+    """Cotas por recurso como no GitHub: janela fixa que reinicia no instante `reset`"""
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]] = None):
+        self.limits = dict(limits or LOCAL_RATE_LIMITS)
+        self._state: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _current(self, resource: str, now: int) -> Tuple[int, int]:
+        used, reset = self._state.get(resource, (0, 0))
+        if now >= reset:
+            used, reset = 0, now + self.limits[resource][1]
+        return used, reset
+
+    def consume(self, resource: str, cost: int = 1) -> Tuple[bool, Dict[str, Any]]:
+        with self._lock:
+            now = int(time.time())
+            used, reset = self._current(resource, now)
+            allowed = used + cost <= self.limits[resource][0]
+            if allowed:
+                used += cost
+            self._state[resource] = (used, reset)
+        return allowed, self.status(resource)
+
+    def status(self, resource: str) -> Dict[str, Any]:
+        with self._lock:
+            used, reset = self._current(resource, int(time.time()))
+        limit = self.limits[resource][0]
+        return {"limit": limit, "used": used, "remaining": max(limit - used, 0), "reset": reset, "resource": resource}
+
+    @staticmethod
+    def headers(status: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(status["limit"]),
+            "X-RateLimit-Remaining": str(status["remaining"]),
+            "X-RateLimit-Reset": str(status["reset"]),
+            "X-RateLimit-Used": str(status["used"]),
+            "X-RateLimit-Resource": status["resource"],
+        }
+
+
+class LocalGitHubAPI:
+    """
+    Núcleo do servidor: recebe uma requisição já decodificada e devolve (status, cabeçalhos, corpo)
+
+    Independente do servidor HTTP, para que o mesmo núcleo possa ser servido
+    por diferentes implementações de transporte.
+
+    Args:
+        error_rate: Fração das requisições respondidas com 503 (falhas transitórias)
+        slow_rate: Fração das requisições atrasadas em `slow_ms` (cauda de latência)
+    """
+
+    def __init__(self, dataset: SyntheticDataset = None, persisted_queries: bool = True,
+                 rate_limits: Dict[str, Tuple[int, int]] = None, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_ms: float = 0.0):
+        self.dataset = dataset or SyntheticDataset()
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self._faults = random.Random()
+        self.rate_limits = RateLimits(rate_limits)
+        self.schema = GraphQLSchema(self.dataset, rate_limit=lambda: self.rate_limits.status("graphql"))
+        self.persisted_queries = persisted_queries
+        self._documents: Dict[str, List] = {}
+        self.routes = [
+            ("GET", re.compile(r"^/users/(?P<login>[^/]+)$"), self._get_user),
+            ("GET", re.compile(r"^/users/(?P<login>[^/]+)/repos$"), self._get_user_repos),
+            ("GET", re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)$"), self._get_repo),
+            ("GET", re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)/issues$"), self._get_repo_issues),
+            ("GET", re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)/commits$"), self._get_repo_commits),
+            ("GET", re.compile(r"^/search/repositories$"), self._search_repositories),
+            ("GET", re.compile(r"^/search/users$"), self._search_users),
+            ("POST", re.compile(r"^/graphql$"), self._graphql),
+            ("GET", re.compile(r"^/rate_limit$"), self._get_rate_limit),
+        ]
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes,
+               base_url: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        resource = self._rate_limit_resource(parts.path)
+        allowed, rate_limit = self.rate_limits.consume(resource) if resource else (True, None)
+
+        if resource and self.slow_rate and self._faults.random() < self.slow_rate:
+            time.sleep(self.slow_ms / 1000)
+
+        if not allowed:
+            status, payload, extra_headers = self._rate_limited(resource)
+        elif resource and self.error_rate and self._faults.random() < self.error_rate:
+            status, payload, extra_headers = 503, {"message": "Service Unavailable"}, {}
+        else:
+            for route_method, pattern, handler in self.routes:
+                match = pattern.match(parts.path)
+                if match and route_method == method:
+                    status, payload, extra_headers = handler(params=params, body=body, base_url=base_url,
+                                                             path=parts.path, **match.groupdict())
+                    break
+            else:
+                status, payload, extra_headers = 404, {"message": "Not Found"}, {}
+
+        response_body = json.dumps(payload, separators=(",", ":")).encode()
+        response_headers = {"Content-Type": "application/json; charset=utf-8"}
+        if rate_limit:
+            response_headers.update(RateLimits.headers(rate_limit))
+        response_headers.update(extra_headers)
+
+        if method == "GET" and status == 200:
+            etag = f'W/"{hashlib.sha1(response_body).hexdigest()}"'
+            response_headers.update({
+                "ETag": etag,
+                "Cache-Control": "private, max-age=60, s-maxage=60",
+                "Vary": "Accept, Authorization, Cookie, Accept-Encoding",
+            })
+            if headers.get("if-none-match") == etag:
+                return 304, response_headers, b""
+
+        encoding = self._negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding and len(response_body) >= MIN_COMPRESS_BYTES:
+            response_body = COMPRESSORS[encoding](response_body)
+            response_headers["Content-Encoding"] = encoding
+            response_headers.setdefault("Vary", "Accept-Encoding")
+
+        return status, response_headers, response_body
+
+    @staticmethod
+    def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+        """Escolhe a codificação preferida do servidor entre as aceitas pelo cliente (q=0 recusa)"""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(name.lower())
+        for encoding in COMPRESSORS:
+            if encoding in accepted:
+                return encoding
+        return None
+
+    @staticmethod
+    def _rate_limit_resource(path: str) -> Optional[str]:
+        if path == "/rate_limit":
+            return None
+        if path == "/graphql":
+            return "graphql"
+        if path.startswith("/search/"):
+            return "search"
+        return "core"
+
+    @staticmethod
+    def _rate_limited(resource: str):
+        message = "API rate limit exceeded for 127.0.0.1."
+        if resource == "graphql":
+            return 200, {"errors": [{"type": "RATE_LIMITED", "message": message}]}, {}
+        return 403, {
+            "message": f"{message} (But here's the good news: Authenticated requests get a higher rate limit.)",
+            "documentation_url": "https://docs.github.com/rest/overview/rate-limits-for-the-rest-api",
+        }, {}
+
+    def _get_rate_limit(self, **_):
+        resources = {name: self.rate_limits.status(name) for name in self.rate_limits.limits}
+        for status in resources.values():
+            del status["resource"]
+        return 200, {"resources": resources, "rate": resources["core"]}, {}
+
+    @staticmethod
+    def _not_found():
+        return 404, {"message": "Not Found", "documentation_url": "https://docs.github.com/rest"}, {}
+
+    @staticmethod
+    def _page_params(params: Dict[str, str]) -> Tuple[int, int]:
+        per_page = max(1, min(int(params.get("per_page", 30)), MAX_PER_PAGE))
+        page = max(1, int(params.get("page", 1)))
+        return per_page, page
+
+    @staticmethod
+    def _link_header(base_url: str, path: str, params: Dict[str, str], page: int, per_page: int,
+                     total: int) -> Dict[str, str]:
+        last = max(1, -(-total // per_page))
+        links = []
+        for rel, target in [("prev", page - 1), ("next", page + 1), ("last", last), ("first", 1)]:
+            if (rel in ("prev", "first") and page > 1) or (rel in ("next", "last") and page < last):
+                query = urlencode(dict(params, page=target, per_page=per_page))
+                links.append(f'<{base_url}{path}?{query}>; rel="{rel}"')
+        return {"Link": ", ".join(links)} if links else {}
+
+    def _paginate(self, total: int, fetch: Callable[[int, int], List], params: Dict[str, str],
+                  base_url: str, path: str):
+        per_page, page = self._page_params(params)
+        start = (page - 1) * per_page
+        items = fetch(start, start + per_page) if start < total else []
+        return items, self._link_header(base_url, path, params, page, per_page, total)
+
+    def _get_user(self, login: str, **_):
+        user = self.dataset.user(login)
+        if user is None:
+            return self._not_found()
+        return 200, _rest_user(user), {}
+
+    def _get_user_repos(self, login: str, params, base_url, path, **_):
+        user = self.dataset.user(login)
+        if user is None:
+            return self._not_found()
+        repos, headers = self._paginate(
+            self.dataset.repo_count(login), lambda s, e: self.dataset.repos(login, s, e), params, base_url, path
+        )
+        return 200, [_rest_repo(repo, user) for repo in repos], headers
+
+    def _get_repo(self, owner: str, name: str, **_):
+        repo = self.dataset.repo(owner, name)
+        if repo is None:
+            return self._not_found()
+        return 200, _rest_repo(repo, self.dataset.user(owner)), {}
+
+    def _get_repo_issues(self, owner: str, name: str, params, base_url, path, **_):
+        repo = self.dataset.repo(owner, name)
+        if repo is None:
+            return self._not_found()
+        state = params.get("state", "open")
+        issues = [i for i in self.dataset.issues(repo, 0, repo["issue_count"]) if state == "all" or i["state"] == state]
+        page_items, headers = self._paginate(len(issues), lambda s, e: issues[s:e], params, base_url, path)
+        return 200, [_rest_issue(i, repo, self.dataset.user(i["author"])) for i in page_items], headers
+
+    def _get_repo_commits(self, owner: str, name: str, params, base_url, path, **_):
+        repo = self.dataset.repo(owner, name)
+        if repo is None:
+            return self._not_found()
+        commits, headers = self._paginate(
+            repo["commit_count"], lambda s, e: self.dataset.commits(repo, s, e), params, base_url, path
+        )
+        return 200, [_rest_commit(c, repo, self.dataset.user(c["author"])) for c in commits], headers
+
+    def _search_repositories(self, params, base_url, path, **_):
+        repos = self.dataset.search_repos(params.get("q", ""))
+        page_items, headers = self._paginate(len(repos), lambda s, e: repos[s:e], params, base_url, path)
+        items = [dict(_rest_repo(r, self.dataset.user(r["owner"])), score=1.0) for r in page_items]
+        return 200, {"total_count": len(repos), "incomplete_results": False, "items": items}, headers
+
+    def _search_users(self, params, base_url, path, **_):
+        users = self.dataset.search_users(params.get("q", ""))
+        page_items, headers = self._paginate(len(users), lambda s, e: users[s:e], params, base_url, path)
+        items = [dict(_rest_user_summary(u), score=1.0) for u in page_items]
+        return 200, {"total_count": len(users), "incomplete_results": False, "items": items}, headers
+
+    def _graphql(self, body: bytes, **_):
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"message": "Problems parsing JSON"}, {}
+
+        query = payload.get("query")
+        persisted = (payload.get("extensions") or {}).get("persistedQuery") or {}
+        sha256_hash = persisted.get("sha256Hash") if self.persisted_queries else None
+
+        if persisted and not self.persisted_queries and not query:
+            return 200, {"errors": [{
+                "message": "PersistedQueryNotSupported",
+                "extensions": {"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+            }]}, {}
+        if not query and not sha256_hash:
+            return 200, {"errors": [{"message": "A query attribute must be specified and must be a string."}]}, {}
+
+        parse_start = time.perf_counter()
+        selections = self._documents.get(sha256_hash) if sha256_hash else None
+        if selections is None:
+            if not query:
+                return 200, {"errors": [{
+                    "message": "PersistedQueryNotFound",
+                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                }]}, {}
+            if sha256_hash and hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+                return 200, {"errors": [{"message": "provided sha does not match query"}]}, {}
+            try:
+                selections = self.schema.parse(query)
+            except GraphQLError as e:
+                return 200, {"data": None, "errors": [{"message": str(e)}]}, {}
+            if sha256_hash:
+                self._documents[sha256_hash] = selections
+        parse_ms = (time.perf_counter() - parse_start) * 1000
+
+        execute_start = time.perf_counter()
+        result = self.schema.execute_document(selections, payload.get("variables"))
+        execute_ms = (time.perf_counter() - execute_start) * 1000
+
+        return 200, result, {"Server-Timing": f"parse;dur={parse_ms:.3f}, execute;dur={execute_ms:.3f}"}
+
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class _H2Session:
+    """
+    Atende uma conexão HTTP/2 em texto claro (prior knowledge)
+
+    Cada stream é respondido numa thread própria, então requisições
+    simultâneas do cliente são de fato multiplexadas na mesma conexão.
+    O envio respeita as janelas de controle de fluxo do cliente.
+    """
+
+    def __init__(self, rfile, sock: socket.socket, api: "LocalGitHubAPI", server_name: str):
+        self.rfile = rfile
+        self.sock = sock
+        self.api = api
+        self.server_name = server_name
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.lock = threading.Condition()
+        self.streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        self.closed = False
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            self.sock.sendall(data)
+
+    def run(self):
+        with self.lock:
+            self.conn.initiate_connection()
+            self._flush()
+
+        try:
+            while not self.closed:
+                data = self.rfile.read1(65536)
+                if not data:
+                    break
+                with self.lock:
+                    events = self.conn.receive_data(data)
+                    self._flush()
+                for event in events:
+                    self._handle_event(event)
+        except (OSError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            with self.lock:
+                self.closed = True
+                self.lock.notify_all()
+
+    def _handle_event(self, event):
+        if isinstance(event, h2.events.RequestReceived):
+            self.streams[event.stream_id] = (dict(event.headers), bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self.streams[event.stream_id][1].extend(event.data)
+            with self.lock:
+                self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                self._flush()
+        elif isinstance(event, h2.events.StreamEnded):
+            threading.Thread(target=self._respond, args=(event.stream_id,), daemon=True).start()
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            with self.lock:
+                self.lock.notify_all()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self.closed = True
+
+    def _respond(self, stream_id: int):
+        request_headers, body = self.streams.pop(stream_id)
+        method = request_headers.get(":method", "GET")
+        headers = {name: value for name, value in request_headers.items() if not name.startswith(":")}
+        base_url = f"http://{request_headers.get(':authority', '')}"
+
+        status, response_headers, payload = self.api.handle(
+            method, request_headers.get(":path", "/"), headers, bytes(body), base_url
+        )
+        if method == "HEAD":
+            payload = b""
+
+        h2_headers = [(":status", str(status)), ("server", self.server_name)]
+        h2_headers += [(name.lower(), value) for name, value in response_headers.items()]
+        h2_headers.append(("content-length", str(len(payload))))
+
+        try:
+            with self.lock:
+                self.conn.send_headers(stream_id, h2_headers, end_stream=not payload)
+                self._flush()
+
+            offset = 0
+            while offset < len(payload):
+                with self.lock:
+                    while not self.closed:
+                        window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                        if window > 0:
+                            break
+                        self.lock.wait()
+                    if self.closed:
+                        return
+                    chunk = payload[offset:offset + window]
+                    offset += len(chunk)
+                    self.conn.send_data(stream_id, chunk, end_stream=offset >= len(payload))
+                    self._flush()
+        except (OSError, h2.exceptions.StreamClosedError):
+            pass
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LocalGitHubAPI/1.0"
+    # Cabeçalhos e corpo são escritos separadamente; sem isso o Nagle somado ao
+    # ACK atrasado do cliente acrescenta ~40 ms a várias respostas
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        """Conexões que começam com o prefácio HTTP/2 são atendidas como h2c; as demais como HTTP/1.1"""
+        if self.rfile.peek(len(H2_PREFACE))[:len(H2_PREFACE)] == H2_PREFACE:
+            _H2Session(self.rfile, self.connection, self.server.api, self.server_version).run()
+        else:
+            super().handle()
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        base_url = f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+
+        status, headers, payload = self.server.api.handle(
+            self.command, self.path, dict(self.headers.items()), body, base_url
+        )
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_HEAD = _dispatch
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _LocalHTTPServer(ThreadingHTTPServer):
+    # A fila padrão (5) recusa conexões quando muitos clientes conectam ao mesmo tempo
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class LocalServer:
+    """
+    Servidor multi-thread que expõe o LocalGitHubAPI em http://host:porta
+
+    Atende HTTP/1.1 e, na mesma porta, HTTP/2 em texto claro (prior knowledge).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, api: LocalGitHubAPI = None, verbose: bool = False):
+        self.api = api or LocalGitHubAPI()
+        self.httpd = _LocalHTTPServer((host, port), _RequestHandler)
+        self.httpd.api = self.api
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API do GitHub (REST e GraphQL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=42, help="Semente do conjunto de dados sintético")
+    parser.add_argument("--verbose", action="store_true", help="Registra cada requisição no console")
+    parser.add_argument("--no-persisted-queries", dest="persisted_queries", action="store_false",
+                        help="Recusa consultas persistidas (hash), exigindo sempre o texto completo")
+    parser.add_argument("--github-rate-limits", action="store_true",
+                        help="Aplica as cotas do GitHub (5000/h no core e no GraphQL, 30/min na busca)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fração das requisições respondidas com 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="Fração das requisições atrasadas em --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="Atraso das requisições lentas (ms)")
+    args = parser.parse_args()
+
+    api = LocalGitHubAPI(SyntheticDataset(seed=args.seed), persisted_queries=args.persisted_queries,
+                         rate_limits=GITHUB_RATE_LIMITS if args.github_rate_limits else None,
+                         error_rate=args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    server = LocalServer(args.host, args.port, api, args.verbose)
+    print("=" * 70)
+    print("SERVIDOR LOCAL DA API DO GITHUB")
+    print("=" * 70)
+    print(f"  - REST:    {server.base_url}")
+    print(f"  - GraphQL: {server.base_url}/graphql")
+    print(f"  - Semente: {args.seed}")
+    print("=" * 70)
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Servidor encerrado")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
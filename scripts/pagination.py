@@ -0,0 +1,113 @@
+"""
+Iteração preguiçosa sobre coleções paginadas
+Segue automaticamente o `Link: rel="next"` do REST ou o `endCursor` do
+GraphQL, entregando os itens página a página, com a busca da próxima
+página opcionalmente adiantada em segundo plano
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from requests.utils import parse_header_links
+from timing import worker_task
+
+
+# Métricas de cada página guardadas em `PageIterator.page_metrics`
+PAGE_METRIC_COLUMNS = ["response_time_ms", "response_size_bytes", "decode_ms", "cache_status", "http_version"]
+
+FetchPage = Callable[[Any], Tuple[List[Any], Any, Dict[str, Any]]]
+
+
+def parse_link_header(value: Optional[str]) -> Dict[str, str]:
+    """Converte um cabeçalho Link em {rel: url}"""
+    if not value:
+        return {}
+    return {link["rel"]: link["url"] for link in parse_header_links(value) if "rel" in link}
+
+
+class Page:
+    __slots__ = ("number", "items", "next_marker", "metrics")
+
+    def __init__(self, number: int, items: List[Any], next_marker: Any, metrics: Dict[str, Any]):
+        self.number = number
+        self.items = items
+        self.next_marker = next_marker
+        self.metrics = metrics
+
+
+class PageIterator:
+    """
+    Percorre uma coleção paginada mantendo em memória só a página atual
+    (e a seguinte, quando adiantada)
+
+    `fetch_page(marcador)` retorna (itens, próximo_marcador, métricas); o
+    próximo marcador é None na última página. Iterar sobre o objeto entrega
+    os itens; `pages()` entrega as páginas. As métricas de cada página ficam
+    em `page_metrics`, com `wait_ms` (tempo que o consumidor ficou bloqueado
+    esperando a página) e `prefetched`.
+
+    Args:
+        start: Marcador da primeira página (URL no REST, cursor no GraphQL)
+        prefetch: Busca a próxima página numa thread enquanto a atual é consumida
+        max_pages: Interrompe a iteração depois desse número de páginas
+    """
+
+    def __init__(self, fetch_page: FetchPage, start: Any = None, prefetch: bool = False, max_pages: int = None):
+        self._fetch_page = fetch_page
+        self.start = start
+        self.prefetch = prefetch
+        self.max_pages = max_pages
+        self.page_metrics: List[Dict[str, Any]] = []
+
+    def __iter__(self) -> Iterator[Any]:
+        for page in self.pages():
+            yield from page.items
+
+    def pages(self) -> Iterator[Page]:
+        self.page_metrics = []
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if self.prefetch else None
+        pending = None
+        marker = self.start
+        number = 1
+
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                if pending is not None:
+                    items, next_marker, metrics = pending.result()
+                else:
+                    items, next_marker, metrics = self._fetch_page(marker)
+                wait_ms = (time.perf_counter() - wait_start) * 1000
+
+                has_next = next_marker is not None and (self.max_pages is None or number < self.max_pages)
+                pending = executor.submit(worker_task(self._fetch_page), next_marker) if executor and has_next else None
+
+                page_metrics = {name: metrics.get(name) for name in PAGE_METRIC_COLUMNS if name in metrics}
+                page_metrics.update({
+                    "page": number,
+                    "items": len(items),
+                    "wait_ms": wait_ms,
+                    "prefetched": number > 1 and executor is not None,
+                })
+                self.page_metrics.append(page_metrics)
+
+                yield Page(number, items, next_marker, metrics)
+
+                if not has_next:
+                    return
+                marker = next_marker
+                number += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totais das páginas já percorridas"""
+        return {
+            "pages": len(self.page_metrics),
+            "items": sum(page["items"] for page in self.page_metrics),
+            "response_time_ms": sum(page.get("response_time_ms") or 0 for page in self.page_metrics),
+            "response_size_bytes": sum(page.get("response_size_bytes") or 0 for page in self.page_metrics),
+            "wait_ms": sum(page["wait_ms"] for page in self.page_metrics),
+        }
@@ -0,0 +1,171 @@
+"""
+Agendador de requisições guiado pelos limites de taxa da API do GitHub
+Lê X-RateLimit-* das respostas REST/GraphQL e o campo `rateLimit` do
+GraphQL, espaça as requisições na maior taxa segura por recurso e recua
+automaticamente em respostas 403/429 de limite excedido
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+RATE_LIMIT_COLUMNS = [
+    "rate_limit_resource",
+    "rate_limit_limit",
+    "rate_limit_remaining",
+    "rate_limit_reset",
+    "rate_limit_used",
+    "rate_limit_cost",
+]
+
+# Intervalo mínimo por recurso para respeitar os limites secundários do GitHub
+# (900 pontos/min no REST, 2000 pontos/min no GraphQL, 30 buscas/min)
+SECONDARY_LIMIT_INTERVALS = {"core": 60 / 900, "graphql": 60 / 2000, "search": 60 / 30}
+
+_HEADERS = {
+    "x-ratelimit-resource": ("rate_limit_resource", str),
+    "x-ratelimit-limit": ("rate_limit_limit", int),
+    "x-ratelimit-remaining": ("rate_limit_remaining", int),
+    "x-ratelimit-reset": ("rate_limit_reset", int),
+    "x-ratelimit-used": ("rate_limit_used", int),
+}
+
+
+def rate_limit_from_headers(headers) -> Dict[str, Any]:
+    info = {}
+    for header, (column, cast) in _HEADERS.items():
+        value = headers.get(header)
+        if value is not None:
+            try:
+                info[column] = cast(value)
+            except ValueError:
+                pass
+    return info
+
+
+def rate_limit_from_graphql(rate_limit: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte o objeto `rateLimit { cost remaining resetAt }` para as mesmas colunas dos cabeçalhos"""
+    info = {"rate_limit_resource": "graphql"}
+    for field, column in (("cost", "rate_limit_cost"), ("remaining", "rate_limit_remaining"),
+                          ("limit", "rate_limit_limit"), ("used", "rate_limit_used")):
+        if rate_limit.get(field) is not None:
+            info[column] = rate_limit[field]
+    if rate_limit.get("resetAt"):
+        reset_at = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00"))
+        info["rate_limit_reset"] = int(reset_at.timestamp())
+    return info
+
+
+class _Bucket:
+    __slots__ = ("limit", "remaining", "reset", "next_allowed", "throttled")
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.next_allowed = 0.0
+        self.throttled = 0
+
+
+class RateLimitScheduler:
+    """
+    Controla quando cada requisição pode sair, por recurso (core, search, graphql)
+
+    Enquanto sobra mais que `burst_fraction` da cota, as requisições saem no
+    intervalo mínimo do recurso; abaixo disso, o restante da cota é distribuído
+    por igual até o reset. Com a cota zerada, espera o reset.
+
+    Args:
+        min_interval: Intervalo mínimo fixo entre requisições do mesmo recurso
+            (None usa os limites secundários do GitHub)
+        burst_fraction: Fração da cota a partir da qual o ritmo passa a ser distribuído
+        max_backoff: Espera máxima, em segundos, num recuo exponencial
+    """
+
+    def __init__(self, min_interval: float = None, burst_fraction: float = 0.1, max_backoff: float = 60.0):
+        self.min_interval = min_interval
+        self.burst_fraction = burst_fraction
+        self.max_backoff = max_backoff
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, resource: str) -> _Bucket:
+        if resource not in self._buckets:
+            self._buckets[resource] = _Bucket()
+        return self._buckets[resource]
+
+    def _interval(self, resource: str, bucket: _Bucket, now: float) -> float:
+        floor = self.min_interval if self.min_interval is not None else SECONDARY_LIMIT_INTERVALS.get(resource, 0.0)
+        if bucket.remaining is None or bucket.reset is None or bucket.limit is None:
+            return floor
+        if bucket.remaining > bucket.limit * self.burst_fraction:
+            return floor
+        return max(floor, (bucket.reset - now) / max(bucket.remaining, 1))
+
+    def acquire(self, resource: str) -> float:
+        """Bloqueia até a próxima requisição do recurso poder sair; retorna o tempo esperado em segundos"""
+        with self._lock:
+            bucket = self._bucket(resource)
+            now = time.time()
+            start = max(now, bucket.next_allowed)
+            if bucket.remaining is not None and bucket.remaining <= 0 and bucket.reset and bucket.reset > now:
+                start = max(start, bucket.reset + 1)
+            bucket.next_allowed = start + self._interval(resource, bucket, start)
+            if bucket.remaining is not None:
+                bucket.remaining -= 1
+
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def observe(self, resource: str, metrics: Dict[str, Any]):
+        """Atualiza a cota do recurso com os valores registrados na última resposta"""
+        if metrics.get("rate_limit_remaining") is None:
+            return
+        with self._lock:
+            bucket = self._bucket(metrics.get("rate_limit_resource") or resource)
+            bucket.remaining = metrics["rate_limit_remaining"]
+            bucket.limit = metrics.get("rate_limit_limit", bucket.limit)
+            bucket.reset = metrics.get("rate_limit_reset", bucket.reset)
+            bucket.throttled = 0
+
+    def throttle_delay(self, resource: str, error: Exception, metrics: Dict[str, Any] = None) -> Optional[float]:
+        """
+        Se o erro for de limite de taxa (403/429 ou RATE_LIMITED), agenda e retorna a espera antes de repetir
+
+        A espera vem de Retry-After, do reset da cota ou, sem nenhum deles,
+        de um recuo exponencial com jitter. Outros erros retornam None.
+        """
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        message = str(error).lower()
+        if status not in (403, 429) and "rate_limited" not in message and "rate limit" not in message:
+            return None
+        if status == 403 and response is not None and "rate limit" not in response.text.lower():
+            return None
+
+        info = dict(metrics or {})
+        headers = getattr(response, "headers", None) or {}
+        info.update(rate_limit_from_headers(headers))
+
+        with self._lock:
+            bucket = self._bucket(info.get("rate_limit_resource") or resource)
+            bucket.throttled += 1
+            now = time.time()
+
+            retry_after = headers.get("retry-after")
+            if retry_after is not None and retry_after.isdigit():
+                delay = float(retry_after)
+            elif info.get("rate_limit_remaining") == 0 and info.get("rate_limit_reset"):
+                bucket.remaining = 0
+                bucket.reset = info["rate_limit_reset"]
+                delay = max(bucket.reset - now, 0.0) + 1
+            else:
+                delay = min(self.max_backoff, 2 ** (bucket.throttled - 1)) * (0.5 + random.random() / 2)
+
+            bucket.next_allowed = max(bucket.next_allowed, now + delay)
+        return delay
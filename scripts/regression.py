@@ -0,0 +1,198 @@
+"""
+Detecção de regressões de desempenho entre execuções
+Compara uma execução candidata com uma linha de base (uma execução ou uma
+janela das anteriores) em cada célula (api_type, query_type): testes não
+paramétricos de Mann-Whitney U e Kolmogorov-Smirnov, com correção de Holm,
+só contam como regressão quando o efeito passa dos limiares configurados
+"""
+
+import glob
+import json
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy.stats import mannwhitneyu, ks_2samp
+from statsmodels.stats.multitest import multipletests
+
+from result_store import is_columnar, load_results
+from stats_engine import Partition
+from streaming import METRICS, _apply_conditions, load_frame
+
+
+RUN_COLUMNS = ['api_type', 'query_type', 'response_time_ms', 'response_size_bytes', 'success']
+
+DEFAULT_ALPHA = 0.05
+
+# Delta de Cliff a partir do qual o efeito deixa de ser desprezível (Romano et al., 2006)
+DEFAULT_MIN_DELTA = 0.147
+
+# Variação relativa mínima da mediana e do p99
+DEFAULT_MIN_CHANGE = 0.05
+DEFAULT_MIN_TAIL_CHANGE = 0.10
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+UNCHANGED = "unchanged"
+MISSING = "missing"
+
+
+def load_run(path: str, conditions: Dict[str, Any] = None) -> pd.DataFrame:
+    """Medições bem-sucedidas de uma execução (CSV, JSONL, Parquet/Arrow ou partição do conjunto)"""
+    if is_columnar(path):
+        df = load_results(path, columns=RUN_COLUMNS, conditions=conditions)
+    elif path.endswith('.jsonl'):
+        df = load_frame(path, RUN_COLUMNS, conditions)
+    else:
+        df = _apply_conditions(pd.read_csv(path, usecols=lambda c: c in RUN_COLUMNS), conditions)
+    return df[df['success'] == True]
+
+
+def load_runs(paths: List[str], conditions: Dict[str, Any] = None) -> pd.DataFrame:
+    """Várias execuções somadas numa única amostra"""
+    return pd.concat([load_run(path, conditions) for path in paths], ignore_index=True)
+
+
+def list_runs(source: str) -> List[str]:
+    """
+    Execuções em ordem cronológica
+
+    `source` é o diretório results/ (arquivos experiment_*.csv) ou o diretório
+    do conjunto particionado (uma execução por partição date=/run_id=).
+    """
+    partitions = glob.glob(os.path.join(source, "date=*", "run_id=*"))
+    if partitions:
+        return sorted(partitions, key=lambda p: (os.path.basename(os.path.dirname(p)), os.path.basename(p)))
+    return sorted(glob.glob(os.path.join(source, "experiment_*.csv")))
+
+
+def rolling_window(source: str, window: int) -> Dict[str, List[str]]:
+    """A execução mais recente como candidata e as `window` anteriores como linha de base"""
+    runs = list_runs(source)
+    if len(runs) < 2:
+        raise ValueError(f"São necessárias pelo menos duas execuções em {source} (encontradas: {len(runs)})")
+    return {'baseline': runs[-window - 1:-1], 'candidate': runs[-1:]}
+
+
+def cliffs_delta(u_statistic: float, n_candidate: int, n_baseline: int) -> float:
+    """P(candidata > base) - P(candidata < base), a partir do U da candidata"""
+    return 2 * u_statistic / (n_candidate * n_baseline) - 1
+
+
+def _relative_change(candidate: float, baseline: float) -> float:
+    return candidate / baseline - 1 if baseline else np.nan
+
+
+def compare_cell(baseline: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+    """Estatísticas e testes (bilaterais) de uma métrica numa célula"""
+    u_stat, u_pvalue = mannwhitneyu(candidate, baseline, alternative='two-sided')
+    ks_stat, ks_pvalue = ks_2samp(candidate, baseline)
+    baseline_median, baseline_p99 = np.percentile(baseline, [50, 99])
+    candidate_median, candidate_p99 = np.percentile(candidate, [50, 99])
+
+    return {
+        'baseline_count': len(baseline),
+        'candidate_count': len(candidate),
+        'baseline_median': baseline_median,
+        'candidate_median': candidate_median,
+        'median_change': _relative_change(candidate_median, baseline_median),
+        'baseline_p99': baseline_p99,
+        'candidate_p99': candidate_p99,
+        'p99_change': _relative_change(candidate_p99, baseline_p99),
+        'cliffs_delta': cliffs_delta(u_stat, len(candidate), len(baseline)),
+        'u_statistic': u_stat,
+        'u_pvalue': u_pvalue,
+        'ks_statistic': ks_stat,
+        'ks_pvalue': ks_pvalue,
+    }
+
+
+def classify(row: Dict[str, Any], alpha: float, min_delta: float, min_change: float,
+             min_tail_change: float) -> str:
+    """
+    Regressão (ou melhora) quando:
+
+    - o Mann-Whitney é significativo, |delta de Cliff| >= `min_delta` e a
+      mediana varia pelo menos `min_change` no mesmo sentido; ou
+    - o Kolmogorov-Smirnov é significativo e o p99 varia pelo menos
+      `min_tail_change` (mudança concentrada na cauda).
+    """
+    for status, sign in ((REGRESSION, 1), (IMPROVEMENT, -1)):
+        shift = (row['u_pvalue_adjusted'] < alpha and sign * row['cliffs_delta'] >= min_delta
+                 and sign * row['median_change'] >= min_change)
+        tail = row['ks_pvalue_adjusted'] < alpha and sign * row['p99_change'] >= min_tail_change
+        if shift or tail:
+            return status
+    return UNCHANGED
+
+
+def compare_runs(baseline: pd.DataFrame, candidate: pd.DataFrame, metrics: List[str] = None,
+                 alpha: float = DEFAULT_ALPHA, min_delta: float = DEFAULT_MIN_DELTA,
+                 min_change: float = DEFAULT_MIN_CHANGE,
+                 min_tail_change: float = DEFAULT_MIN_TAIL_CHANGE) -> List[Dict[str, Any]]:
+    """
+    Uma linha por (api_type, query_type, métrica), com o `status` da célula
+
+    Os p-valores de cada teste são corrigidos por Holm sobre todas as
+    células comparadas; células ausentes em um dos lados ficam como `missing`.
+    """
+    metrics = metrics or METRICS
+    keys = ['api_type', 'query_type']
+    baseline_cells = Partition(baseline, keys, metrics)
+    candidate_cells = Partition(candidate, keys, metrics)
+
+    rows = []
+    for api_type, query_type in sorted(set(baseline_cells.labels) | set(candidate_cells.labels)):
+        for metric in metrics:
+            base = baseline_cells.get((api_type, query_type), metric).astype(float)
+            cand = candidate_cells.get((api_type, query_type), metric).astype(float)
+            row = {'api_type': api_type, 'query_type': query_type, 'metric': metric}
+            if len(base) and len(cand):
+                row.update(compare_cell(base, cand))
+            else:
+                row.update({'baseline_count': len(base), 'candidate_count': len(cand), 'status': MISSING})
+            rows.append(row)
+
+    tested = [row for row in rows if 'status' not in row]
+    if tested:
+        for test in ('u', 'ks'):
+            pvalues = [row[f'{test}_pvalue'] for row in tested]
+            adjusted = multipletests(pvalues, alpha=alpha, method='holm')[1]
+            for row, pvalue in zip(tested, adjusted):
+                row[f'{test}_pvalue_adjusted'] = pvalue
+        for row in tested:
+            row['status'] = classify(row, alpha, min_delta, min_change, min_tail_change)
+    return rows
+
+
+def _plain(value):
+    """Valores do NumPy como tipos JSON (NaN vira null)"""
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    return value
+
+
+def build_report(rows: List[Dict[str, Any]], baseline: List[str], candidate: List[str],
+                 thresholds: Dict[str, float]) -> Dict[str, Any]:
+    regressions = sum(row['status'] == REGRESSION for row in rows)
+    return {
+        'status': REGRESSION if regressions else 'ok',
+        'baseline': baseline,
+        'candidate': candidate,
+        'thresholds': thresholds,
+        'regressions': regressions,
+        'improvements': sum(row['status'] == IMPROVEMENT for row in rows),
+        'missing': sum(row['status'] == MISSING for row in rows),
+        'cells': [{key: _plain(value) for key, value in row.items()} for row in rows],
+    }
+
+
+def save_report(report: Dict[str, Any], path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
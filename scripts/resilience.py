@@ -0,0 +1,224 @@
+"""
+Camada de resiliência dos clientes síncronos
+Repete requisições idempotentes que falham (erro de rede ou 5xx) com recuo
+exponencial e jitter e, opcionalmente, envia uma requisição duplicada
+(hedged request) quando a original passa do p95 das latências observadas,
+ficando com a primeira resposta que chegar
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent import futures
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+from transport import TRANSPORT_ERRORS
+from timing import worker_task
+
+
+# attempts: tentativas da requisição que mais tentou; retries: novas tentativas somadas em
+# todas as requisições da medição; hedged: se alguma requisição duplicada foi enviada;
+# hedge_won: se a resposta usada veio da duplicada; retry_wait_ms: espera entre tentativas
+RESILIENCE_COLUMNS = ["attempts", "retries", "hedged", "hedge_won", "retry_wait_ms"]
+
+RETRY_STATUSES = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def merge_resilience(total: Dict[str, Any], metrics: Dict[str, Any]):
+    """
+    Acumula em `total` as colunas de resiliência de mais uma requisição da mesma medição
+
+    `attempts` fica com o máximo, para que medições com várias requisições
+    (ou o registro de uma consulta persistida) não pareçam repetições;
+    o número de requisições está em `request_count`.
+    """
+    if "attempts" in metrics:
+        total["attempts"] = max(total.get("attempts") or 0, metrics["attempts"])
+    for name in ("retries", "retry_wait_ms"):
+        if name in metrics:
+            total[name] = (total.get(name) or 0) + metrics[name]
+    for name in ("hedged", "hedge_won"):
+        if name in metrics:
+            total[name] = bool(total.get(name)) or metrics[name]
+
+
+def attach_resilience(error: Exception, metrics: Dict[str, Any]):
+    """Guarda no erro as colunas de resiliência da requisição que falhou (se ele ainda não as tiver)"""
+    if getattr(error, "resilience_metrics", None) is None:
+        error.resilience_metrics = {name: metrics[name] for name in RESILIENCE_COLUMNS if name in metrics}
+
+
+def resilience_metrics(error: Exception) -> Dict[str, Any]:
+    """Colunas de resiliência guardadas no erro por `attach_resilience` (vazio se não houver)"""
+    return getattr(error, "resilience_metrics", None) or {}
+
+
+class RetryPolicy:
+    """
+    Configuração de novas tentativas e de requisições duplicadas
+
+    Args:
+        max_attempts: Total de tentativas por requisição (1 desativa as repetições)
+        base_delay: Espera base, em segundos, do recuo exponencial
+        max_delay: Espera máxima entre tentativas
+        hedge: Envia uma duplicada quando a requisição demora mais que `hedge_percentile`
+        hedge_percentile: Percentil das latências observadas usado como espera da duplicada
+        hedge_delay_ms: Espera fixa da duplicada (substitui o percentil)
+        hedge_min_samples: Latências observadas necessárias antes de começar a duplicar
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1, max_delay: float = 5.0,
+                 hedge: bool = False, hedge_percentile: float = 95, hedge_delay_ms: float = None,
+                 hedge_min_samples: int = 20):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay_ms = hedge_delay_ms
+        self.hedge_min_samples = hedge_min_samples
+
+    def backoff(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte à `attempt` (recuo exponencial com jitter completo)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class ResilientTransport:
+    """
+    Envolve um transporte (RequestsTransport ou HTTPXTransport) com a mesma interface
+
+    As métricas retornadas são as da tentativa que produziu a resposta,
+    acrescidas das colunas RESILIENCE_COLUMNS; quando a última tentativa
+    falha, elas ficam no erro (`resilience_metrics`). As latências usadas para o
+    percentil são mantidas por método e `route`, o nome da operação informado
+    pelo cliente (todas as consultas GraphQL vão para o mesmo caminho); sem
+    ele, pelo caminho da URL.
+
+    Args:
+        idempotent_post: Também repete/duplica POST (o cliente GraphQL só envia consultas)
+    """
+
+    def __init__(self, transport, policy: RetryPolicy, idempotent_post: bool = False, history: int = 500):
+        self.transport = transport
+        self.policy = policy
+        self.idempotent_post = idempotent_post
+        self._latencies: Dict[Tuple[str, str], deque] = {}
+        self._history = history
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def session(self):
+        return self.transport.session
+
+    def open_connections(self) -> Optional[int]:
+        return self.transport.open_connections()
+
+    def reset_connections(self):
+        self.transport.reset_connections()
+
+    def _is_idempotent(self, method: str) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS or (self.idempotent_post and method.upper() == "POST")
+
+    def _observe(self, key: Tuple[str, str], elapsed_ms: float):
+        with self._lock:
+            if key not in self._latencies:
+                self._latencies[key] = deque(maxlen=self._history)
+            self._latencies[key].append(elapsed_ms)
+
+    def hedge_delay(self, key: Tuple[str, str]) -> Optional[float]:
+        """Espera em segundos antes de duplicar a requisição, ou None se ainda não há amostras suficientes"""
+        if not self.policy.hedge:
+            return None
+        if self.policy.hedge_delay_ms is not None:
+            return self.policy.hedge_delay_ms / 1000
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < self.policy.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.policy.hedge_percentile / 100))
+        return samples[index] / 1000
+
+    def request(self, method: str, url: str, route: str = None, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        idempotent = self._is_idempotent(method)
+        max_attempts = self.policy.max_attempts if idempotent else 1
+        key = (method.upper(), route or urlsplit(url).path)
+        attempts = 0
+        waited = 0.0
+        hedged = False
+
+        while True:
+            attempts += 1
+            try:
+                response, metrics, sent_hedge, hedge_won = self._attempt(key, method, url, idempotent, kwargs)
+            except TRANSPORT_ERRORS as e:
+                if attempts >= max_attempts:
+                    attach_resilience(e, {
+                        "attempts": attempts,
+                        "retries": attempts - 1,
+                        "hedged": hedged,
+                        "hedge_won": False,
+                        "retry_wait_ms": waited * 1000,
+                    })
+                    raise
+            else:
+                hedged = hedged or sent_hedge
+                if response.status_code not in RETRY_STATUSES or attempts >= max_attempts:
+                    break
+
+            delay = self.policy.backoff(attempts)
+            time.sleep(delay)
+            waited += delay
+
+        metrics.update({
+            "attempts": attempts,
+            "retries": attempts - 1,
+            "hedged": hedged,
+            "hedge_won": hedge_won,
+            "retry_wait_ms": waited * 1000,
+        })
+        return response, metrics
+
+    def _attempt(self, key: Tuple[str, str], method: str, url: str, idempotent: bool,
+                 kwargs: Dict) -> Tuple[Any, Dict[str, Any], bool, bool]:
+        """Uma tentativa, possivelmente com duplicada; retorna (resposta, métricas, duplicou, duplicada venceu)"""
+        delay = self.hedge_delay(key) if idempotent else None
+        start = time.perf_counter()
+
+        if delay is None:
+            response, metrics = self.transport.request(method, url, **kwargs)
+            self._observe(key, (time.perf_counter() - start) * 1000)
+            return response, metrics, False, False
+
+        executor = self._get_executor()
+        primary = executor.submit(worker_task(self.transport.request), method, url, **kwargs)
+        try:
+            response, metrics = primary.result(timeout=delay)
+            self._observe(key, (time.perf_counter() - start) * 1000)
+            return response, metrics, False, False
+        except futures.TimeoutError:
+            pass
+
+        hedge = executor.submit(worker_task(self.transport.request), method, url, **kwargs)
+        done, _ = futures.wait([primary, hedge], return_when=futures.FIRST_COMPLETED)
+        winner = hedge if hedge in done and primary not in done else primary
+        if winner.exception() is not None:
+            # A primeira a terminar falhou: fica com a outra
+            winner = hedge if winner is primary else primary
+
+        response, metrics = winner.result()
+        self._observe(key, (time.perf_counter() - start) * 1000)
+        return response, metrics, True, winner is hedge
+
+    def _get_executor(self) -> futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedged-request")
+            return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.transport.close()
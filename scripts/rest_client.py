@@ -3,19 +3,49 @@ Cliente REST para o experimento GraphQL vs REST
 Implementa consultas REST para a API do GitHub
 """
 
-import requests
+import itertools
 import time
-from typing import Dict, Any, Tuple
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Tuple
 import os
 from dotenv import load_dotenv
+from transport import create_transport, PHASE_COLUMNS, SIZE_COLUMNS, TRANSPORT_ERRORS
+from rate_limiter import rate_limit_from_headers, RATE_LIMIT_COLUMNS
+from http_cache import ResponseCache, CacheEntry, cache_key, CACHE_HIT, CACHE_REVALIDATED, CACHE_MISS
+from pagination import PageIterator, parse_link_header
+from resilience import ResilientTransport, RetryPolicy, merge_resilience, attach_resilience
+from json_codec import JSONCodec
+from timing import worker_task
 
 load_dotenv()
 
+GITHUB_API_URL = "https://api.github.com"
+
+# Colunas somadas ao combinar várias requisições numa única medição
+SUMMED_COLUMNS = ["request_size_bytes", "connections_opened", "request_count"]
+
 
 class RESTClient:
+    """
+    Cliente REST para a API do GitHub
+    
+    Args:
+        transport: "http1" (requests) ou "http2" (httpx, uma conexão multiplexada)
+        concurrent_requests: Se True, os métodos que combinam vários recursos
+            fazem as requisições ao mesmo tempo (streams simultâneos em HTTP/2)
+        retry_policy: Repetições com recuo e requisições duplicadas (None desativa)
+        codec: Decodificador JSON das respostas (padrão: orjson quando instalado)
+    """
 
-    def __init__(self, token: str = None):
-        self.base_url = "https://api.github.com"
+    def __init__(self, token: str = None, base_url: str = GITHUB_API_URL, cache: ResponseCache = None,
+                 transport: str = "http1", concurrent_requests: bool = False, retry_policy: RetryPolicy = None,
+                 codec: JSONCodec = None):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.codec = codec or JSONCodec()
+        self.concurrent_requests = concurrent_requests
+        self._executor = None
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "GraphQL-REST-Experiment"
@@ -24,55 +54,164 @@ class RESTClient:
         if token:
             self.headers["Authorization"] = f"token {token}"
         
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.transport = create_transport(transport, self.headers, self.base_url)
+        if retry_policy is not None:
+            self.transport = ResilientTransport(self.transport, retry_policy)
+        self.last_metrics: Dict[str, Any] = {}
     
-    def _make_request(self, url: str, params: Dict = None) -> Tuple[Dict[Any, Any], float, int]:
+    @property
+    def session(self):
+        """Sessão HTTP do transporte atual (pode ser recriada ao forçar conexões novas)"""
+        return self.transport.session
+    
+    def _fetch(self, url: str, params: Dict = None,
+               route: str = None) -> Tuple[Dict[Any, Any], Dict[str, Any], Dict[str, str]]:
+        """
+        Retorna (dados, métricas, links do cabeçalho Link por rel)
+        
+        `route` é o modelo do endpoint (por exemplo "/users/{username}/repos"),
+        usado para agrupar as latências das duplicadas em vez da URL concreta.
+        """
+        if self.cache is None:
+            key = entry = None
+        else:
+            key = cache_key(url, params)
+            entry = self.cache.get(key)
+        
         start_time = time.perf_counter()
         
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            end_time = time.perf_counter()
+        if entry is not None and self.cache.is_fresh(entry):
+            metrics = dict.fromkeys(PHASE_COLUMNS, 0.0)
+            metrics.update(dict.fromkeys(SIZE_COLUMNS + SUMMED_COLUMNS, 0))
+            metrics["cache_status"] = CACHE_HIT
+            body = entry.body
+            link = entry.link
+            transferred = 0
+        else:
+            headers = entry.validators() if entry is not None else None
+            response, metrics = self.transport.request("GET", url, params=params, headers=headers, route=route)
+            metrics.update(rate_limit_from_headers(response.headers))
+            metrics["request_count"] = 1
+            link = response.headers.get("Link")
             
-            response_time_ms = (end_time - start_time) * 1000
-            response_size_bytes = len(response.content)
-            
-            data = response.json()
+            if entry is not None and response.status_code == 304:
+                self.cache.put(key, entry.revalidated(response.headers))
+                metrics["cache_status"] = CACHE_REVALIDATED
+                body = entry.body
+                link = link or entry.link
+            else:
+                try:
+                    response.raise_for_status()
+                except TRANSPORT_ERRORS as e:
+                    attach_resilience(e, metrics)
+                    raise
+                body = response.content
+                if self.cache is not None:
+                    new_entry = CacheEntry.from_response(body, response.headers)
+                    if new_entry is not None:
+                        self.cache.put(key, new_entry)
+                    metrics["cache_status"] = CACHE_MISS
+            transferred = len(response.content)
+        
+        end_time = time.perf_counter()
+        
+        metrics["response_time_ms"] = (end_time - start_time) * 1000
+        metrics["response_size_bytes"] = transferred
+        
+        decode_start = time.perf_counter()
+        data = self.codec.decode(body)
+        # Com decodificação preguiçosa o custo fica para quem acessar os dados
+        metrics["decode_ms"] = None if self.codec.lazy else (time.perf_counter() - decode_start) * 1000
+        metrics["json_backend"] = self.codec.name
+        
+        return data, metrics, parse_link_header(link)
+    
+    def _fetch_concurrently(self, calls: Tuple[Tuple[str, Dict, str], ...]) -> list:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rest-client")
+        return list(self._executor.map(worker_task(lambda call: self._fetch(*call)), calls))
+    
+    def _fetch_all(self, *calls: Tuple[str, Dict, str]) -> Tuple[list, float, int]:
+        """
+        Executa várias requisições, somando tamanhos e tempos por fase
+        
+        Em sequência por padrão; com `concurrent_requests`, ao mesmo tempo, e o
+        tempo total passa a ser o da requisição mais lenta.
+        """
+        start_time = time.perf_counter()
+        
+        if self.concurrent_requests:
+            fetched = self._fetch_concurrently(calls)
+        else:
+            fetched = (self._fetch(*call) for call in calls)
+        
+        return self._combine(fetched, start_time)
+    
+    def _combine(self, fetched: Iterable[Tuple[Any, Dict[str, Any], Dict[str, str]]],
+                 start_time: float) -> Tuple[list, float, int]:
+        """Consome as respostas de várias requisições e preenche `last_metrics` com a medição combinada"""
+        self.last_metrics = dict.fromkeys(PHASE_COLUMNS, 0.0)
+        self.last_metrics.update(dict.fromkeys(SIZE_COLUMNS + SUMMED_COLUMNS, 0))
+        results = []
+        total_size = 0
+        
+        cache_statuses = []
+        
+        for data, metrics, _ in fetched:
+            results.append(data)
+            self.last_metrics["http_version"] = metrics.get("http_version")
+            self.last_metrics["json_backend"] = metrics["json_backend"]
+            self.last_metrics["pool_connections"] = metrics.get("pool_connections")
+            self.last_metrics.update((name, metrics[name]) for name in RATE_LIMIT_COLUMNS if name in metrics)
+            total_size += metrics["response_size_bytes"]
+            for name in PHASE_COLUMNS + SIZE_COLUMNS + SUMMED_COLUMNS:
+                if metrics[name] is None or self.last_metrics[name] is None:
+                    self.last_metrics[name] = None
+                else:
+                    self.last_metrics[name] += metrics[name]
+            merge_resilience(self.last_metrics, metrics)
+            if "cache_status" in metrics:
+                cache_statuses.append(metrics["cache_status"])
+        
+        end_time = time.perf_counter()
+        total_time_ms = (end_time - start_time) * 1000
+        
+        self.last_metrics["response_time_ms"] = total_time_ms
+        self.last_metrics["response_size_bytes"] = total_size
+        if cache_statuses:
+            # A medição combinada vale pelo pior caso: basta uma ausência para ser "miss"
+            for status in (CACHE_MISS, CACHE_REVALIDATED, CACHE_HIT):
+                if status in cache_statuses:
+                    self.last_metrics["cache_status"] = status
+                    break
+        
+        return results, total_time_ms, total_size
+    
+    def _make_request(self, url: str, params: Dict = None, route: str = None) -> Tuple[Dict[Any, Any], float, int]:
+        self.last_metrics = {}
+        
+        try:
+            data, self.last_metrics, _ = self._fetch(url, params, route)
             
-            return data, response_time_ms, response_size_bytes
+            return data, self.last_metrics["response_time_ms"], self.last_metrics["response_size_bytes"]
             
-        except requests.exceptions.RequestException as e:
+        except TRANSPORT_ERRORS as e:
             print(f"Erro na requisição REST: {e}")
             raise
     
     def get_user_simple(self, username: str) -> Tuple[Dict, float, int]:
         url = f"{self.base_url}/users/{username}"
-        return self._make_request(url)
+        return self._make_request(url, route="/users/{username}")
     
     def get_repository_simple(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
         url = f"{self.base_url}/repos/{owner}/{repo}"
-        return self._make_request(url)
+        return self._make_request(url, route="/repos/{owner}/{repo}")
     
     def get_user_with_repos(self, username: str) -> Tuple[Dict, float, int]:
-        start_time = time.perf_counter()
-        total_size = 0
-        
-        user_url = f"{self.base_url}/users/{username}"
-        response1 = self.session.get(user_url, timeout=30)
-        response1.raise_for_status()
-        user_data = response1.json()
-        total_size += len(response1.content)
-        
-        repos_url = f"{self.base_url}/users/{username}/repos"
-        response2 = self.session.get(repos_url, params={"per_page": 10}, timeout=30)
-        response2.raise_for_status()
-        repos_data = response2.json()
-        total_size += len(response2.content)
-        
-        end_time = time.perf_counter()
-        total_time_ms = (end_time - start_time) * 1000
+        (user_data, repos_data), total_time_ms, total_size = self._fetch_all(
+            (f"{self.base_url}/users/{username}", None, "/users/{username}"),
+            (f"{self.base_url}/users/{username}/repos", {"per_page": 10}, "/users/{username}/repos")
+        )
         
         combined_data = {
             "user": user_data,
@@ -82,23 +221,11 @@ class RESTClient:
         return combined_data, total_time_ms, total_size
     
     def get_repo_with_issues(self, owner: str, repo: str) -> Tuple[Dict, float, int]:
-        start_time = time.perf_counter()
-        total_size = 0
-        
-        repo_url = f"{self.base_url}/repos/{owner}/{repo}"
-        response1 = self.session.get(repo_url, timeout=30)
-        response1.raise_for_status()
-        repo_data = response1.json()
-        total_size += len(response1.content)
-        
-        issues_url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-        response2 = self.session.get(issues_url, params={"per_page": 10, "state": "all"}, timeout=30)
-        response2.raise_for_status()
-        issues_data = response2.json()
-        total_size += len(response2.content)
-        
-        end_time = time.perf_counter()
-        total_time_ms = (end_time - start_time) * 1000
+        (repo_data, issues_data), total_time_ms, total_size = self._fetch_all(
+            (f"{self.base_url}/repos/{owner}/{repo}", None, "/repos/{owner}/{repo}"),
+            (f"{self.base_url}/repos/{owner}/{repo}/issues", {"per_page": 10, "state": "all"},
+             "/repos/{owner}/{repo}/issues")
+        )
         
         combined_data = {
             "repository": repo_data,
@@ -133,7 +260,7 @@ class RESTClient:
             "sort": "updated",
             "direction": "desc"
         }
-        return self._make_request(url, params)
+        return self._make_request(url, params, "/users/{username}/repos")
     
     def get_repo_commits_paginated(self, owner: str, repo: str, per_page: int = 10, page: int = 1) -> Tuple[Dict, float, int]:
         url = f"{self.base_url}/repos/{owner}/{repo}/commits"
@@ -141,10 +268,96 @@ class RESTClient:
             "per_page": per_page,
             "page": page
         }
-        return self._make_request(url, params)
+        return self._make_request(url, params, "/repos/{owner}/{repo}/commits")
+    
+    def _iterate(self, url: str, params: Dict, route: str, prefetch: bool, max_pages: int = None) -> PageIterator:
+        """Itera por todas as páginas a partir de `url`, seguindo o rel="next" do cabeçalho Link"""
+        def fetch_page(marker: Tuple[str, Dict]) -> Tuple[List, Tuple[str, Dict], Dict[str, Any]]:
+            page_url, page_params = marker
+            data, metrics, links = self._fetch(page_url, page_params, route)
+            next_marker = (links["next"], None) if "next" in links else None
+            return data, next_marker, metrics
+        
+        return PageIterator(fetch_page, (url, params), prefetch=prefetch, max_pages=max_pages)
+    
+    def iter_user_repos(self, username: str, per_page: int = 100, prefetch: bool = False,
+                        max_pages: int = None) -> PageIterator:
+        url = f"{self.base_url}/users/{username}/repos"
+        params = {
+            "per_page": per_page,
+            "sort": "updated",
+            "direction": "desc"
+        }
+        return self._iterate(url, params, "/users/{username}/repos", prefetch, max_pages)
+    
+    def iter_repo_commits(self, owner: str, repo: str, per_page: int = 100, prefetch: bool = False,
+                          max_pages: int = None) -> PageIterator:
+        url = f"{self.base_url}/repos/{owner}/{repo}/commits"
+        return self._iterate(url, {"per_page": per_page}, "/repos/{owner}/{repo}/commits", prefetch, max_pages)
+    
+    def _fetch_collection(self, url: str, params: Dict, route: str, limit: int,
+                          parallel: bool = True) -> Tuple[List, float, int]:
+        """
+        Busca os primeiros `limit` itens de uma coleção paginada
+        
+        A primeira página revela a última pelo rel="last" do cabeçalho Link;
+        com `parallel`, as páginas restantes são pedidas ao mesmo tempo. Sem
+        rel="last", segue o rel="next" página a página.
+        """
+        per_page = params["per_page"]
+        pages_needed = -(-limit // per_page)
+        start_time = time.perf_counter()
+        first_page = self._fetch(url, params, route)
+        links = first_page[2]
+        
+        if "last" in links:
+            last_page = min(_page_number(links["last"]), pages_needed)
+            calls = [(url, dict(params, page=page), route) for page in range(2, last_page + 1)]
+            if parallel:
+                following = self._fetch_concurrently(calls)
+            else:
+                following = (self._fetch(*call) for call in calls)
+        else:
+            following = self._follow_next(links, route, pages_needed - 1)
+        
+        pages, total_time_ms, total_size = self._combine(itertools.chain([first_page], following), start_time)
+        items = [item for page in pages for item in page][:limit]
+        
+        self.last_metrics["items_count"] = len(items)
+        self.last_metrics["items_per_second"] = len(items) / (total_time_ms / 1000) if total_time_ms else None
+        return items, total_time_ms, total_size
+    
+    def _follow_next(self, links: Dict[str, str], route: str, max_pages: int):
+        while "next" in links and max_pages > 0:
+            page = self._fetch(links["next"], route=route)
+            links = page[2]
+            max_pages -= 1
+            yield page
+    
+    def fetch_user_repos(self, username: str, limit: int, per_page: int = 100,
+                         parallel: bool = True) -> Tuple[List, float, int]:
+        url = f"{self.base_url}/users/{username}/repos"
+        params = {
+            "per_page": min(per_page, limit),
+            "sort": "updated",
+            "direction": "desc"
+        }
+        return self._fetch_collection(url, params, "/users/{username}/repos", limit, parallel)
+    
+    def fetch_repo_commits(self, owner: str, repo: str, limit: int, per_page: int = 100,
+                           parallel: bool = True) -> Tuple[List, float, int]:
+        url = f"{self.base_url}/repos/{owner}/{repo}/commits"
+        return self._fetch_collection(url, {"per_page": min(per_page, limit)}, "/repos/{owner}/{repo}/commits",
+                                      limit, parallel)
     
     def close(self):
-        self.session.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.transport.close()
+
+
+def _page_number(url: str) -> int:
+    return int(parse_qs(urlparse(url).query).get("page", ["1"])[0])
 
 
 def get_github_token() -> str:
@@ -0,0 +1,131 @@
+"""
+Registro incremental das medições em JSONL
+Cada medição é anexada ao arquivo assim que é coletada (com flush imediato
+e fsync periódico), e marcadores de repetição concluída permitem retomar um
+experimento interrompido do ponto em que parou
+"""
+
+import os
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from json_codec import JSONCodec
+
+
+# Linhas com esta chave marcam o fim de uma repetição; as demais são medições
+CHECKPOINT_KEY = "checkpoint"
+
+
+def checkpoint_key(accept_encoding: str, treatment: str) -> Tuple[str, str]:
+    return accept_encoding, treatment
+
+
+def read_records(path: str, codec: JSONCodec = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Linhas válidas do registro como (registro, posição do fim da linha em bytes)
+
+    Para na primeira linha sem quebra de linha ou que não decodifica (a
+    escrita interrompida pela queda do processo); o arquivo não é alterado.
+    """
+    codec = codec or JSONCodec()
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            offset += len(line)
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = codec.loads(line)
+            except ValueError:
+                return
+            yield record, offset
+
+
+def completed_measurements(path: str, codec: JSONCodec = None) -> Iterator[Dict[str, Any]]:
+    """Medições das repetições que chegaram ao marcador, na ordem do arquivo (sem os marcadores)"""
+    pending = []
+    for record, _ in read_records(path, codec):
+        if CHECKPOINT_KEY in record:
+            yield from pending
+            pending = []
+        else:
+            pending.append(record)
+
+
+class ResultLog:
+    """
+    Arquivo append-only com uma medição (ou marcador) por linha
+
+    Args:
+        path: Arquivo JSONL; é criado se não existir e nunca é sobrescrito
+        codec: Codificação JSON das linhas
+        fsync_interval: Intervalo mínimo em segundos entre fsyncs (0 sincroniza a cada linha)
+    """
+
+    def __init__(self, path: str, codec: JSONCodec = None, fsync_interval: float = 1.0):
+        self.path = path
+        self.codec = codec or JSONCodec()
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_sync = time.monotonic()
+
+    def recover(self) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, str], int]]:
+        """
+        Lê o registro de uma execução anterior
+
+        Retorna as medições das repetições concluídas e, por (accept_encoding,
+        tratamento), quantas repetições terminaram. Tudo o que vem depois do
+        último marcador (uma repetição incompleta ou uma linha truncada pela
+        queda do processo) é descartado do arquivo antes de novas escritas.
+        """
+        measurements, pending = [], []
+        completed = {}
+        valid_bytes = 0
+
+        if os.path.exists(self.path):
+            for record, offset in read_records(self.path, self.codec):
+                if CHECKPOINT_KEY in record:
+                    mark = record[CHECKPOINT_KEY]
+                    completed[checkpoint_key(mark["accept_encoding"], mark["treatment"])] = mark["repetition"]
+                    measurements.extend(pending)
+                    pending = []
+                    valid_bytes = offset
+                else:
+                    pending.append(record)
+
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        return measurements, completed
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _write(self, record: Dict[str, Any]):
+        f = self._open()
+        f.write(self.codec.dumps(record) + b"\n")
+        f.flush()
+        now = time.monotonic()
+        if now - self._last_sync >= self.fsync_interval:
+            os.fsync(f.fileno())
+            self._last_sync = now
+
+    def append(self, measurement: Dict[str, Any]):
+        self._write(measurement)
+
+    def checkpoint(self, accept_encoding: str, treatment: str, repetition: int):
+        """Marca a repetição `repetition` (contada a partir de 1) do tratamento como concluída"""
+        self._write({CHECKPOINT_KEY: {"accept_encoding": accept_encoding, "treatment": treatment,
+                                      "repetition": repetition}})
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
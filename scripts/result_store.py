@@ -0,0 +1,158 @@
+"""
+Armazenamento colunar dos resultados (Parquet ou Arrow IPC)
+Cada execução do experimento vira um arquivo numa partição
+date=AAAA-MM-DD/run_id=<execução> do conjunto de dados; a leitura projeta
+só as colunas pedidas e aplica os filtros antes de montar o DataFrame
+"""
+
+import glob
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+
+STORE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+DEFAULT_DATASET_DIR = os.path.join("results", "dataset")
+
+PARTITION_COLUMNS = ["date", "run_id"]
+
+# Tipos fixos das colunas principais; as demais métricas são inferidas e
+# conciliadas entre execuções na leitura (ex.: inteiro promovido a float)
+COLUMN_TYPES = {
+    "api_type": "string",
+    "query_type": "string",
+    "query_name": "string",
+    "response_time_ms": "float64",
+    "response_size_bytes": "int64",
+    "success": "bool",
+    "error_msg": "string",
+    "accept_encoding": "string",
+    "http_version": "string",
+    "connection_mode": "string",
+    "json_backend": "string",
+    "cache_status": "string",
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ValueError("O armazenamento colunar requer o pacote pyarrow instalado")
+
+
+def _to_table(records: List[Dict[str, Any]]) -> "pa.Table":
+    df = pd.DataFrame.from_records(records)
+    if "timestamp" in df:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    fields = [
+        pa.field(field.name, pa.type_for_alias(COLUMN_TYPES[field.name])) if field.name in COLUMN_TYPES else field
+        for field in table.schema
+    ]
+    return table.cast(pa.schema(fields))
+
+
+def write_results(records: List[Dict[str, Any]], run_id: str, root: str = DEFAULT_DATASET_DIR,
+                  fmt: str = "parquet", run_date: str = None) -> str:
+    """
+    Grava as medições de uma execução na partição date=<run_date>/run_id=<run_id>
+
+    Retorna o caminho do arquivo criado. Parquet é comprimido com zstd;
+    Arrow IPC (Feather v2) com lz4, mais rápido de ler e maior em disco.
+    """
+    _require_pyarrow()
+    if fmt not in STORE_FORMATS:
+        raise ValueError(f"Formato de armazenamento desconhecido: {fmt}")
+
+    run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+    partition = os.path.join(root, f"date={run_date}", f"run_id={run_id}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"part-0{STORE_FORMATS[fmt]}")
+
+    table = _to_table(records)
+    if fmt == "parquet":
+        pq.write_table(table, path, compression="zstd")
+    else:
+        feather.write_feather(table, path, compression="lz4")
+    return path
+
+
+def is_columnar(path: str) -> bool:
+    """Se o caminho é um arquivo Parquet/Arrow ou um diretório de conjunto de dados"""
+    return os.path.isdir(path) or os.path.splitext(path)[1] in STORE_FORMATS.values()
+
+
+def _source(path: str):
+    """(arquivos, formato do pyarrow); num diretório com os dois formatos, o Parquet é preferido"""
+    if not os.path.isdir(path):
+        return path, "parquet" if path.endswith(".parquet") else "ipc"
+    for fmt, extension in STORE_FORMATS.items():
+        files = sorted(glob.glob(os.path.join(path, "**", f"*{extension}"), recursive=True))
+        if files:
+            return files, "parquet" if fmt == "parquet" else "ipc"
+    raise ValueError(f"Nenhum arquivo Parquet/Arrow em {path}")
+
+
+def open_dataset(path: str) -> "ds.Dataset":
+    """
+    Abre um arquivo ou diretório particionado (hive) de resultados
+
+    O esquema é a união dos esquemas de todos os arquivos, de modo que
+    execuções com colunas diferentes (tratamentos ou opções novas) podem
+    ser lidas juntas.
+    """
+    _require_pyarrow()
+    source, fmt = _source(path)
+    options = {"partitioning": "hive", "partition_base_dir": path} if os.path.isdir(path) else {}
+    dataset = ds.dataset(source, format=fmt, **options)
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if len(schemas) > 1:
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        for field in dataset.schema:
+            if field.name in PARTITION_COLUMNS and field.name not in schema.names:
+                schema = schema.append(field)
+        dataset = ds.dataset(source, format=fmt, schema=schema, **options)
+    return dataset
+
+
+def build_filter(conditions: Dict[str, Any] = None) -> "ds.Expression":
+    """Expressão de filtro com igualdade (ou pertinência, para listas) em cada coluna"""
+    expression = None
+    for column, value in (conditions or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            condition = ds.field(column).isin(list(value))
+        else:
+            condition = ds.field(column) == value
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def load_results(path: str, columns: List[str] = None, conditions: Dict[str, Any] = None) -> pd.DataFrame:
+    """
+    Lê os resultados como DataFrame, com projeção e filtro empurrados para o leitor
+
+    Args:
+        columns: Colunas a ler (None lê todas); colunas ausentes no conjunto são ignoradas
+        conditions: Filtros de igualdade, ex.: {"api_type": "GraphQL", "success": True}
+    """
+    dataset = open_dataset(path)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=build_filter(conditions))
+    return table.to_pandas()
+
+
+def count_results(path: str, conditions: Dict[str, Any] = None) -> int:
+    """Número de medições (resolvido pelos metadados do Parquet quando não há filtro)"""
+    return open_dataset(path).count_rows(filter=build_filter(conditions))
@@ -0,0 +1,123 @@
+"""
+Motor de estatísticas por célula do experimento
+Ordena as medições uma única vez pela célula (api_type, query_type) e
+mantém cada métrica num array contíguo por célula, de modo que os testes
+de todas as células são calculados sem refiltrar o DataFrame
+"""
+
+from typing import Any, Dict, Hashable, List
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.stats import mannwhitneyu, shapiro, levene
+
+
+class Partition:
+    """
+    Valores das colunas `columns` agrupados pelas chaves `keys`
+
+    A ordenação é estável, então dentro de cada célula os valores mantêm a
+    ordem original das medições (e os resultados coincidem com os filtros
+    por máscara booleana).
+    """
+
+    def __init__(self, df: pd.DataFrame, keys: List[str], columns: List[str]):
+        grouped = df.groupby(keys if len(keys) > 1 else keys[0], sort=False)
+        codes = grouped.ngroup().to_numpy()
+        labels = list(grouped.size().index)
+
+        order = np.argsort(codes, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(labels)))])
+
+        self.keys = keys
+        self.labels = labels
+        self.values = {column: df[column].to_numpy()[order] for column in columns}
+        self.slices = {label: slice(offsets[i], offsets[i + 1]) for i, label in enumerate(labels)}
+
+    def get(self, label: Hashable, column: str) -> np.ndarray:
+        """Valores da célula (vazio quando a célula não existe)"""
+        cell = self.slices.get(label)
+        return self.values[column][cell] if cell is not None else self.values[column][:0]
+
+
+def normality_table(cells: Partition, api_types: List[str], query_types: List[str],
+                    metrics: List[str]) -> pd.DataFrame:
+    """Shapiro-Wilk em cada (api_type, query_type, métrica) com pelo menos 3 medições"""
+    rows = []
+    for api_type in api_types:
+        for query_type in query_types:
+            for metric in metrics:
+                data = cells.get((api_type, query_type), metric)
+                if len(data) >= 3:
+                    stat, p_value = shapiro(data)
+                    rows.append({
+                        'api_type': api_type,
+                        'query_type': query_type,
+                        'metric': metric,
+                        'statistic': stat,
+                        'p_value': p_value,
+                        'is_normal': p_value > 0.05
+                    })
+    return pd.DataFrame(rows)
+
+
+def levene_table(cells: Partition, query_types: List[str], metrics: List[str],
+                 first: str = 'REST', second: str = 'GraphQL') -> pd.DataFrame:
+    """Levene entre as duas APIs em cada (query_type, métrica)"""
+    rows = []
+    for query_type in query_types:
+        for metric in metrics:
+            first_data = cells.get((first, query_type), metric)
+            second_data = cells.get((second, query_type), metric)
+            if len(first_data) > 0 and len(second_data) > 0:
+                stat, p_value = levene(first_data, second_data)
+                rows.append({
+                    'query_type': query_type,
+                    'metric': metric,
+                    'statistic': stat,
+                    'p_value': p_value,
+                    'is_homogeneous': p_value > 0.05
+                })
+    return pd.DataFrame(rows)
+
+
+def two_sample(graphql: np.ndarray, rest: np.ndarray, graphql_moments=None, rest_moments=None) -> Dict[str, Any]:
+    """
+    Médias, desvios, teste t, Mann-Whitney U (H1: GraphQL < REST) e d de Cohen
+
+    Os desvios usam ddof=1, como `Series.std` do pandas. Com os momentos
+    (`streaming.RunningMoments`) de todas as medições, médias, desvios,
+    teste t e d de Cohen são exatos e só o Mann-Whitney usa as amostras.
+    """
+    if graphql_moments is None:
+        rest_mean, graphql_mean = rest.mean(), graphql.mean()
+        rest_std, graphql_std = rest.std(ddof=1), graphql.std(ddof=1)
+        graphql_count, rest_count = len(graphql), len(rest)
+        t_stat, t_pvalue = stats.ttest_ind(graphql, rest, alternative='less')
+    else:
+        rest_mean, graphql_mean = rest_moments.mean, graphql_moments.mean
+        rest_std, graphql_std = rest_moments.std, graphql_moments.std
+        graphql_count, rest_count = graphql_moments.count, rest_moments.count
+        t_stat, t_pvalue = stats.ttest_ind_from_stats(graphql_mean, graphql_std, graphql_count,
+                                                      rest_mean, rest_std, rest_count, alternative='less')
+
+    u_stat, u_pvalue = mannwhitneyu(graphql, rest, alternative='less')
+    cohens_d = (graphql_mean - rest_mean) / np.sqrt(
+        ((graphql_count - 1) * graphql_std**2 + (rest_count - 1) * rest_std**2) /
+        (graphql_count + rest_count - 2)
+    )
+
+    return {
+        'rest_mean': rest_mean,
+        'rest_std': rest_std,
+        'graphql_mean': graphql_mean,
+        'graphql_std': graphql_std,
+        'difference': rest_mean - graphql_mean,
+        't_statistic': t_stat,
+        't_pvalue': t_pvalue,
+        'u_statistic': u_stat,
+        'u_pvalue': u_pvalue,
+        'cohens_d': cohens_d,
+        'significant': u_pvalue < 0.05
+    }
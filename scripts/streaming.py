@@ -0,0 +1,260 @@
+"""
+Análise em fluxo com memória limitada
+Lê os resultados em blocos (CSV, Parquet/Arrow ou o registro JSONL do
+experimento) e mantém, por célula (api_type, query_type) e por API,
+acumuladores online: média e variância de Welford, histogramas HDR para os
+percentis e uma amostra de reservatório para os testes de posto e gráficos
+"""
+
+from typing import Any, Dict, Hashable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from hdr_histogram import HdrHistogram, LatencyHistograms
+from json_codec import JSONCodec
+from result_log import completed_measurements
+from result_store import is_columnar, open_dataset, build_filter
+
+
+DEFAULT_CHUNKSIZE = 500_000
+
+DEFAULT_RESERVOIR_SIZE = 10_000
+
+METRICS = ['response_time_ms', 'response_size_bytes']
+
+
+def _apply_conditions(df: pd.DataFrame, conditions: Dict[str, Any]) -> pd.DataFrame:
+    for column, value in (conditions or {}).items():
+        values = value if isinstance(value, list) else [value]
+        df = df[df[column].isin(values)]
+    return df
+
+
+def iter_chunks(path: str, columns: List[str], chunksize: int = DEFAULT_CHUNKSIZE,
+                conditions: Dict[str, Any] = None) -> Iterator[pd.DataFrame]:
+    """
+    Blocos de até `chunksize` medições com as colunas pedidas (as ausentes são ignoradas)
+
+    Em Parquet/Arrow a projeção e os filtros são aplicados pelo leitor; do
+    JSONL entram só as medições das repetições concluídas, com as mesmas
+    regras de `ResultLog.recover` (sem truncar o arquivo).
+    """
+    if is_columnar(path):
+        dataset = open_dataset(path)
+        columns = [c for c in columns if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns=columns, filter=build_filter(conditions), batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    elif path.endswith('.jsonl'):
+        records = []
+        for record in completed_measurements(path, JSONCodec()):
+            records.append({c: record.get(c) for c in columns if c in record})
+            if len(records) >= chunksize:
+                yield _apply_conditions(pd.DataFrame.from_records(records), conditions)
+                records = []
+        if records:
+            yield _apply_conditions(pd.DataFrame.from_records(records), conditions)
+
+    else:
+        for chunk in pd.read_csv(path, usecols=lambda c: c in columns, chunksize=chunksize):
+            yield _apply_conditions(chunk, conditions)
+
+
+def load_frame(path: str, columns: List[str], conditions: Dict[str, Any] = None) -> pd.DataFrame:
+    """Carrega um JSONL inteiro em memória (mesmas colunas e filtros de `iter_chunks`)"""
+    return pd.concat(list(iter_chunks(path, columns, conditions=conditions)), ignore_index=True)
+
+
+class RunningMoments:
+    """Contagem, média, variância (Welford/Chan, combinando blocos), mínimo e máximo"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values: np.ndarray):
+        n_batch = len(values)
+        if not n_batch:
+            return
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        total = self.count + n_batch
+        delta = batch_mean - self.mean
+        self.mean += delta * n_batch / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n_batch / total
+        self.count = total
+        low, high = values.min(), values.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    @property
+    def std(self) -> float:
+        """Desvio-padrão amostral (ddof=1)"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class Reservoir:
+    """Amostra uniforme de até `capacity` linhas (algoritmo R, vetorizado por bloco)"""
+
+    def __init__(self, capacity: int, width: int, rng: np.random.Generator):
+        self.capacity = capacity
+        self.data = np.empty((capacity, width))
+        self.size = 0
+        self.seen = 0
+        self.rng = rng
+
+    def update(self, rows: np.ndarray):
+        fill = min(len(rows), self.capacity - self.size)
+        if fill > 0:
+            self.data[self.size:self.size + fill] = rows[:fill]
+            self.size += fill
+        rest = rows[fill:]
+        if len(rest):
+            # A i-ésima linha vista (a partir de 0) substitui uma posição sorteada em [0, i] se ela cair na amostra
+            positions = self.seen + fill + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            kept = slots < self.capacity
+            self.data[slots[kept]] = rest[kept]
+        self.seen += len(rows)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class CellAccumulator:
+    """Acumuladores de uma célula: momentos por métrica, histogramas HDR e reservatório"""
+
+    def __init__(self, reservoir_size: int, rng: np.random.Generator):
+        self.moments = {metric: RunningMoments() for metric in METRICS}
+        self.time_histogram = HdrHistogram()
+        self.size_histogram = HdrHistogram()
+        self.reservoir = Reservoir(reservoir_size, len(METRICS), rng)
+
+    def median(self, metric: str) -> float:
+        """Exata enquanto o reservatório contém a célula inteira; depois, do histograma HDR"""
+        if self.reservoir.seen == self.reservoir.size:
+            return float(np.median(self.reservoir.values[:, METRICS.index(metric)]))
+        if metric == 'response_time_ms':
+            return self.time_histogram.value_at_percentile(50) / 1000
+        return self.size_histogram.value_at_percentile(50)
+
+    def update(self, values: np.ndarray):
+        """`values`: matriz (linhas, METRICS)"""
+        for j, metric in enumerate(METRICS):
+            self.moments[metric].update(values[:, j])
+        self.time_histogram.record_array(values[:, 0] * 1000)
+        self.size_histogram.record_array(values[:, 1])
+        self.reservoir.update(values)
+
+
+class StreamPartition:
+    """Mesma interface de `stats_engine.Partition`, sobre os reservatórios, mais os momentos exatos"""
+
+    def __init__(self, cells: Dict[Hashable, CellAccumulator]):
+        self.cells = cells
+        self.labels = list(cells)
+
+    def get(self, label: Hashable, column: str) -> np.ndarray:
+        cell = self.cells.get(label)
+        if cell is None:
+            return np.empty(0)
+        return cell.reservoir.values[:, METRICS.index(column)]
+
+    def moments(self, label: Hashable, column: str) -> RunningMoments:
+        cell = self.cells.get(label)
+        return cell.moments[column] if cell is not None else None
+
+
+class StreamingAnalysis:
+    """
+    Consome blocos de medições sem guardá-las
+
+    Args:
+        reservoir_size: Linhas amostradas por célula para Shapiro-Wilk, Levene,
+            Mann-Whitney, bootstrap, ANOVA e gráficos (células menores ficam completas)
+    """
+
+    def __init__(self, reservoir_size: int = DEFAULT_RESERVOIR_SIZE, seed: int = 0):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.cells: Dict[Tuple[str, str], CellAccumulator] = {}
+        self.apis: Dict[str, CellAccumulator] = {}
+        self.total_count = 0
+        self.success_count = 0
+
+    def _cell(self, accumulators: Dict, key: Hashable) -> CellAccumulator:
+        if key not in accumulators:
+            accumulators[key] = CellAccumulator(self.reservoir_size, self.rng)
+        return accumulators[key]
+
+    def consume(self, chunk: pd.DataFrame):
+        self.total_count += len(chunk)
+        chunk = chunk[chunk['success'] == True]
+        self.success_count += len(chunk)
+        if chunk.empty:
+            return
+
+        values = chunk[METRICS].to_numpy(dtype=float)
+        for key, indices in chunk.groupby(['api_type', 'query_type'], sort=False).indices.items():
+            self._cell(self.cells, key).update(values[indices])
+        for key, indices in chunk.groupby('api_type', sort=False).indices.items():
+            self._cell(self.apis, key).update(values[indices])
+
+    def partition(self, *keys: str) -> StreamPartition:
+        return StreamPartition(self.apis if keys == ('api_type',) else self.cells)
+
+    def sample_frame(self) -> pd.DataFrame:
+        """Reservatórios de todas as células como DataFrame (ordem de primeira aparição das células)"""
+        frames = []
+        for (api_type, query_type), cell in self.cells.items():
+            frame = pd.DataFrame(cell.reservoir.values, columns=METRICS)
+            frame.insert(0, 'query_type', query_type)
+            frame.insert(0, 'api_type', api_type)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['api_type', 'query_type'] + METRICS)
+
+    def latency_histograms(self) -> LatencyHistograms:
+        histograms = LatencyHistograms()
+        for key, cell in self.cells.items():
+            histograms.histograms[key] = cell.time_histogram
+        return histograms
+
+    def descriptive_table(self) -> pd.DataFrame:
+        """Mesmo layout de `groupby().agg()` do modo em memória"""
+        rows = {}
+        for key in sorted(self.cells):
+            cell = self.cells[key]
+            time, size = cell.moments['response_time_ms'], cell.moments['response_size_bytes']
+            rows[key] = {
+                ('response_time_ms', 'count'): time.count,
+                ('response_time_ms', 'mean'): time.mean,
+                ('response_time_ms', 'std'): time.std,
+                ('response_time_ms', 'min'): time.min,
+                ('response_time_ms', 'median'): cell.median('response_time_ms'),
+                ('response_time_ms', 'max'): time.max,
+                ('response_size_bytes', 'mean'): size.mean,
+                ('response_size_bytes', 'std'): size.std,
+                ('response_size_bytes', 'min'): size.min,
+                ('response_size_bytes', 'median'): cell.median('response_size_bytes'),
+                ('response_size_bytes', 'max'): size.max,
+            }
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        table.index = pd.MultiIndex.from_tuples(table.index, names=['api_type', 'query_type'])
+        table.columns = pd.MultiIndex.from_tuples(table.columns)
+        return table
+
+
+def stream_file(path: str, columns: List[str], chunksize: int = DEFAULT_CHUNKSIZE,
+                conditions: Dict[str, Any] = None, reservoir_size: int = DEFAULT_RESERVOIR_SIZE) -> StreamingAnalysis:
+    analysis = StreamingAnalysis(reservoir_size)
+    for chunk in iter_chunks(path, columns, chunksize, conditions):
+        analysis.consume(chunk)
+    return analysis
@@ -0,0 +1,92 @@
+"""
+Contabilização de CPU do cliente e calibração do relógio
+Separa o tempo gasto pelo próprio cliente Python (CPU) do tempo de espera
+pela API e mede a resolução e o custo de leitura do relógio usado nas
+medições de latência
+"""
+
+import functools
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+
+# client_cpu_ms: CPU do processo durante a chamada (inclui qualquer outra thread; com
+# --local, principalmente o servidor local); client_thread_cpu_ms: CPU só da thread que
+# fez a chamada; client_worker_cpu_ms: CPU das threads auxiliares do cliente (requisições
+# concorrentes, pré-busca de páginas, duplicadas, despachante de lotes) no mesmo intervalo
+CPU_COLUMNS = ["client_cpu_ms", "client_thread_cpu_ms", "client_worker_cpu_ms"]
+
+_worker_cpu_ns = 0
+_worker_lock = threading.Lock()
+
+
+def worker_task(function: Callable) -> Callable:
+    """Envolve uma tarefa executada numa thread auxiliar do cliente, somando o CPU dela a `client_worker_cpu_ms`"""
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        global _worker_cpu_ns
+        start = time.thread_time_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.thread_time_ns() - start
+            with _worker_lock:
+                _worker_cpu_ns += elapsed
+
+    return run
+
+
+@contextmanager
+def measure_cpu():
+    """
+    Preenche o dicionário entregue com o CPU (CPU_COLUMNS) consumido dentro do bloco
+
+    As tarefas auxiliares entram pelo instante em que terminam: uma página
+    pré-buscada que termina depois do bloco conta para a medição seguinte.
+    """
+    usage = {}
+    process_start = time.process_time_ns()
+    thread_start = time.thread_time_ns()
+    worker_start = _worker_cpu_ns
+    try:
+        yield usage
+    finally:
+        usage["client_cpu_ms"] = (time.process_time_ns() - process_start) / 1e6
+        usage["client_thread_cpu_ms"] = (time.thread_time_ns() - thread_start) / 1e6
+        usage["client_worker_cpu_ms"] = (_worker_cpu_ns - worker_start) / 1e6
+
+
+def calibrate_timer(samples: int = 20000) -> Dict[str, float]:
+    """
+    Mede a resolução efetiva e o custo de uma leitura de `time.perf_counter`
+
+    A resolução é o menor incremento observado entre leituras consecutivas
+    que mudaram de valor; o custo é a mediana, em lotes de 100 leituras, do
+    tempo de uma leitura.
+    """
+    resolution = None
+    for _ in range(samples // 10):
+        start = time.perf_counter_ns()
+        current = time.perf_counter_ns()
+        while current == start:
+            current = time.perf_counter_ns()
+        delta = current - start
+        if resolution is None or delta < resolution:
+            resolution = delta
+
+    batch = 100
+    overheads = []
+    perf_counter = time.perf_counter
+    for _ in range(samples // batch):
+        start = time.perf_counter_ns()
+        for _ in range(batch):
+            perf_counter()
+        overheads.append((time.perf_counter_ns() - start) / batch)
+
+    return {
+        "timer_resolution_ns": resolution,
+        "timer_overhead_ns": statistics.median(overheads),
+    }
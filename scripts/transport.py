@@ -0,0 +1,350 @@
+"""
+Camada de transporte instrumentada para o experimento GraphQL vs REST
+Separa o tempo de cada requisição em resolução de nome (DNS), conexão TCP,
+handshake TLS, tempo até o primeiro byte (TTFB), download do corpo e
+decodificação do JSON. Os transportes HTTP/1.1 (requests) e HTTP/2 (httpx)
+têm a mesma interface e podem ser trocados nos clientes síncronos
+"""
+
+import socket
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+
+PHASE_COLUMNS = ["dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms", "decode_ms"]
+
+# wire_bytes: corpo como trafegou (comprimido); decoded_bytes: corpo após descompressão;
+# header_bytes: cabeçalhos da resposta; request_bytes: requisição completa (linha, cabeçalhos e corpo)
+SIZE_COLUMNS = ["wire_bytes", "decoded_bytes", "header_bytes", "request_bytes"]
+
+_current_phases: ContextVar = ContextVar("current_phases", default=None)
+
+
+@contextmanager
+def capture_phases():
+    """Coleta, no contexto atual, os tempos por fase de todas as requisições feitas dentro do bloco"""
+    phases = dict.fromkeys(PHASE_COLUMNS, 0.0)
+    token = _current_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _current_phases.reset(token)
+
+
+def add_phases(phases: Dict[str, float]):
+    current = _current_phases.get()
+    if current is None or current is phases:
+        return
+    for name, value in phases.items():
+        if value is None or isinstance(value, str):
+            current[name] = value
+        else:
+            current[name] = (current.get(name) or 0.0) + value
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def header_block_size(start_line: str, headers: Iterable[Tuple[Any, Any]]) -> int:
+    """Tamanho em bytes de uma linha inicial HTTP/1.1 mais seus cabeçalhos, como enviados na conexão"""
+    size = len(start_line) + 2
+    for name, value in headers:
+        size += len(name) + len(value) + 4
+    return size + 2
+
+
+def request_size(method: str, url: str, headers: Iterable[Tuple[Any, Any]], body: bytes = None) -> int:
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    headers = [
+        (name.decode("latin-1"), value.decode("latin-1")) if isinstance(name, bytes) else (name, value)
+        for name, value in headers
+    ]
+    if not any(name.lower() == "host" for name, _ in headers):
+        headers.append(("Host", parts.netloc))
+    return header_block_size(f"{method} {target} HTTP/1.1", headers) + len(body or b"")
+
+
+class _TimedConnectionMixin:
+    """Mede DNS, conexão TCP e TTFB diretamente nas conexões do urllib3"""
+
+    def _new_conn(self):
+        phases = _current_phases.get()
+        if phases is None:
+            return super()._new_conn()
+
+        hostname = self._dns_host
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(hostname, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        phases["dns_ms"] += _elapsed_ms(start)
+        phases["connections_opened"] = phases.get("connections_opened", 0) + 1
+
+        # Como o create_connection do urllib3: tenta os endereços na ordem devolvida pelo resolvedor
+        start = time.perf_counter()
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = hostname
+        phases["connect_ms"] += _elapsed_ms(start)
+
+        return sock
+
+    def request(self, *args, **kwargs):
+        phases = _current_phases.get()
+        if phases is not None:
+            self._request_started = time.perf_counter()
+            self._setup_ms_before = phases["dns_ms"] + phases["connect_ms"] + phases["tls_ms"]
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        phases = _current_phases.get()
+        if phases is not None and getattr(self, "_request_started", None) is not None:
+            setup_ms = phases["dns_ms"] + phases["connect_ms"] + phases["tls_ms"] - self._setup_ms_before
+            phases["ttfb_ms"] += _elapsed_ms(self._request_started) - setup_ms
+            self._request_started = None
+        return response
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        phases = _current_phases.get()
+        if phases is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        setup_before = phases["dns_ms"] + phases["connect_ms"]
+        super().connect()
+        phases["tls_ms"] += _elapsed_ms(start) - (phases["dns_ms"] + phases["connect_ms"] - setup_before)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter do requests cujas conexões registram o tempo de cada fase"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class RequestsTransport:
+    """Transporte HTTP/1.1 sobre requests.Session com medição por fase"""
+
+    def __init__(self, headers: Dict[str, str] = None, timeout: float = 30):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+
+        adapter = InstrumentedAdapter()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, route: str = None, **kwargs) -> Tuple[requests.Response, Dict[str, float]]:
+        """
+        Executa a requisição e lê o corpo completo
+
+        `route` (nome da operação) só é usado pelo ResilientTransport.
+
+        Returns:
+            Tupla (resposta, métricas): tempos por fase em ms e tamanhos (SIZE_COLUMNS) em bytes.
+            `decode_ms` fica a cargo do cliente.
+        """
+        with capture_phases() as phases:
+            response = self.session.request(method, url, stream=True, timeout=self.timeout, **kwargs)
+            start = time.perf_counter()
+            response.content
+            phases["download_ms"] += _elapsed_ms(start)
+
+        request = response.request
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        http_version = "HTTP/1.0" if response.raw.version == 10 else "HTTP/1.1"
+        phases["wire_bytes"] = response.raw.tell()
+        phases["decoded_bytes"] = len(response.content)
+        phases["header_bytes"] = header_block_size(
+            f"{http_version} {response.status_code} {response.reason}", response.raw.headers.items()
+        )
+        phases["request_bytes"] = request_size(request.method, request.url, request.headers.items(), body)
+        phases["request_size_bytes"] = len(body or b"")
+        phases["http_version"] = http_version
+        phases.setdefault("connections_opened", 0)
+        phases["pool_connections"] = self.open_connections()
+
+        return response, phases
+
+    def open_connections(self) -> int:
+        """Conexões abertas e ociosas nos pools do urllib3 (a da requisição atual já foi devolvida)"""
+        total = 0
+        # O mesmo adaptador é montado para http:// e https://
+        for adapter in {id(a): a for a in self.session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                idle = list(pools[key].pool.queue) if pools[key].pool is not None else []
+                total += sum(1 for conn in idle if conn is not None and conn.sock is not None)
+        return total
+
+    def reset_connections(self):
+        """Fecha todas as conexões do pool; a próxima requisição abre uma conexão nova"""
+        for adapter in self.session.adapters.values():
+            adapter.close()
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXTransport:
+    """
+    Transporte HTTP/2 sobre httpx.Client com medição por fase
+
+    Requisições feitas por várias threads ao mesmo tempo são multiplexadas
+    como streams de uma única conexão. Em URLs http:// (servidor local) não
+    há ALPN, então a conexão usa HTTP/2 direto (prior knowledge).
+    """
+
+    def __init__(self, headers: Dict[str, str] = None, timeout: float = 30, cleartext: bool = False):
+        self.timeout = timeout
+        self.cleartext = cleartext
+        self.session = self._new_client(headers)
+
+    def _new_client(self, headers) -> httpx.Client:
+        return httpx.Client(http1=not self.cleartext, http2=True, headers=headers, timeout=self.timeout)
+
+    def request(self, method: str, url: str, params: Dict = None, data: bytes = None,
+                headers: Dict[str, str] = None, route: str = None) -> Tuple[httpx.Response, Dict[str, Any]]:
+        tracer = PhaseTracer()
+        response = self.session.request(
+            method, url, params=params, content=data, headers=headers, extensions={"trace": tracer}
+        )
+
+        metrics = tracer.phases
+        metrics.update(response_sizes(response))
+        metrics["request_size_bytes"] = len(response.request.content)
+        metrics["http_version"] = response.http_version
+        metrics["pool_connections"] = self.open_connections()
+        return response, metrics
+
+    def open_connections(self) -> Optional[int]:
+        """Conexões abertas no pool do httpcore, ou None se o pool interno não estiver acessível"""
+        pool = getattr(getattr(self.session, "_transport", None), "_pool", None)
+        if pool is None:
+            return None
+        return sum(1 for connection in pool.connections if not connection.is_closed())
+
+    def reset_connections(self):
+        """O httpx não fecha conexões sem fechar o cliente: recria o cliente com os mesmos cabeçalhos"""
+        headers = self.session.headers
+        self.session.close()
+        self.session = self._new_client(headers)
+
+    def close(self):
+        self.session.close()
+
+
+TRANSPORTS = ["http1", "http2"]
+
+# Erros de rede/HTTP de qualquer um dos transportes
+TRANSPORT_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+
+
+def create_transport(name: str, headers: Dict[str, str], base_url: str, timeout: float = 30):
+    if name == "http2":
+        return HTTPXTransport(headers, timeout, cleartext=base_url.startswith("http://"))
+    if name == "http1":
+        return RequestsTransport(headers, timeout)
+    raise ValueError(f"Transporte desconhecido: {name}")
+
+
+def response_sizes(response: httpx.Response) -> Dict[str, int]:
+    """Tamanhos (SIZE_COLUMNS) de uma resposta httpx já lida por completo"""
+    request = response.request
+    return {
+        "wire_bytes": response.num_bytes_downloaded,
+        "decoded_bytes": len(response.content),
+        "header_bytes": header_block_size(
+            f"{response.http_version} {response.status_code} {response.reason_phrase}", response.headers.raw
+        ),
+        "request_bytes": request_size(request.method, str(request.url), request.headers.raw, request.content),
+    }
+
+
+class PhaseTracer:
+    """
+    Converte os eventos de trace do httpx/httpcore em tempos por fase
+
+    O httpcore resolve o nome dentro de `connect_tcp`, então nesse transporte o
+    tempo de DNS fica incluído em `connect_ms` e `dns_ms` é registrado como None.
+    """
+
+    _PHASES = {
+        "connect_tcp": "connect_ms",
+        "start_tls": "tls_ms",
+        "receive_response_body": "download_ms",
+    }
+
+    def __init__(self):
+        self.phases: Dict[str, Any] = dict.fromkeys(PHASE_COLUMNS, 0.0)
+        self.phases["dns_ms"] = None
+        self.phases["connections_opened"] = 0
+        self._started: Dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: Dict):
+        self._record(event_name)
+
+    async def atrace(self, event_name: str, info: Dict):
+        self._record(event_name)
+
+    def _record(self, event_name: str):
+        now = time.perf_counter()
+        _, _, event = event_name.partition(".")
+        name, _, stage = event.rpartition(".")
+
+        if stage == "started":
+            self._started[name] = now
+            return
+
+        if name == "receive_response_headers":
+            started = self._started.get("send_request_headers")
+            if started is not None:
+                self.phases["ttfb_ms"] += (now - started) * 1000
+        elif name in self._PHASES and name in self._started:
+            self.phases[self._PHASES[name]] += (now - self._started[name]) * 1000
+            if name == "connect_tcp":
+                self.phases["connections_opened"] += 1
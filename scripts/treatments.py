@@ -0,0 +1,145 @@
+"""
+Registro declarativo dos tratamentos do experimento
+Carrega de um arquivo YAML os pares de chamadas REST/GraphQL, os geradores
+de parâmetros e as repetições de cada tratamento, para que todos sejam
+executados pelo mesmo motor no ExperimentRunner
+"""
+
+import os
+import random
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+
+DEFAULT_TREATMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "treatments.yaml")
+
+API_SIDES = ["rest", "graphql"]
+
+_PLACEHOLDER = re.compile(r"^\{(\w+)\}$")
+
+
+def substitute(template: Any, params: Dict[str, Any]) -> Any:
+    """
+    Substitui os parâmetros sorteados num argumento do registro
+
+    "{nome}" sozinho repassa o valor com o tipo original; em textos maiores
+    o valor é formatado; listas e dicionários são percorridos.
+    """
+    if isinstance(template, str):
+        match = _PLACEHOLDER.match(template)
+        if match and match.group(1) in params:
+            return params[match.group(1)]
+        return template.format(**params) if "{" in template else template
+    if isinstance(template, list):
+        return [substitute(item, params) for item in template]
+    if isinstance(template, dict):
+        return {key: substitute(value, params) for key, value in template.items()}
+    return template
+
+
+class ApiCall:
+    """Uma chamada de cliente (REST ou GraphQL) de um tratamento"""
+
+    __slots__ = ("id", "method", "args", "kwargs", "description")
+
+    def __init__(self, id: str, method: str, args: List = None, kwargs: Dict = None, description: str = ""):
+        self.id = id
+        self.method = method
+        self.args = args or []
+        self.kwargs = kwargs or {}
+        self.description = description
+
+    def bind(self, params: Dict[str, Any]) -> Tuple[List, Dict[str, Any], str]:
+        """Retorna (args, kwargs, descrição) com os parâmetros da repetição"""
+        return substitute(self.args, params), substitute(self.kwargs, params), substitute(self.description, params)
+
+
+class Treatment:
+
+    def __init__(self, name: str, title: str, query_type: str, query_name: str, calls: Dict[str, ApiCall],
+                 params: Dict[str, Dict] = None, repetitions: int = None, requires: str = None):
+        self.name = name
+        self.title = title
+        self.query_type = query_type
+        self.query_name = query_name
+        self.calls = calls
+        self.params = params or {}
+        self.repetitions = repetitions
+        self.requires = requires
+
+    def generate_params(self, pools: Dict[str, List], settings: Dict[str, Any],
+                        resolve: Callable[[str, List], Any], rng: random.Random = random) -> Dict[str, Any]:
+        """Sorteia os parâmetros de uma repetição, na ordem em que aparecem no registro"""
+        values = {}
+        for name, spec in self.params.items():
+            if "choice" in spec:
+                options = spec["choice"]
+                values[name] = rng.choice(pools[options] if isinstance(options, str) else options)
+            elif "randint" in spec:
+                low, high = spec["randint"]
+                values[name] = rng.randint(low, high)
+            elif "value" in spec:
+                values[name] = spec["value"]
+            elif "setting" in spec:
+                values[name] = settings.get(spec["setting"])
+            elif "resolve" in spec:
+                values[name] = resolve(spec["resolve"], substitute(spec.get("args", []), values))
+            else:
+                raise ValueError(f"Gerador de parâmetro desconhecido em '{self.name}.{name}': {spec}")
+        return values
+
+
+class TreatmentRegistry:
+    """
+    Conjuntos de valores (`pools`) e tratamentos lidos de um arquivo YAML
+
+    Args:
+        path: Arquivo do registro (padrão: treatments.yaml ao lado deste módulo)
+    """
+
+    def __init__(self, path: str = DEFAULT_TREATMENTS_FILE):
+        with open(path, encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+
+        self.path = path
+        self.pools: Dict[str, List] = config.get("pools", {})
+        self.treatments: List[Treatment] = [self._parse(entry) for entry in config.get("treatments", [])]
+
+        seen = {}
+        for treatment in self.treatments:
+            for call in treatment.calls.values():
+                if call.id in seen:
+                    raise ValueError(f"Identificador '{call.id}' repetido em {seen[call.id]} e {treatment.name} "
+                                     f"({self.path})")
+                seen[call.id] = treatment.name
+
+    def _parse(self, entry: Dict[str, Any]) -> Treatment:
+        missing = [key for key in ["name", "query_type"] + API_SIDES if key not in entry]
+        if missing:
+            raise ValueError(f"Tratamento sem os campos {missing} em {self.path}: {entry}")
+
+        for spec in (entry.get("params") or {}).values():
+            choice = spec.get("choice")
+            if isinstance(choice, str) and choice not in self.pools:
+                raise ValueError(f"Conjunto '{choice}' não definido em pools ({entry['name']})")
+
+        calls = {side: ApiCall(**entry[side]) for side in API_SIDES}
+        return Treatment(
+            name=entry["name"],
+            title=entry.get("title", entry["name"]),
+            query_type=entry["query_type"],
+            query_name=entry.get("query_name", calls["rest"].method),
+            calls=calls,
+            params=entry.get("params"),
+            repetitions=entry.get("repetitions"),
+            requires=entry.get("requires"),
+        )
+
+    def enabled(self, settings: Dict[str, Any]) -> List[Treatment]:
+        """Tratamentos cujas configurações exigidas (`requires`) estão definidas"""
+        return [t for t in self.treatments if not t.requires or settings.get(t.requires)]
+
+    def query_types(self) -> List[str]:
+        return list(dict.fromkeys(t.query_type for t in self.treatments))
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from async_rest_client import AsyncRESTClient
+from json_codec import JSONCodec
+from local_server import LocalServer
+
+
+class SlowCodec(JSONCodec):
+    """Decodificação artificialmente lenta, para verificar que ela fica fora do tempo medido"""
+
+    def loads(self, raw):
+        time.sleep(0.2)
+        return super().loads(raw)
+
+
+def test_decode_is_not_timed():
+    async def run(base_url, login):
+        client = AsyncRESTClient(base_url=base_url, codec=SlowCodec())
+        try:
+            _, single_ms, _ = await client.get_user_simple(login)
+            data, combined_ms, _ = await client.get_user_with_repos(login)
+        finally:
+            await client.close()
+        return single_ms, data, combined_ms
+
+    with LocalServer() as server:
+        login = server.api.dataset.logins[0]
+        single_ms, data, combined_ms = asyncio.run(run(server.base_url, login))
+
+    assert data["user"]["login"] == login
+    assert single_ms < 200
+    assert combined_ms < 200
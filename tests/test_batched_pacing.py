@@ -0,0 +1,17 @@
+from experiment import ExperimentRunner, BATCHED_GRAPHQL_API
+from local_server import LocalServer
+
+
+def test_batched_callers_share_one_paced_request(tmp_path):
+    with LocalServer() as server:
+        runner = ExperimentRunner(None, output_dir=str(tmp_path), base_url=server.base_url, delay=0.03,
+                                  batch_window_ms=5.0)
+        try:
+            runner.run_batched_queries(repetitions=2)
+        finally:
+            runner.batching_graphql_client.close()
+
+    batched = [r for r in runner.results if r["api_type"] == BATCHED_GRAPHQL_API]
+    assert len(batched) == 2 * len(runner.registry.pools["users"])
+    assert all(r["success"] for r in batched)
+    assert all(r["batch_size"] > 1 for r in batched)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from bootstrap import BOOTSTRAP_STATISTICS, bootstrap_cell, bootstrap_cells, bootstrap_columns
+
+
+def _cells(seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "simples": (rng.lognormal(5.0, 0.3, 400), rng.lognormal(5.3, 0.3, 400)),
+        "filtros": (rng.lognormal(6.0, 0.5, 300), rng.lognormal(6.0, 0.5, 250)),
+    }
+
+
+def test_fixed_seed_is_reproducible_with_and_without_processes():
+    cells = _cells()
+    first = bootstrap_cells(cells, n_resamples=500, seed=7)
+    again = bootstrap_cells(cells, n_resamples=500, seed=7)
+    parallel = bootstrap_cells(cells, n_resamples=500, seed=7, workers=2)
+    other = bootstrap_cells(cells, n_resamples=500, seed=8)
+
+    assert first == again == parallel
+    assert first["simples"]["graphql_median_ci_low"] != other["simples"]["graphql_median_ci_low"]
+    assert list(first["simples"]) == bootstrap_columns()
+
+
+def test_intervals_cover_known_percentiles():
+    # Exponencial(1): mediana ln 2 e p90 ln 10; razão entre escalas 1 e 2 = 0,5
+    rng = np.random.default_rng(3)
+    misses = {"median": 0, "p90": 0, "ratio_median": 0}
+    trials = 40
+    for trial in range(trials):
+        graphql = rng.exponential(1.0, 500)
+        rest = rng.exponential(2.0, 500)
+        row = bootstrap_cell(graphql, rest, n_resamples=1000, seed=trial)
+        for name, label, truth in (("median", "graphql_median", np.log(2)),
+                                   ("p90", "graphql_p90", np.log(10)),
+                                   ("ratio_median", "ratio_median", 0.5)):
+            if not row[f"{label}_ci_low"] <= truth <= row[f"{label}_ci_high"]:
+                misses[name] += 1
+
+    # Cobertura nominal de 95%: com 40 tentativas, mais de 8 falhas é muito improvável
+    assert all(count <= 8 for count in misses.values()), misses
+
+
+def test_point_estimates_match_numpy():
+    graphql, rest = _cells()["simples"]
+    row = bootstrap_cell(graphql, rest, n_resamples=200, seed=0)
+    for name, p in BOOTSTRAP_STATISTICS.items():
+        assert row[f"graphql_{name}"] == pytest.approx(np.percentile(graphql, p))
+        assert row[f"rest_{name}"] == pytest.approx(np.percentile(rest, p))
+        assert row[f"ratio_{name}"] == pytest.approx(np.percentile(graphql, p) / np.percentile(rest, p))
+        assert row[f"graphql_{name}_ci_low"] <= row[f"graphql_{name}"] <= row[f"graphql_{name}_ci_high"]
+
+
+def test_empty_cell_yields_nan_instead_of_failing():
+    rest = np.random.default_rng(0).exponential(1.0, 100)
+    row = bootstrap_cell(np.array([]), rest, n_resamples=200, seed=0)
+
+    assert set(row) == set(bootstrap_columns())
+    for column, value in row.items():
+        if column.startswith("rest_"):
+            assert np.isfinite(value)
+        else:
+            assert np.isnan(value)
+
+    rows = bootstrap_cells({"GERAL": (np.array([]), np.array([]))}, n_resamples=50)
+    assert all(np.isnan(value) for value in rows["GERAL"].values())
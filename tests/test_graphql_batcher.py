@@ -0,0 +1,123 @@
+import json
+import threading
+
+import pytest
+
+from graphql_batcher import BatchingGraphQLClient, merge_operations, split_result
+from graphql_client import USER_SIMPLE_QUERY
+from local_server import GraphQLSchema, SyntheticDataset
+
+
+class FakeExecutor:
+    """Executa as consultas enviadas no schema local, sem HTTP"""
+
+    def __init__(self, fail: Exception = None):
+        self.schema = GraphQLSchema(SyntheticDataset())
+        self.payloads = []
+        self.fail = fail
+
+    def __call__(self, payload):
+        self.payloads.append(payload)
+        if self.fail is not None:
+            raise self.fail
+        data = self.schema.execute(payload["query"], payload.get("variables"))
+        body = json.dumps(data).encode()
+        return data, {"decode_ms": 0.5, "request_size_bytes": 300, "response_size_bytes": len(body)}
+
+
+def _compact_size(data) -> int:
+    return len(json.dumps(data, separators=(",", ":")).encode())
+
+
+def _run_batch(client, calls):
+    """Dispara todas as chamadas ao mesmo tempo; retorna (resultado ou exceção, métricas) de cada uma"""
+    results = [None] * len(calls)
+    start = threading.Barrier(len(calls))
+
+    def worker(index, method, args):
+        start.wait()
+        try:
+            results[index] = (getattr(client, method)(*args), client.last_metrics)
+        except Exception as e:
+            results[index] = (e, client.last_metrics)
+
+    threads = [threading.Thread(target=worker, args=(i, method, args)) for i, (method, args) in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.fixture
+def dataset():
+    return SyntheticDataset()
+
+
+def test_merge_and_split_roundtrip(dataset):
+    login = dataset.logins[0]
+    operations = [(USER_SIMPLE_QUERY, {"login": login}), (USER_SIMPLE_QUERY, {"login": dataset.logins[1]})]
+    query, variables = merge_operations(operations)
+    assert variables == {"q0_login": login, "q1_login": dataset.logins[1]}
+    assert "q0_user:user(login:$q0_login)" in query.replace(" ", "")
+
+    data = GraphQLSchema(dataset).execute(query, variables)["data"]
+    for index, (single_query, single_variables) in enumerate(operations):
+        expected = GraphQLSchema(dataset).execute(single_query, single_variables)["data"]
+        assert split_result(index, data) == expected
+
+
+def test_batch_splits_data_errors_and_sizes(dataset):
+    client = BatchingGraphQLClient(None, "http://stub", window_ms=200, max_batch_size=3)
+    client._post = executor = FakeExecutor()
+    good = dataset.logins[:2]
+    try:
+        results = _run_batch(client, [("get_user_simple", (good[0],)),
+                                      ("get_user_simple", ("ninguem-aqui",)),
+                                      ("get_user_simple", (good[1],))])
+    finally:
+        client.close()
+
+    assert len(executor.payloads) == 1
+    for login, ((data, time_ms, size), metrics) in zip(good, (results[0], results[2])):
+        expected = GraphQLSchema(dataset).execute(USER_SIMPLE_QUERY, {"login": login})["data"]
+        assert data == expected
+        assert size == metrics["response_size_bytes"] == _compact_size(expected)
+        assert metrics["batch_size"] == 3
+        assert metrics["request_size_bytes"] == 100
+        assert time_ms == metrics["response_time_ms"]
+
+    error, metrics = results[1]
+    assert isinstance(error, Exception)
+    assert "ninguem-aqui" in str(error)
+    assert "q1_" not in str(error)
+    assert metrics["batch_size"] == 3
+
+
+def test_transport_failure_reaches_every_caller(dataset):
+    client = BatchingGraphQLClient(None, "http://stub", window_ms=200, max_batch_size=2)
+    client._post = FakeExecutor(fail=ConnectionError("sem conexão"))
+    try:
+        results = _run_batch(client, [("get_user_simple", (login,)) for login in dataset.logins[:2]])
+    finally:
+        client.close()
+
+    for error, _ in results:
+        assert isinstance(error, ConnectionError)
+
+
+def test_errors_without_path_affect_the_whole_batch(dataset):
+    client = BatchingGraphQLClient(None, "http://stub", window_ms=200, max_batch_size=2)
+
+    def post(payload):
+        return {"data": None, "errors": [{"message": "Something went wrong"}]}, \
+            {"decode_ms": 0.0, "request_size_bytes": 10, "response_size_bytes": 10}
+
+    client._post = post
+    try:
+        results = _run_batch(client, [("get_user_simple", (login,)) for login in dataset.logins[:2]])
+    finally:
+        client.close()
+
+    for error, _ in results:
+        assert "Something went wrong" in str(error)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from hdr_histogram import HdrHistogram, LatencyHistograms, REPORT_PERCENTILES, summarize_ms
+
+
+def _edge_values():
+    values = list(range(0, 4096))
+    for shift in range(11, 32):
+        base = 1 << shift
+        values += [base - 1, base, base + 1, base + base // 3]
+    return [v for v in values if v <= 3_600_000_000]
+
+
+def _latencies(n=20000, seed=0):
+    # Microssegundos inteiros, com cauda longa (1 ms a alguns segundos)
+    rng = np.random.default_rng(seed)
+    return np.rint(rng.lognormal(mean=11, sigma=1.2, size=n)).astype(np.int64)
+
+
+def test_equivalent_range_contains_value_within_precision():
+    histogram = HdrHistogram()
+    for value in _edge_values():
+        low = histogram.lowest_equivalent_value(value)
+        high = histogram.highest_equivalent_value(value)
+        assert low <= value <= high
+        assert high - low + 1 <= max(1, value / 10 ** histogram.significant_figures)
+        assert histogram._value_from_index(histogram._counts_index(value)) == low
+
+
+def test_small_values_are_exact():
+    histogram = HdrHistogram()
+    for value in range(2048):
+        assert histogram.lowest_equivalent_value(value) == histogram.highest_equivalent_value(value) == value
+
+
+def test_record_array_matches_record():
+    values = np.concatenate([_latencies(), _edge_values(), [4e9]])
+    scalar, vector = HdrHistogram(), HdrHistogram()
+    for value in values:
+        scalar.record(value)
+    vector.record_array(values)
+    assert vector.to_dict() == scalar.to_dict()
+
+
+def test_values_above_highest_are_saturated():
+    histogram = HdrHistogram(highest_value=1_000_000)
+    histogram.record_array([5_000_000])
+    histogram.record(7_000_000)
+    assert histogram.max_value == 1_000_000
+    assert histogram.value_at_percentile(100) == 1_000_000
+
+
+@pytest.mark.parametrize("p", [0, 1, 25, 50, 90, 99, 99.9, 100])
+def test_value_at_percentile_matches_numpy(p):
+    values = _latencies()
+    histogram = HdrHistogram()
+    histogram.record_array(values)
+    exact = np.percentile(values, p, method="inverted_cdf")
+    result = histogram.value_at_percentile(p)
+    assert exact <= result <= exact * (1 + 10 ** -histogram.significant_figures)
+
+
+def test_percentiles_matches_value_at_percentile():
+    histogram = HdrHistogram()
+    histogram.record_array(_latencies())
+    ps = REPORT_PERCENTILES + [0, 100]
+    assert histogram.percentiles(ps) == {p: histogram.value_at_percentile(p) for p in ps}
+
+
+def test_empty_histogram():
+    histogram = HdrHistogram()
+    assert histogram.value_at_percentile(50) is None
+    assert histogram.mean is None
+    assert set(histogram.percentiles().values()) == {None}
+
+
+def test_add_equals_single_histogram():
+    values = _latencies()
+    whole, first, second = HdrHistogram(), HdrHistogram(), HdrHistogram()
+    whole.record_array(values)
+    first.record_array(values[:7000])
+    second.record_array(values[7000:])
+    first.add(second)
+    assert first.to_dict() == whole.to_dict()
+
+
+def test_add_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HdrHistogram(significant_figures=3).add(HdrHistogram(significant_figures=2))
+
+
+def test_latency_histograms_merge_and_load(tmp_path):
+    values_ms = _latencies(seed=1) / 1000
+    runs = []
+    for index, chunk in enumerate(np.array_split(values_ms, 3)):
+        histograms = LatencyHistograms()
+        histograms.record_array("REST", "simples", chunk)
+        histograms.record("GraphQL", "simples", float(chunk[0]))
+        path = tmp_path / f"run{index}.json"
+        histograms.save(str(path))
+        runs.append(str(path))
+
+    merged = LatencyHistograms.load(runs)
+    rest = merged.histograms[("REST", "simples")]
+    assert rest.total_count == len(values_ms)
+    assert merged.combined("GraphQL").total_count == 3
+    assert merged.combined().total_count == len(values_ms) + 3
+
+    summary = summarize_ms(rest)
+    exact_p99 = np.percentile(values_ms, 99, method="inverted_cdf")
+    assert summary["p99_ms"] == pytest.approx(exact_p99, rel=1e-3)
+    assert summary["mean_ms"] == pytest.approx(values_ms.mean(), rel=1e-9)
@@ -0,0 +1,105 @@
+import json
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import CacheEntry, ResponseCache, cache_key, CACHE_HIT, CACHE_MISS, CACHE_REVALIDATED
+from rest_client import RESTClient, SUMMED_COLUMNS
+from transport import PHASE_COLUMNS, SIZE_COLUMNS
+
+
+class StubResponse:
+
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class StubTransport:
+    """Responde com ETag por URL e 304 quando o If-None-Match confere"""
+
+    def __init__(self, bodies: dict):
+        self.bodies = bodies
+        self.requests = []
+
+    def request(self, method, url, params=None, headers=None, route=None):
+        self.requests.append((url, params, dict(headers or {})))
+        body = json.dumps(self.bodies[url]).encode()
+        etag = f'"{hash(body)}"'
+        metrics = dict.fromkeys(PHASE_COLUMNS, 0.0)
+        metrics.update(dict.fromkeys(SIZE_COLUMNS + SUMMED_COLUMNS, 0))
+        if (headers or {}).get("If-None-Match") == etag:
+            return StubResponse(304, headers={"ETag": etag}), metrics
+        return StubResponse(200, body, {"ETag": etag, "Cache-Control": "max-age=60"}), metrics
+
+    def close(self):
+        pass
+
+
+def _client(cache: ResponseCache, bodies: dict) -> RESTClient:
+    client = RESTClient(None, "http://stub", cache=cache)
+    client.transport = StubTransport(bodies)
+    return client
+
+
+def test_etag_revalidation_returns_cached_body():
+    client = _client(ResponseCache(), {"http://stub/users/octocat": {"login": "octocat"}})
+
+    first, _, first_size = client.get_user_simple("octocat")
+    assert client.last_metrics["cache_status"] == CACHE_MISS
+
+    second, _, second_size = client.get_user_simple("octocat")
+    assert client.last_metrics["cache_status"] == CACHE_REVALIDATED
+    assert second == first == {"login": "octocat"}
+    assert first_size > 0 and second_size == 0
+
+    _, _, sent_headers = client.transport.requests[1]
+    assert sent_headers["If-None-Match"] == client.cache.get("http://stub/users/octocat").etag
+
+
+def test_fresh_entry_is_served_without_request_when_max_age_is_respected():
+    client = _client(ResponseCache(respect_max_age=True), {"http://stub/users/octocat": {"login": "octocat"}})
+    client.get_user_simple("octocat")
+    data, _, _ = client.get_user_simple("octocat")
+    assert client.last_metrics["cache_status"] == CACHE_HIT
+    assert data == {"login": "octocat"}
+    assert len(client.transport.requests) == 1
+
+
+def test_cache_key_ignores_parameter_order():
+    assert cache_key("http://stub/a", {"b": 2, "a": 1}) == cache_key("http://stub/a", {"a": 1, "b": 2})
+    assert cache_key("http://stub/a", {}) == cache_key("http://stub/a") == "http://stub/a"
+    assert cache_key("http://stub/a", {"a": 1}) != cache_key("http://stub/a", {"a": 2})
+
+    client = _client(ResponseCache(), {"http://stub/search": {"items": []}})
+    client._fetch("http://stub/search", {"q": "x", "per_page": 10})
+    _, metrics, _ = client._fetch("http://stub/search", {"per_page": 10, "q": "x"})
+    assert metrics["cache_status"] == CACHE_REVALIDATED
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    cache = ResponseCache(max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.put(key, CacheEntry(b"x" * 10, etag=key))
+    assert cache.current_bytes == 30
+
+    cache.get("a")
+    cache.put("d", CacheEntry(b"x" * 10, etag="d"))
+    assert cache.get("b") is None
+    assert [key for key in ("a", "c", "d") if cache.get(key) is not None] == ["a", "c", "d"]
+    assert cache.current_bytes == 30
+
+    cache.put("big", CacheEntry(b"x" * 31, etag="big"))
+    assert cache.get("big") is None
+    assert len(cache) == 3
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ResponseCache(disk_dir=str(tmp_path)).put("k", CacheEntry(b"body", etag='"e"', link="<x>; rel=\"next\""))
+    entry = ResponseCache(disk_dir=str(tmp_path)).get("k")
+    assert (entry.body, entry.etag, entry.link) == (b"body", '"e"', "<x>; rel=\"next\"")
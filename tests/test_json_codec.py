@@ -0,0 +1,91 @@
+import pytest
+
+from graphql_client import GraphQLClient
+from json_codec import JSONCodec, LazyJSON
+from local_server import LocalServer
+from rest_client import RESTClient
+
+
+DOCUMENT = {
+    "login": "octocat",
+    "name": "Ação Ñandú 🐙",
+    "public_repos": 8,
+    "score": 0.5,
+    "site_admin": False,
+    "company": None,
+    "repos": [{"id": 1, "topics": ["a", "b"]}, {"id": 2, "topics": []}],
+}
+
+
+@pytest.fixture(params=["json", "orjson"])
+def codec(request):
+    return JSONCodec(request.param)
+
+
+def test_backends_produce_identical_bytes():
+    standard, fast = JSONCodec("json"), JSONCodec("orjson")
+    assert standard.dumps(DOCUMENT) == fast.dumps(DOCUMENT)
+    assert standard.dumps(DOCUMENT, indent=True) == fast.dumps(DOCUMENT, indent=True)
+    # UTF-8 sem escapes \uXXXX, como o orjson
+    assert "Ação Ñandú 🐙".encode() in standard.dumps(DOCUMENT)
+
+
+def test_round_trip(codec):
+    raw = codec.dumps(DOCUMENT)
+    assert codec.loads(raw) == DOCUMENT
+    assert JSONCodec("json").loads(raw) == JSONCodec("orjson").loads(raw)
+
+
+def test_invalid_document_raises_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"login": "octo')
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        JSONCodec("simplejson")
+
+
+class CountingCodec(JSONCodec):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def loads(self, raw: bytes):
+        self.calls += 1
+        return super().loads(raw)
+
+
+def test_lazy_document_decodes_once_on_first_access():
+    codec = CountingCodec(lazy=True)
+    document = codec.decode(codec.dumps(DOCUMENT))
+
+    assert isinstance(document, LazyJSON)
+    assert not document.decoded and codec.calls == 0
+    assert repr(document).startswith("LazyJSON(")
+
+    assert document["login"] == "octocat"
+    assert document.get("missing", 1) == 1
+    assert "repos" in document and len(document) == len(DOCUMENT)
+    assert list(document) == list(DOCUMENT)
+    assert dict(document.items()) == DOCUMENT
+    assert document == DOCUMENT and document == codec.decode(codec.dumps(DOCUMENT))
+    assert document.decoded and codec.calls == 2
+
+
+def test_clients_return_same_data_for_every_backend():
+    with LocalServer() as server:
+        login = server.api.dataset.logins[0]
+        results = {}
+        for name, codec in (("json", JSONCodec("json")), ("orjson", JSONCodec("orjson")),
+                            ("orjson-lazy", JSONCodec("orjson", lazy=True))):
+            rest = RESTClient(None, server.base_url, codec=codec)
+            graphql = GraphQLClient(None, server.base_url, codec=codec)
+            rest_data, _, _ = rest.get_user_simple(login)
+            graphql_data, _, _ = graphql.get_user_simple(login)
+            assert rest.last_metrics["json_backend"] == name
+            results[name] = (rest_data, graphql_data)
+
+    assert results["json"] == results["orjson"] == results["orjson-lazy"]
+    # Com decodificação preguiçosa o custo não é medido na chamada
+    assert rest.last_metrics["decode_ms"] is None
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from load_test import LoadTestRunner
+from local_server import LocalServer
+
+
+def test_measurement_window_starts_after_all_users_are_ready(tmp_path):
+    with LocalServer() as server:
+        runner = LoadTestRunner(None, server.base_url, treatments=["simples"], output_dir=str(tmp_path))
+        create_client = runner.create_client
+
+        def slow_client(api_type):
+            time.sleep(0.3)
+            return create_client(api_type)
+
+        runner.create_client = slow_client
+        level = runner.run_level("REST", concurrency=2, duration_s=0.5)
+
+    assert 0.5 <= level["duration_s"] < 0.8
+    assert level["requests"] > 0
+    # A criação lenta dos clientes não consome a janela: as requisições começam logo no início dela
+    assert 0 <= min(sample["started_at"] for sample in runner.samples) < 0.1
+    assert all(sample["started_at"] < 0.5 for sample in runner.samples)
+
+
+def _failing_client(create_client):
+    calls = []
+
+    def create(api_type):
+        calls.append(api_type)
+        if len(calls) == 2:
+            raise ConnectionError("falha ao abrir a sessão")
+        return create_client(api_type)
+
+    return create
+
+
+def test_client_creation_error_is_raised_after_joining_users(tmp_path):
+    with LocalServer() as server:
+        runner = LoadTestRunner(None, server.base_url, treatments=["simples"], output_dir=str(tmp_path))
+        create_client = runner.create_client
+        runner.create_client = _failing_client(create_client)
+        before = threading.active_count()
+
+        with pytest.raises(ConnectionError, match="falha ao abrir a sessão"):
+            runner.run_level("REST", concurrency=3, duration_s=0.5)
+        assert threading.active_count() == before
+        assert runner.samples == []
+
+        runner.create_client = _failing_client(create_client)
+        with pytest.raises(ConnectionError, match="falha ao abrir a sessão"):
+            runner.run_open_level("REST", rate=10, duration_s=0.5, workers=3)
+        assert threading.active_count() == before
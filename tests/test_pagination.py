@@ -0,0 +1,100 @@
+import pytest
+
+from graphql_client import GraphQLClient
+from local_server import LocalServer
+from rest_client import RESTClient
+
+
+PER_PAGE = 20
+
+
+@pytest.fixture(scope="module")
+def server():
+    with LocalServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def owner(server):
+    # O maior usuário com poucas páginas: mais de uma página, sem percorrer milhares de repositórios
+    dataset = server.api.dataset
+    return max((login for login in dataset.logins if dataset.repo_count(login) < 500), key=dataset.repo_count)
+
+
+def _names(items):
+    return [item["name"] for item in items]
+
+
+def test_rest_follows_link_next_until_last_page(server, owner):
+    client = RESTClient(None, server.base_url)
+    total = server.api.dataset.repo_count(owner)
+    pages = list(client.iter_user_repos(owner, per_page=PER_PAGE).pages())
+
+    assert len(pages) == -(-total // PER_PAGE)
+    assert [page.number for page in pages] == list(range(1, len(pages) + 1))
+    next_url, _ = pages[0].next_marker
+    assert "page=2" in next_url and f"per_page={PER_PAGE}" in next_url
+    assert pages[-1].next_marker is None
+    assert _names(item for page in pages for item in page.items) == _names(server.api.dataset.repos(owner, 0, total))
+
+
+def test_graphql_follows_end_cursor_while_has_next_page(server, owner):
+    client = GraphQLClient(None, server.base_url)
+    total = server.api.dataset.repo_count(owner)
+    pages = list(client.iter_user_repos(owner, first=PER_PAGE).pages())
+
+    assert len(pages) == -(-total // PER_PAGE)
+    assert all(page.next_marker for page in pages[:-1])
+    assert pages[-1].next_marker is None
+    assert _names(item for page in pages for item in page.items) == _names(server.api.dataset.repos(owner, 0, total))
+
+
+def test_max_pages_stops_early(server, owner):
+    for iterator in (RESTClient(None, server.base_url).iter_user_repos(owner, per_page=PER_PAGE, max_pages=2),
+                     GraphQLClient(None, server.base_url).iter_user_repos(owner, first=PER_PAGE, max_pages=2)):
+        assert len(list(iterator)) == 2 * PER_PAGE
+        assert len(iterator.page_metrics) == 2
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_rest_limit_truncates_collection(server, owner, parallel):
+    limit = 2 * PER_PAGE + 5
+    client = RESTClient(None, server.base_url)
+    items, _, _ = client.fetch_user_repos(owner, limit=limit, per_page=PER_PAGE, parallel=parallel)
+
+    assert _names(items) == _names(server.api.dataset.repos(owner, 0, limit))
+    assert client.last_metrics["items_count"] == limit
+    assert client.last_metrics["request_count"] == 3
+
+
+def test_graphql_limit_truncates_collection(server, owner):
+    limit = 2 * PER_PAGE + 5
+    client = GraphQLClient(None, server.base_url)
+    items, _, _ = client.fetch_user_repos(owner, limit=limit, first=PER_PAGE)
+
+    assert _names(items) == _names(server.api.dataset.repos(owner, 0, limit))
+    assert client.last_metrics["items_count"] == limit
+    assert client.last_metrics["request_count"] == 3
+
+
+def test_limit_smaller_than_page_uses_one_request(server, owner):
+    for client in (RESTClient(None, server.base_url), GraphQLClient(None, server.base_url)):
+        items, _, _ = client.fetch_user_repos(owner, limit=5)
+        assert _names(items) == _names(server.api.dataset.repos(owner, 0, 5))
+        assert client.last_metrics["request_count"] == 1
+
+
+@pytest.mark.parametrize("api", ["REST", "GraphQL"])
+def test_prefetch_returns_same_items_in_same_order(server, owner, api):
+    client = RESTClient(None, server.base_url) if api == "REST" else GraphQLClient(None, server.base_url)
+    size = {"per_page": PER_PAGE} if api == "REST" else {"first": PER_PAGE}
+
+    sequential = client.iter_user_repos(owner, **size)
+    expected = _names(sequential)
+    prefetched = client.iter_user_repos(owner, prefetch=True, **size)
+    actual = _names(prefetched)
+
+    assert actual == expected
+    assert len(expected) == server.api.dataset.repo_count(owner)
+    assert [m["prefetched"] for m in prefetched.page_metrics] == [False] + [True] * (len(prefetched.page_metrics) - 1)
+    assert not any(m["prefetched"] for m in sequential.page_metrics)
@@ -0,0 +1,49 @@
+from graphql_client import GraphQLClient, PERSISTED_HIT, PERSISTED_REGISTERED, PERSISTED_UNSUPPORTED
+from local_server import LocalGitHubAPI, LocalServer
+
+
+def _client(server) -> GraphQLClient:
+    # Cada LocalServer começa sem consultas registradas
+    return GraphQLClient(None, server.base_url, persisted_queries=True)
+
+
+def test_first_call_registers_then_hits():
+    with LocalServer() as server:
+        client = _client(server)
+        login = server.api.dataset.logins[0]
+
+        first, _, _ = client.get_user_simple(login)
+        registered = client.last_metrics
+        second, _, _ = client.get_user_simple(login)
+        hit = client.last_metrics
+
+    assert first == second
+    assert registered["persisted_query"] == PERSISTED_REGISTERED
+    assert registered["request_count"] == 2
+    assert hit["persisted_query"] == PERSISTED_HIT
+    assert hit["request_count"] == 1
+    assert hit["request_size_bytes"] < registered["request_size_bytes"]
+
+
+def test_registration_keeps_rate_limit_of_last_response():
+    with LocalServer() as server:
+        client = _client(server)
+        client.get_user_simple(server.api.dataset.logins[0])
+        registered = client.last_metrics
+        client.get_user_simple(server.api.dataset.logins[0])
+        hit = client.last_metrics
+
+    assert registered["rate_limit_limit"] == hit["rate_limit_limit"]
+    assert registered["rate_limit_reset"] == hit["rate_limit_reset"]
+    assert registered["rate_limit_remaining"] == hit["rate_limit_remaining"] + 1
+    assert registered["response_size_bytes"] > hit["response_size_bytes"]
+
+
+def test_server_without_persisted_queries_falls_back_to_text():
+    with LocalServer(api=LocalGitHubAPI(persisted_queries=False)) as server:
+        client = _client(server)
+        data, _, _ = client.get_user_simple(server.api.dataset.logins[0])
+
+    assert data["user"]["login"] == server.api.dataset.logins[0]
+    assert client.last_metrics["persisted_query"] == PERSISTED_UNSUPPORTED
+    assert client.last_metrics["request_count"] == 2
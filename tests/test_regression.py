@@ -0,0 +1,102 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analyze_results
+from analyze_results import parse_compare_args
+from regression import IMPROVEMENT, REGRESSION, UNCHANGED, classify, compare_runs
+
+
+SIZE = 2000
+
+
+def _run(seed: int, scale: float = 1.0, tail_scale: float = 1.0) -> pd.DataFrame:
+    """Duas células com latências log-normais; `tail_scale` multiplica só os 10% mais lentos"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for api_type in ("REST", "GraphQL"):
+        times = rng.lognormal(mean=5, sigma=0.3, size=SIZE) * scale
+        slow = times > np.quantile(times, 0.9)
+        times[slow] *= tail_scale
+        frames.append(pd.DataFrame({
+            "api_type": api_type,
+            "query_type": "simples",
+            "response_time_ms": times,
+            "response_size_bytes": 1000,
+            "success": True,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _statuses(rows):
+    return {row["api_type"]: row["status"] for row in rows}
+
+
+def test_median_shift_is_a_regression():
+    rows = compare_runs(_run(0), _run(1, scale=1.2), metrics=["response_time_ms"])
+    assert _statuses(rows) == {"REST": REGRESSION, "GraphQL": REGRESSION}
+    assert all(row["median_change"] > 0.15 and row["cliffs_delta"] > 0.147 for row in rows)
+
+    rows = compare_runs(_run(0), _run(1, scale=0.8), metrics=["response_time_ms"])
+    assert _statuses(rows) == {"REST": IMPROVEMENT, "GraphQL": IMPROVEMENT}
+
+
+def test_tail_only_shift_is_a_regression():
+    rows = compare_runs(_run(0), _run(1, tail_scale=3.0), metrics=["response_time_ms"])
+    assert _statuses(rows) == {"REST": REGRESSION, "GraphQL": REGRESSION}
+    for row in rows:
+        # A mediana e o delta de Cliff ficam abaixo dos limiares: quem acusa é o KS no p99
+        assert abs(row["median_change"]) < 0.05
+        assert abs(row["cliffs_delta"]) < 0.147
+        assert row["p99_change"] > 1.0
+        assert row["ks_pvalue_adjusted"] < 0.05
+
+
+def test_same_distribution_is_unchanged():
+    rows = compare_runs(_run(0), _run(1), metrics=["response_time_ms"])
+    assert _statuses(rows) == {"REST": UNCHANGED, "GraphQL": UNCHANGED}
+
+
+def test_classify_requires_effect_size_and_direction():
+    row = {"u_pvalue_adjusted": 0.001, "ks_pvalue_adjusted": 0.5, "cliffs_delta": 0.1,
+           "median_change": 0.2, "p99_change": 0.0}
+    # Significativo, mas com delta de Cliff desprezível
+    assert classify(row, 0.05, 0.147, 0.05, 0.10) == UNCHANGED
+    assert classify(dict(row, cliffs_delta=0.3), 0.05, 0.147, 0.05, 0.10) == REGRESSION
+    # Delta e mediana em sentidos opostos não bastam
+    assert classify(dict(row, cliffs_delta=0.3, median_change=-0.2), 0.05, 0.147, 0.05, 0.10) == UNCHANGED
+
+
+def _compare(monkeypatch, *argv) -> int:
+    monkeypatch.setattr(sys, "argv", ["analyze_results.py", "compare", *argv])
+    with pytest.raises(SystemExit) as exit_info:
+        analyze_results.main()
+    return exit_info.value.code
+
+
+def test_compare_exit_status(tmp_path, monkeypatch):
+    baseline = tmp_path / "experiment_1.csv"
+    slower = tmp_path / "experiment_2.csv"
+    _run(0).to_csv(baseline, index=False)
+    _run(1, scale=1.2).to_csv(slower, index=False)
+    report = str(tmp_path / "report.json")
+
+    assert _compare(monkeypatch, "--baseline", str(baseline), "--candidate", str(slower),
+                    "--metric", "response_time_ms", "--report", report) == 1
+    assert _compare(monkeypatch, "--baseline", str(baseline), "--candidate", str(baseline),
+                    "--metric", "response_time_ms", "--report", report) == 0
+    # --window usa a execução mais recente do diretório como candidata
+    assert _compare(monkeypatch, "--window", "1", "--runs-dir", str(tmp_path),
+                    "--metric", "response_time_ms", "--report", report) == 1
+
+
+def test_window_without_enough_runs_is_a_usage_error(tmp_path, capsys):
+    _run(0).to_csv(tmp_path / "experiment_1.csv", index=False)
+
+    with pytest.raises(SystemExit) as exit_info:
+        parse_compare_args(["--window", "3", "--runs-dir", str(tmp_path)])
+
+    assert exit_info.value.code == 2
+    assert "pelo menos duas execuções" in capsys.readouterr().err
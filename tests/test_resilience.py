@@ -0,0 +1,65 @@
+from experiment import ExperimentRunner
+from graphql_client import GraphQLClient
+from local_server import LocalGitHubAPI, LocalServer
+from resilience import RetryPolicy, merge_resilience
+from rest_client import RESTClient
+
+
+def test_merge_keeps_max_attempts_and_sums_retries():
+    total = {}
+    merge_resilience(total, {"attempts": 1, "retries": 0, "retry_wait_ms": 0.0, "hedged": False})
+    merge_resilience(total, {"attempts": 3, "retries": 2, "retry_wait_ms": 5.0, "hedged": False})
+    merge_resilience(total, {"attempts": 1, "retries": 0, "retry_wait_ms": 0.0, "hedged": True})
+    assert total == {"attempts": 3, "retries": 2, "retry_wait_ms": 5.0, "hedged": True}
+
+
+def test_multi_request_and_persisted_registration_are_not_retries():
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    with LocalServer() as server:
+        rest = RESTClient(None, server.base_url, retry_policy=policy)
+        graphql = GraphQLClient(None, server.base_url, persisted_queries=True, retry_policy=policy)
+        login = server.api.dataset.logins[0]
+
+        rest.get_user_with_repos(login)
+        assert rest.last_metrics["request_count"] == 2
+        assert rest.last_metrics["attempts"] == 1
+        assert rest.last_metrics["retries"] == 0
+
+        graphql.get_user_simple(login)
+        assert graphql.last_metrics["request_count"] == 2
+        assert graphql.last_metrics["attempts"] == 1
+        assert graphql.last_metrics["retries"] == 0
+
+
+def test_failed_measurement_records_attempts(tmp_path):
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    with LocalServer(api=LocalGitHubAPI(error_rate=1.0)) as server:
+        runner = ExperimentRunner(None, output_dir=str(tmp_path), base_url=server.base_url, delay=0,
+                                  retry_policy=policy)
+        for client in (runner.rest_client, runner.graphql_client):
+            runner._measure("X", client, "simples", "get_user", "get_user_simple", "octocat")
+
+    assert len(runner.results) == 2
+    for measurement in runner.results:
+        assert not measurement["success"]
+        assert measurement["attempts"] == 3
+        assert measurement["retries"] == 2
+        assert measurement["hedged"] is False
+        assert measurement["retry_wait_ms"] == 0
+
+
+def test_hedge_latencies_are_kept_per_operation():
+    policy = RetryPolicy(max_attempts=1, hedge=True, hedge_min_samples=2)
+    with LocalServer() as server:
+        rest = RESTClient(None, server.base_url, retry_policy=policy)
+        graphql = GraphQLClient(None, server.base_url, retry_policy=policy)
+        for login in server.api.dataset.logins[:2]:
+            rest.get_user_simple(login)
+            graphql.get_user_simple(login)
+            graphql.search_users("language:python")
+
+    # Logins diferentes caem no mesmo endpoint; consultas GraphQL diferentes, não
+    assert set(rest.transport._latencies) == {("GET", "/users/{username}")}
+    assert set(graphql.transport._latencies) == {("POST", "UserSimple"), ("POST", "SearchUsers")}
+    assert all(len(samples) == 2 for samples in graphql.transport._latencies.values())
+    assert rest.transport.hedge_delay(("GET", "/users/{username}")) is not None
@@ -0,0 +1,89 @@
+import json
+
+from experiment import ExperimentRunner
+from local_server import LocalServer
+from result_log import CHECKPOINT_KEY, ResultLog, checkpoint_key
+
+
+def _measurement(treatment: str, repetition: int, api_type: str) -> dict:
+    return {"api_type": api_type, "query_type": treatment, "repetition": repetition, "success": True}
+
+
+def test_recover_keeps_only_completed_repetitions(tmp_path):
+    path = str(tmp_path / "experiment.jsonl")
+    log = ResultLog(path, fsync_interval=0)
+    for repetition in (1, 2):
+        log.append(_measurement("simples", repetition, "REST"))
+        log.append(_measurement("simples", repetition, "GraphQL"))
+        log.checkpoint("identity", "simples", repetition)
+    log.append(_measurement("simples", 3, "REST"))
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b'{"api_type": "GraphQL", "query_ty')
+
+    measurements, completed = ResultLog(path).recover()
+
+    assert completed == {checkpoint_key("identity", "simples"): 2}
+    assert [(m["repetition"], m["api_type"]) for m in measurements] == [
+        (1, "REST"), (1, "GraphQL"), (2, "REST"), (2, "GraphQL")
+    ]
+    assert all(CHECKPOINT_KEY not in m for m in measurements)
+    with open(path, "rb") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 6
+    assert CHECKPOINT_KEY in json.loads(lines[-1])
+
+
+def test_recover_after_resumed_writes(tmp_path):
+    path = str(tmp_path / "experiment.jsonl")
+    log = ResultLog(path, fsync_interval=0)
+    log.append(_measurement("simples", 1, "REST"))
+    log.checkpoint("identity", "simples", 1)
+    log.append(_measurement("simples", 2, "REST"))
+    log.close()
+
+    resumed = ResultLog(path, fsync_interval=0)
+    resumed.recover()
+    resumed.append(_measurement("simples", 2, "REST"))
+    resumed.checkpoint("identity", "simples", 2)
+    resumed.close()
+
+    measurements, completed = ResultLog(path).recover()
+    assert completed == {checkpoint_key("identity", "simples"): 2}
+    assert [m["repetition"] for m in measurements] == [1, 2]
+
+
+def test_missing_log_starts_empty(tmp_path):
+    assert ResultLog(str(tmp_path / "novo.jsonl")).recover() == ([], {})
+
+
+def test_runner_resumes_without_repeating_completed_repetitions(tmp_path):
+    path = str(tmp_path / "experiment.jsonl")
+
+    with LocalServer() as server:
+        def runner():
+            return ExperimentRunner(None, output_dir=str(tmp_path), base_url=server.base_url, delay=0,
+                                    result_log=ResultLog(path, fsync_interval=0))
+
+        first = runner()
+        treatment = next(t for t in first.registry.enabled(first._settings()) if t.name == "simples")
+        first.run_treatment(treatment, repetitions=2)
+        # Queda no meio da 3ª repetição: uma medição completa e uma linha truncada
+        first._record_measurement("REST", "simples", "get_user", 1.0, 10)
+        first.result_log.close()
+        with open(path, "ab") as f:
+            f.write(b'{"api_type": "Gra')
+
+        second = runner()
+        second.resume()
+        assert len(second.results) == 2 * 2
+        second.run_treatment(treatment, repetitions=4)
+        second.result_log.close()
+
+    assert len(second.results) == 4 * 2
+    assert sum(r["api_type"] == "REST" for r in second.results) == 4
+    assert second.completed_repetitions[checkpoint_key(None, "simples")] == 4
+
+    measurements, completed = ResultLog(path).recover()
+    assert len(measurements) == 4 * 2
+    assert completed == {checkpoint_key(None, "simples"): 4}
@@ -0,0 +1,67 @@
+import pytest
+
+from result_store import count_results, is_columnar, load_results, write_results
+
+
+def _measurements(run: int, count: int, **extra) -> list:
+    return [
+        dict({
+            "timestamp": f"2025-11-30T20:41:{i:02d}",
+            "api_type": "GraphQL" if i % 2 else "REST",
+            "query_type": "simples" if i % 3 else "filtros",
+            "response_time_ms": 100.0 * run + i,
+            "response_size_bytes": 1000 + i,
+            "success": i % 5 != 0,
+        }, **extra)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=["parquet", "arrow"])
+def dataset(request, tmp_path):
+    root = str(tmp_path / "dataset")
+    write_results(_measurements(1, 10), "run-1", root=root, fmt=request.param, run_date="2025-11-30")
+    # A segunda execução tem colunas a mais e um inteiro onde a primeira não tinha a coluna
+    write_results(_measurements(2, 6, cache_status="miss", items_per_second=12), "run-2", root=root,
+                  fmt=request.param, run_date="2025-12-01")
+    return root
+
+
+def test_runs_with_different_columns_are_read_together(dataset):
+    df = load_results(dataset)
+
+    assert len(df) == 16
+    assert {"cache_status", "items_per_second", "date", "run_id"} <= set(df.columns)
+    first, second = df[df["run_id"] == "run-1"], df[df["run_id"] == "run-2"]
+    assert first["cache_status"].isna().all()
+    assert (second["cache_status"] == "miss").all()
+    assert second["items_per_second"].tolist() == [12] * 6
+    assert sorted(df["response_time_ms"]) == sorted([100.0 + i for i in range(10)] + [200.0 + i for i in range(6)])
+
+
+def test_projection_and_filter_are_applied(dataset):
+    df = load_results(dataset, columns=["api_type", "response_time_ms", "coluna_inexistente"],
+                      conditions={"api_type": "GraphQL", "success": True})
+
+    assert list(df.columns) == ["api_type", "response_time_ms"]
+    expected = [100.0 * run + i for run, count in ((1, 10), (2, 6)) for i in range(count) if i % 2 and i % 5]
+    assert sorted(df["response_time_ms"]) == sorted(expected)
+
+    df = load_results(dataset, columns=["response_time_ms"], conditions={"run_id": "run-2",
+                                                                           "query_type": ["filtros"]})
+    assert sorted(df["response_time_ms"]) == [200.0, 203.0]
+
+
+def test_count_results(dataset):
+    assert count_results(dataset) == 16
+    assert count_results(dataset, {"success": True}) == 12
+    assert count_results(dataset, {"date": "2025-12-01", "api_type": "REST"}) == 3
+
+
+def test_single_file_is_columnar(tmp_path):
+    path = write_results(_measurements(1, 4), "run-1", root=str(tmp_path), run_date="2025-11-30")
+
+    assert is_columnar(path) and is_columnar(str(tmp_path))
+    assert not is_columnar("results/experiment_20251130_204105.csv")
+    assert count_results(path) == 4
+    assert load_results(path, columns=["api_type"])["api_type"].tolist() == ["REST", "GraphQL"] * 2
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyze_results import ExperimentAnalyzer
+from stats_engine import Partition
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "results")
+
+DATA_FILE = os.path.join(RESULTS_DIR, "experiment_20251130_204105.csv")
+
+METRICS = ["response_time_ms", "response_size_bytes"]
+
+# Arquivo -> linhas de cabeçalho do CSV
+OUTPUTS = {
+    "descriptive_statistics.csv": [0, 1],
+    "normality_test.csv": 0,
+    "levene_test.csv": 0,
+    "anova_time.csv": 0,
+    "anova_size.csv": 0,
+}
+
+
+@pytest.fixture(scope="module")
+def df():
+    data = pd.read_csv(DATA_FILE)
+    return data[data["success"] == True]
+
+
+def test_cells_match_boolean_masks(df):
+    cells = Partition(df, ["api_type", "query_type"], METRICS)
+
+    assert sorted(cells.labels) == sorted(df.groupby(["api_type", "query_type"]).groups)
+    for api_type in df["api_type"].unique():
+        for query_type in df["query_type"].unique():
+            mask = (df["api_type"] == api_type) & (df["query_type"] == query_type)
+            for metric in METRICS:
+                # Mesmos valores e na mesma ordem (ordenação estável)
+                np.testing.assert_array_equal(cells.get((api_type, query_type), metric), df[mask][metric].to_numpy())
+
+
+def test_single_key_and_missing_cell(df):
+    apis = Partition(df, ["api_type"], METRICS)
+
+    for api_type in df["api_type"].unique():
+        np.testing.assert_array_equal(apis.get(api_type, "response_time_ms"),
+                                      df[df["api_type"] == api_type]["response_time_ms"].to_numpy())
+    missing = apis.get("SOAP", "response_time_ms")
+    assert len(missing) == 0 and missing.dtype == df["response_time_ms"].dtype
+
+
+def test_tables_match_committed_baseline(tmp_path):
+    analyzer = ExperimentAnalyzer(DATA_FILE, output_dir=str(tmp_path))
+    analyzer.descriptive_statistics()
+    analyzer.check_normality()
+    analyzer.check_variance_homogeneity()
+    analyzer.anova_analysis()
+
+    for name, header in OUTPUTS.items():
+        expected = pd.read_csv(os.path.join(RESULTS_DIR, "tables", name), header=header)
+        actual = pd.read_csv(tmp_path / name, header=header)
+        # Os p-valores variam no último dígito entre versões do SciPy/statsmodels
+        pd.testing.assert_frame_equal(actual, expected, rtol=1e-9)
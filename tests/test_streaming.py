@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from analyze_results import ANALYSIS_COLUMNS, ExperimentAnalyzer
+from result_log import ResultLog
+from streaming import load_frame, stream_file
+
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "results", "experiment_20251130_204105.csv")
+
+# Arquivo -> linhas de cabeçalho do CSV
+OUTPUTS = {
+    "descriptive_statistics.csv": [0, 1],
+    "normality_test.csv": 0,
+    "levene_test.csv": 0,
+    "anova_time.csv": 0,
+    "anova_size.csv": 0,
+}
+
+
+def _analyze(output_dir: str, **kwargs):
+    analyzer = ExperimentAnalyzer(DATA_FILE, output_dir=output_dir, **kwargs)
+    analyzer.descriptive_statistics()
+    analyzer.check_normality()
+    analyzer.check_variance_homogeneity()
+    analyzer.anova_analysis()
+
+
+def test_streaming_matches_in_memory_analysis(tmp_path):
+    _analyze(str(tmp_path / "memoria"))
+    _analyze(str(tmp_path / "fluxo"), streaming=True, chunksize=37)
+
+    for name, header in OUTPUTS.items():
+        expected = pd.read_csv(tmp_path / "memoria" / name, header=header)
+        actual = pd.read_csv(tmp_path / "fluxo" / name, header=header)
+        # A ANOVA sobre as linhas em outra ordem difere só no último dígito
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_reservoir_smaller_than_cell_keeps_exact_moments():
+    df = pd.read_csv(DATA_FILE)
+    df = df[df["success"] == True]
+    cells = df.groupby(["api_type", "query_type"])["response_time_ms"]
+
+    analysis = stream_file(DATA_FILE, ANALYSIS_COLUMNS, chunksize=37, reservoir_size=10)
+    table = analysis.descriptive_table()["response_time_ms"]
+
+    assert (cells.size() > 10).all()
+    assert table["count"].tolist() == cells.size().tolist()
+    np.testing.assert_allclose(table["mean"], cells.mean())
+    np.testing.assert_allclose(table["std"], cells.std())
+    np.testing.assert_allclose(table["min"], cells.min())
+    np.testing.assert_allclose(table["max"], cells.max())
+    # Com a célula fora do reservatório a mediana vem do histograma HDR
+    np.testing.assert_allclose(table["median"], cells.median(), rtol=0.01)
+
+    sample = analysis.sample_frame()
+    assert sample.groupby(["api_type", "query_type"]).size().eq(10).all()
+    for (api_type, query_type), values in cells:
+        kept = sample[(sample["api_type"] == api_type) & (sample["query_type"] == query_type)]
+        assert set(kept["response_time_ms"]) <= set(values)
+
+
+def test_truncated_log_streams_only_completed_repetitions(tmp_path):
+    path = str(tmp_path / "experiment.jsonl")
+    log = ResultLog(path, fsync_interval=0)
+    for repetition in (1, 2):
+        for api_type, time_ms in (("REST", 100.0), ("GraphQL", 200.0)):
+            log.append({"api_type": api_type, "query_type": "simples", "repetition": repetition,
+                        "response_time_ms": time_ms * repetition, "response_size_bytes": 1000, "success": True})
+        log.checkpoint("identity", "simples", repetition)
+    log.append({"api_type": "REST", "query_type": "simples", "repetition": 3,
+                "response_time_ms": 999.0, "response_size_bytes": 1000, "success": True})
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b'{"api_type": "GraphQL", "query_ty')
+    size = os.path.getsize(path)
+
+    frame = load_frame(path, ANALYSIS_COLUMNS + ["repetition"])
+    assert frame["repetition"].tolist() == [1, 1, 2, 2]
+    assert 999.0 not in frame["response_time_ms"].tolist()
+
+    analysis = stream_file(path, ANALYSIS_COLUMNS, chunksize=3)
+    assert analysis.total_count == 4
+    assert analysis.cells[("REST", "simples")].moments["response_time_ms"].max == 200.0
+    assert os.path.getsize(path) == size
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from timing import measure_cpu, worker_task
+
+
+def _spin(iterations: int) -> int:
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+def test_worker_thread_cpu_is_counted_separately():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with measure_cpu() as cpu:
+            list(executor.map(worker_task(_spin), [300000, 300000]))
+
+    assert cpu["client_worker_cpu_ms"] > 5 * cpu["client_thread_cpu_ms"]
+    assert cpu["client_cpu_ms"] >= cpu["client_worker_cpu_ms"] * 0.9
+
+
+def test_tasks_without_wrapper_are_not_counted():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with measure_cpu() as cpu:
+            executor.submit(_spin, 300000).result()
+
+    assert cpu["client_worker_cpu_ms"] == 0
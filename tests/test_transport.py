@@ -0,0 +1,74 @@
+import socket
+
+import pytest
+import requests
+
+from local_server import LocalServer
+from rest_client import RESTClient
+from transport import RequestsTransport
+
+
+def _resolver(monkeypatch, addresses):
+    """Resolve multi.test para `addresses`, nessa ordem; os demais nomes seguem para o resolvedor real"""
+    resolve = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host != "multi.test":
+            return resolve(host, port, *args, **kwargs)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+
+def test_falls_back_to_next_resolved_address(monkeypatch):
+    with LocalServer() as server:
+        port = server.httpd.server_address[1]
+        # 127.0.0.2 também é loopback, mas nada escuta nele: a conexão é recusada
+        _resolver(monkeypatch, ["127.0.0.2", "127.0.0.1"])
+        transport = RequestsTransport()
+        login = server.api.dataset.logins[0]
+        response, metrics = transport.request("GET", f"http://multi.test:{port}/users/{login}")
+        transport.close()
+
+    assert response.status_code == 200
+    assert metrics["connections_opened"] == 1
+    assert metrics["dns_ms"] > 0 and metrics["connect_ms"] > 0
+
+
+def test_raises_when_every_address_fails(monkeypatch):
+    with LocalServer() as server:
+        port = server.httpd.server_address[1]
+    _resolver(monkeypatch, ["127.0.0.2", "127.0.0.3"])
+    transport = RequestsTransport()
+
+    with pytest.raises(requests.ConnectionError):
+        transport.request("GET", f"http://multi.test:{port}/users/octocat")
+    transport.close()
+
+
+class OpaqueTransport:
+    """Transporte do httpx sem o atributo interno `_pool`"""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def handle_request(self, request):
+        return self.inner.handle_request(request)
+
+    def close(self):
+        self.inner.close()
+
+
+def test_unreachable_httpx_pool_is_reported_as_none(monkeypatch):
+    with LocalServer() as server:
+        client = RESTClient(None, server.base_url, transport="http2")
+        login = server.api.dataset.logins[0]
+        client.get_user_simple(login)
+        assert isinstance(client.last_metrics["pool_connections"], int)
+
+        session = client.transport.session
+        monkeypatch.setattr(session, "_transport", OpaqueTransport(session._transport))
+        client.get_user_with_repos(login)
+        assert client.transport.open_connections() is None
+        assert client.last_metrics["pool_connections"] is None
+        client.close()
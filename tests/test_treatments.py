@@ -0,0 +1,54 @@
+import pytest
+
+from treatments import TreatmentRegistry
+
+
+def _write(tmp_path, text: str) -> str:
+    path = tmp_path / "treatments.yaml"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_default_registry_has_unique_call_ids():
+    registry = TreatmentRegistry()
+    ids = [call.id for treatment in registry.treatments for call in treatment.calls.values()]
+    assert len(ids) == len(set(ids))
+
+
+def test_repeated_call_id_is_rejected(tmp_path):
+    entry = """
+  - name: {name}
+    query_type: simples
+    rest: {{id: T1, method: get_user_simple, args: [octocat]}}
+    graphql: {{id: T2, method: get_user_simple, args: [octocat]}}
+"""
+    path = _write(tmp_path, "treatments:" + entry.format(name="um") + entry.format(name="dois"))
+    with pytest.raises(ValueError, match="T1"):
+        TreatmentRegistry(path)
+
+
+def test_registry_without_users_pool_skips_batching(tmp_path):
+    from experiment import ExperimentRunner, BATCHED_GRAPHQL_API
+    from local_server import LocalServer
+
+    path = _write(tmp_path, """
+pools:
+  owners: [torvalds]
+treatments:
+  - name: simples
+    query_type: simples
+    params:
+      owner: {choice: owners}
+    rest: {id: T1, method: get_user_simple, args: ["{owner}"]}
+    graphql: {id: T2, method: get_user_simple, args: ["{owner}"]}
+""")
+    with LocalServer() as server:
+        runner = ExperimentRunner(None, output_dir=str(tmp_path / "results"), base_url=server.base_url, delay=0,
+                                  batch_window_ms=5.0, treatments_file=path)
+        try:
+            runner.run_full_experiment(repetitions=1, randomize=False)
+        finally:
+            runner.batching_graphql_client.close()
+
+    assert [r["api_type"] for r in runner.results] == ["REST", "GraphQL"]
+    assert not any(r["api_type"] == BATCHED_GRAPHQL_API for r in runner.results)